@@ -0,0 +1,91 @@
+# benchmarks/bench_alert_history.py
+### Alert history over whole water tables: check_water_alerts row by row vs.
+### classify_water_levels / water_alert_episodes (same results, checked)
+### Usage: python benchmarks/bench_alert_history.py [households] [days]
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import time
+import pandas as pd
+from modules.simulation import make_population, simulate_population
+from modules.visualization import check_water_alerts, classify_water_levels, water_alert_episodes
+
+KEYS = ['household', 'cat_name']
+
+
+def episodes_row_by_row(df, threshold=20):
+    """What finding every episode takes with the scalar check"""
+    df = df.sort_values(KEYS + ['timestamp'], kind='stable')
+    episodes, current, previous_key = [], None, None
+    for row in df.itertuples(index=False):
+        key = (row.household, row.cat_name)
+        if current is not None and key != previous_key:
+            current['ongoing'] = True
+            episodes.append(current)
+            current = None
+        info = check_water_alerts(row.water_level_percent, threshold)
+        if info['alert']:
+            if current is None:
+                current = {'household': key[0], 'cat_name': key[1], 'start': row.timestamp,
+                           'end': row.timestamp, 'min_level': row.water_level_percent,
+                           'severity': info['severity'], 'readings': 0, 'ongoing': False}
+            current['end'] = row.timestamp
+            current['min_level'] = min(current['min_level'], row.water_level_percent)
+            if info['severity'] == 'CRITICAL':
+                current['severity'] = 'CRITICAL'
+            current['readings'] += 1
+        elif current is not None:
+            current['end'] = row.timestamp
+            episodes.append(current)
+            current = None
+        previous_key = key
+    if current is not None:
+        current['ongoing'] = True
+        episodes.append(current)
+    return pd.DataFrame(episodes)
+
+
+def main(households=100, days=28):
+    frames = []
+    simulate_population(make_population(households), days=days, workers=0,
+                        sink=lambda water, feeding: frames.append(water))
+    water = pd.concat(frames, ignore_index=True)
+    print(f"{len(water):,} readings, {households * 2} bowls, {days} days\n")
+
+    start = time.perf_counter()
+    scalar = [check_water_alerts(level)['severity'] for level in water['water_level_percent']]
+    classify_loop = time.perf_counter() - start
+    start = time.perf_counter()
+    vectorized = classify_water_levels(water['water_level_percent'])
+    classify_vec = time.perf_counter() - start
+    print(f"{'classify, row by row':<26} {classify_loop * 1000:9.1f} ms")
+    print(f"{'classify, vectorized':<26} {classify_vec * 1000:9.1f} ms  ({classify_loop / classify_vec:,.0f}x)")
+
+    start = time.perf_counter()
+    expected = episodes_row_by_row(water)
+    episodes_loop = time.perf_counter() - start
+    start = time.perf_counter()
+    episodes = water_alert_episodes(water, group_by=KEYS)
+    episodes_vec = time.perf_counter() - start
+    print(f"{'episodes, row by row':<26} {episodes_loop * 1000:9.1f} ms")
+    print(f"{'episodes, vectorized':<26} {episodes_vec * 1000:9.1f} ms  ({episodes_loop / episodes_vec:,.0f}x)")
+    print(f"\n{len(episodes):,} episodes, {int(episodes['ongoing'].sum())} ongoing, "
+          f"severity counts {episodes['severity'].value_counts().to_dict()}")
+
+    failures = []
+    if list(vectorized.astype(str)) != scalar:
+        failures.append("classify_water_levels differs from check_water_alerts")
+    columns = ['household', 'cat_name', 'start', 'end', 'min_level', 'severity', 'readings', 'ongoing']
+    got = episodes[columns].astype({'severity': str}).reset_index(drop=True)
+    if len(expected) != len(got) or not got.equals(expected[columns].astype(got.dtypes.to_dict())):
+        failures.append("water_alert_episodes differs from the row-by-row episodes")
+    print("\nParity:", "OK" if not failures else "FAILED")
+    for failure in failures:
+        print(" -", failure)
+    return len(failures)
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    sys.exit(1 if main(*args) else 0)
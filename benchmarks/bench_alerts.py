@@ -0,0 +1,95 @@
+# benchmarks/bench_alerts.py
+### Streaming water alerts: readings per second and notifications sent, compared
+### with calling check_water_alerts on every reading
+### Usage: python benchmarks/bench_alerts.py [bowls] [readings_per_bowl]
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import time
+import numpy as np
+from modules.alerts import AlertEngine
+from modules.visualization import check_water_alerts
+
+TARGET_READINGS_PER_SECOND = 100_000
+
+
+def make_readings(bowls, per_bowl, seed=0):
+    """Interleaved readings, one per bowl per minute; a third of the bowls hover around 20%"""
+    rng = np.random.default_rng(seed)
+    minutes = np.arange(per_bowl)
+    start = rng.uniform(40, 100, bowls)
+    drain = rng.uniform(0.01, 0.2, bowls)
+    levels = start[:, None] - drain[:, None] * minutes[None, :]
+    levels = np.where(levels < 0, 100.0, levels)  # refilled once empty
+    hovering = np.arange(bowls) % 3 == 0
+    levels[hovering] = 20 + rng.normal(0, 1.5, (hovering.sum(), per_bowl))
+    levels = np.round(levels + rng.normal(0, 0.3, levels.shape), 2)
+    keys = [("household_%d" % (b // 2), "cat_%d" % (b % 2)) for b in range(bowls)]
+    # Arrival order: minute by minute, all bowls each minute
+    return (keys * per_bowl, levels.T.ravel(),
+            np.repeat(1_700_000_000 + minutes * 60.0, bowls))
+
+
+def naive(keys, levels):
+    """Evaluate each reading alone and notify whenever it is in alert"""
+    return sum(1 for level in levels.tolist() if check_water_alerts(level)['alert'])
+
+
+def main(bowls=10_000, per_bowl=100):
+    keys, levels, seconds = make_readings(bowls, per_bowl)
+    print(f"{len(levels):,} readings from {bowls:,} bowls\n")
+
+    start = time.perf_counter()
+    spam = naive(keys, levels)
+    naive_seconds = time.perf_counter() - start
+    print(f"{'check_water_alerts per reading':<32} {len(levels) / naive_seconds:12,.0f} readings/s  "
+          f"{spam:9,d} notifications")
+
+    engine = AlertEngine()
+    start = time.perf_counter()
+    sent = engine.process_many(keys, levels, seconds)
+    engine_seconds = time.perf_counter() - start
+    rate = len(levels) / engine_seconds
+    print(f"{'AlertEngine.process_many':<32} {rate:12,.0f} readings/s  {len(sent):9,d} notifications")
+
+    single = AlertEngine()
+    n = min(len(levels), 200_000)
+    start = time.perf_counter()
+    for key, level, now in zip(keys[:n], levels[:n].tolist(), seconds[:n].tolist()):
+        single.process(key, level, now)
+    print(f"{'AlertEngine.process, one by one':<32} {n / (time.perf_counter() - start):12,.0f} readings/s")
+    print(f"\nengine: {engine.stats()}")
+
+    failures = []
+    if rate < TARGET_READINGS_PER_SECOND:
+        failures.append(f"{rate:,.0f} readings/s is below the {TARGET_READINGS_PER_SECOND:,} target")
+
+    # Oscillating around 20% gives one alert, not one per dip
+    flappy = AlertEngine()
+    wobble = [21, 19, 21, 19.5, 22, 18, 24, 19, 26, 30, 19]
+    notes = flappy.process_many(["bowl"] * len(wobble), wobble, np.arange(len(wobble)) * 60.0)
+    if [n["severity"] for n in notes] != ["WARNING", "NORMAL"]:
+        failures.append(f"hysteresis: {[n['severity'] for n in notes]}")
+
+    # Dipping again within the cooldown is suppressed; escalation is not
+    cooldown = AlertEngine(cooldown=3600)
+    notes = cooldown.process_many(["bowl"] * 5, [15, 40, 15, 0, 50], [0.0, 600, 1200, 1800, 2400])
+    if [n["severity"] for n in notes] != ["WARNING", "NORMAL", "CRITICAL", "NORMAL"]:
+        failures.append(f"dedup / escalation: {[n['severity'] for n in notes]}")
+
+    # Per-cat thresholds
+    custom = AlertEngine()
+    custom.set_threshold("thirsty", threshold=40)
+    if custom.process("thirsty", 35, 0) is None or custom.process("other", 35, 0) is not None:
+        failures.append("per-bowl threshold not applied")
+
+    print("\nChecks:", "OK" if not failures else "FAILED")
+    for failure in failures:
+        print(" -", failure)
+    return len(failures)
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    sys.exit(1 if main(*args) else 0)
@@ -0,0 +1,180 @@
+# benchmarks/bench_camera_client.py
+### Polling many cameras against a local stub server: one blocking request per
+### camera vs. the pooled async CameraClient (retries, timeouts, ETags checked too)
+### Usage: python benchmarks/bench_camera_client.py [cameras] [latency_ms]
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import asyncio
+import hashlib
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import httpx
+from modules.api_utils import CameraClient, get_cat_camera_image
+
+FRAME_BYTES = 64 * 1024
+
+
+class StubCameras(BaseHTTPRequestHandler):
+    """
+    /cam/<n>    a JPEG-sized frame with an ETag that changes every `epoch`
+    /flaky/<n>  503 on the first two requests, then a frame
+    /limited/<n> 429 with "Retry-After: 3600" on the first request, then a frame
+    /slow/<n>   answers after 2 seconds (for timeout checks)
+    /moved/<n>  302 to /cam/<n>
+    """
+    latency = 0.05
+    epoch = 0
+    hits = {}
+    lock = threading.Lock()
+    protocol_version = "HTTP/1.1"  # keep-alive, so pooled clients reuse connections
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body=b"", headers=()):
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        with self.lock:
+            self.hits[path] = self.hits.get(path, 0) + 1
+            hits = self.hits[path]
+        time.sleep(2 if path.startswith("/slow/") else self.latency)
+        if path.startswith("/flaky/") and hits <= 2:
+            return self._send(503, headers=[("Retry-After", "0")])
+        if path.startswith("/limited/") and hits == 1:
+            return self._send(429, headers=[("Retry-After", "3600")])
+        if path.startswith("/missing/"):
+            return self._send(404)
+        if path.startswith("/moved/"):
+            return self._send(302, headers=[("Location", path.replace("/moved/", "/cam/", 1))])
+        etag = '"' + hashlib.md5(f"{path}:{self.epoch}".encode()).hexdigest() + '"'
+        if self.headers.get("If-None-Match") == etag:
+            return self._send(304, headers=[("ETag", etag)])
+        body = hashlib.sha256(etag.encode()).digest() * (FRAME_BYTES // 32)
+        self._send(200, body, [("Content-Type", "image/jpeg"), ("ETag", etag)])
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # the default backlog of 5 stalls concurrent connects on SYN retries
+
+
+def start_server():
+    server = StubServer(("127.0.0.1", 0), StubCameras)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def fetch_blocking(urls):
+    """The old pattern: a fresh connection and a full download for every camera"""
+    frames = []
+    for url in urls:
+        with urllib.request.urlopen(url, timeout=10) as response:
+            frames.append(response.read())
+    return frames
+
+
+async def poll(urls, rounds, **options):
+    async with CameraClient(**options) as client:
+        timings = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            frames = await client.fetch_many(urls)
+            timings.append(time.perf_counter() - start)
+        return frames, timings, client.stats()
+
+
+async def check_behaviour(base):
+    """Retries, timeouts and conditional requests behave as documented"""
+    failures = []
+    async with CameraClient(retries=3, backoff=0.01) as client:
+        frame = await client.fetch(f"{base}/flaky/1")
+        if not (frame["status"] == 200 and frame["attempts"] == 3 and frame["content"]):
+            failures.append(f"flaky camera not recovered by retries: {frame}")
+
+    async with CameraClient(timeout=0.3, retries=1, backoff=0.01) as client:
+        frame = await client.fetch(f"{base}/slow/1")
+        if frame["content"] is not None or frame["attempts"] != 2 or "Timeout" not in frame["error"]:
+            failures.append(f"slow camera did not time out: {frame}")
+
+    async with CameraClient() as client:
+        first = await client.fetch(f"{base}/cam/etag")
+        second = await client.fetch(f"{base}/cam/etag")
+        if not (first["changed"] and not second["changed"] and second["status"] == 304
+                and second["content"] == first["content"]):
+            failures.append("unchanged frame was downloaded again")
+        StubCameras.epoch += 1
+        third = await client.fetch(f"{base}/cam/etag")
+        if not (third["changed"] and third["content"] != first["content"]):
+            failures.append("changed frame was not downloaded")
+
+    # A rate-limited camera waits at most max_backoff, and not in a slot:
+    # with one slot, the other camera is fetched while it waits
+    async with CameraClient(concurrency=1, max_backoff=0.5) as client:
+        limited, other = await client.fetch_many([f"{base}/limited/1", f"{base}/cam/other"])
+        if not (limited["status"] == 200 and limited["attempts"] == 2 and limited["seconds"] < 2):
+            failures.append(f"Retry-After not capped: {limited}")
+        if other["seconds"] > 0.4:
+            failures.append(f"backoff held the concurrency slot ({other['seconds']}s for the other camera)")
+
+    async with CameraClient() as client:
+        moved = await client.fetch(f"{base}/moved/1")
+        if not (moved["status"] == 200 and moved["content"]):
+            failures.append(f"redirect not followed: {moved}")
+    return failures
+
+
+def check_single_fetch(base):
+    """get_cat_camera_image returns bytes, and raises instead of returning None"""
+    failures = []
+    if len(get_cat_camera_image(f"{base}/cam/single")) != FRAME_BYTES:
+        failures.append("get_cat_camera_image did not return the frame")
+    if len(get_cat_camera_image(f"{base}/moved/single")) != FRAME_BYTES:
+        failures.append("get_cat_camera_image did not follow the redirect")
+    try:
+        get_cat_camera_image(f"{base}/missing/1")
+        failures.append("get_cat_camera_image did not raise on HTTP 404")
+    except httpx.HTTPStatusError:
+        pass
+    return failures
+
+
+def main(cameras=50, latency_ms=50):
+    StubCameras.latency = latency_ms / 1000
+    server, base = start_server()
+    urls = [f"{base}/cam/{i}" for i in range(cameras)]
+    print(f"{cameras} cameras, {latency_ms} ms server latency, {FRAME_BYTES // 1024} KB frames\n")
+
+    start = time.perf_counter()
+    fetch_blocking(urls)
+    blocking = time.perf_counter() - start
+    print(f"{'blocking, one by one':<30} {blocking:7.3f}s per round")
+
+    frames, timings, stats = asyncio.run(poll(urls, rounds=3))
+    print(f"{'CameraClient, first round':<30} {timings[0]:7.3f}s per round  ({blocking / timings[0]:.1f}x)")
+    print(f"{'CameraClient, unchanged frames':<30} {min(timings[1:]):7.3f}s per round  "
+          f"({blocking / min(timings[1:]):.1f}x)")
+    print(f"\nclient: {stats}")
+    assert all(f["content"] and len(f["content"]) == FRAME_BYTES for f in frames)
+
+    failures = asyncio.run(check_behaviour(base)) + check_single_fetch(base)
+    server.shutdown()
+    print("\nBehaviour checks:", "OK" if not failures else "FAILED")
+    for failure in failures:
+        print(" -", failure)
+    return len(failures)
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    sys.exit(1 if main(*args) else 0)
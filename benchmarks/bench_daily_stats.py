@@ -0,0 +1,123 @@
+# benchmarks/bench_daily_stats.py
+### Group-by daily statistics vs. the original per-day filtering loops
+### Usage: python benchmarks/bench_daily_stats.py [num_cats] [days]
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import time
+import numpy as np
+import pandas as pd
+from modules.visualization import (simulate_water_levels, calculate_daily_water_consumption,
+                                   calculate_daily_feeding_stats)
+
+
+def legacy_daily_water_consumption(df):
+    """Original implementation: re-filters the frame once per day"""
+    df = df.copy()
+    df['date'] = pd.to_datetime(df['timestamp']).dt.date
+    daily_stats = []
+    for date in df['date'].unique():
+        day_data = df[df['date'] == date]
+        num_refills = len(day_data[day_data['refill_event'] == True])
+        start_level = day_data.iloc[0]['water_level_percent']
+        end_level = day_data.iloc[-1]['water_level_percent']
+        total_consumed = (100 * num_refills) + (start_level - end_level)
+        daily_stats.append({
+            'date': date,
+            'total_consumed_percent': round(total_consumed, 2),
+            'avg_level_percent': round(day_data['water_level_percent'].mean(), 2),
+            'min_level_percent': round(day_data['water_level_percent'].min(), 2),
+            'num_refills': num_refills,
+            'drinking_events': int(day_data['cat_drinking'].sum())
+        })
+    return pd.DataFrame(daily_stats)
+
+
+def legacy_daily_feeding_stats(df):
+    """Original implementation: re-filters the frame once per day"""
+    df = df.copy()
+    df['date'] = pd.to_datetime(df['timestamp']).dt.date
+    daily_stats = []
+    for date in df['date'].unique():
+        day_data = df[df['date'] == date]
+        total_food = day_data['food_amount'].sum()
+        total_feedings = len(day_data)
+        cat_present_count = day_data['cat_present'].sum()
+        presence_rate = (cat_present_count / total_feedings * 100) if total_feedings > 0 else 0
+        daily_stats.append({
+            'date': date,
+            'total_food_g': round(total_food, 1),
+            'num_feedings': total_feedings,
+            'cat_present_count': int(cat_present_count),
+            'presence_rate_percent': round(presence_rate, 1),
+            'avg_food_per_meal_g': round(total_food / total_feedings, 1) if total_feedings > 0 else 0
+        })
+    return pd.DataFrame(daily_stats)
+
+
+def make_water_frame(num_cats, days, seed=0):
+    """Hourly readings for every cat, one cat after another"""
+    sim = simulate_water_levels(days=days, n_bowls=num_cats, rng=seed)
+    hours = len(sim['timestamps'])
+    return pd.DataFrame({
+        'cat_name': np.repeat([f"cat_{i}" for i in range(num_cats)], hours),
+        'timestamp': np.tile(sim['timestamps'], num_cats),
+        'water_level_percent': np.round(sim['levels'].ravel(), 2),
+        'refill_event': np.tile(sim['refill_event'], num_cats),
+        'cat_drinking': sim['cat_drinking'].ravel()
+    })
+
+
+def make_feeding_frame(num_cats, days, seed=0):
+    """Three meals a day for every cat"""
+    rng = np.random.default_rng(seed)
+    meals = pd.date_range("2024-12-13", periods=days, freq="D").repeat(3) + \
+        pd.to_timedelta(np.tile([8, 15, 21], days), unit="h")
+    n = len(meals) * num_cats
+    return pd.DataFrame({
+        'cat_name': np.repeat([f"cat_{i}" for i in range(num_cats)], len(meals)),
+        'timestamp': np.tile(meals, num_cats),
+        'food_amount': np.round(50 + rng.uniform(-5, 5, n), 1),
+        'cat_present': rng.random(n) < 0.9
+    })
+
+
+def same_output(old, new):
+    """Equal up to one rounding step (group sums may add floats in a different order)"""
+    if list(old.columns) != list(new.columns) or len(old) != len(new):
+        return False
+    numeric = old.select_dtypes('number').columns
+    other = old.columns.difference(numeric)
+    return old[other].equals(new[other]) and \
+        bool(np.allclose(old[numeric], new[numeric], rtol=0, atol=0.1 + 1e-9))
+
+
+def timed(label, func):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed:8.3f}s")
+    return result
+
+
+def main(num_cats=10, days=3 * 365):
+    water_df = make_water_frame(num_cats, days)
+    feeding_df = make_feeding_frame(num_cats, days)
+    print(f"{num_cats} cats x {days} days: {len(water_df):,} water rows, "
+          f"{len(feeding_df):,} feeding rows\n")
+
+    old = timed("water, per-day loop", lambda: legacy_daily_water_consumption(water_df))
+    new = timed("water, groupby", lambda: calculate_daily_water_consumption(water_df))
+    print(f"  same output: {same_output(old, new)}")
+    timed("water, groupby per cat", lambda: calculate_daily_water_consumption(water_df, 'cat_name'))
+
+    old = timed("feeding, per-day loop", lambda: legacy_daily_feeding_stats(feeding_df))
+    new = timed("feeding, groupby", lambda: calculate_daily_feeding_stats(feeding_df))
+    print(f"  same output: {same_output(old, new)}")
+    timed("feeding, groupby per cat", lambda: calculate_daily_feeding_stats(feeding_df, 'cat_name'))
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    main(*args)
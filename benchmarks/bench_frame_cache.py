@@ -0,0 +1,113 @@
+# benchmarks/bench_frame_cache.py
+### Camera frame cache: bytes shipped per dashboard refresh, thumbnail latency,
+### duplicate-frame dedup and bounded eviction
+### Usage: python benchmarks/bench_frame_cache.py [cameras] [rounds]
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import io
+import shutil
+import tempfile
+import time
+import numpy as np
+from PIL import Image
+from modules.frame_cache import FrameCache, make_thumbnail
+
+
+def make_frame(seed, size=(1920, 1080)):
+    """A full-HD JPEG with enough detail to compress like a camera picture"""
+    rng = np.random.default_rng(seed)
+    w, h = size
+    gradient = np.linspace(0, 255, w, dtype=np.float32)[None, :, None]
+    pixels = gradient * rng.uniform(0.3, 1.0, 3) + rng.normal(0, 25, (h, w, 3))
+    out = io.BytesIO()
+    Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8)).save(out, "JPEG", quality=85)
+    return out.getvalue()
+
+
+def make_thumbnail_full_decode(content, size):
+    """Thumbnail without JPEG draft mode (full-size decode first)"""
+    with Image.open(io.BytesIO(content)) as image:
+        image = image.convert("RGB")
+        image.thumbnail(size, Image.Resampling.LANCZOS)
+        out = io.BytesIO()
+        image.save(out, "JPEG", quality=80)
+        return out.getvalue()
+
+
+def main(cameras=8, rounds=5):
+    frames = [make_frame(i) for i in range(cameras * 2)]
+    print(f"{cameras} cameras x {rounds} rounds, frames {len(frames[0]) / 1024:.0f} KB (1920x1080)\n")
+
+    start = time.perf_counter()
+    for frame in frames[:10]:
+        make_thumbnail_full_decode(frame, (320, 240))
+    full_decode = (time.perf_counter() - start) / 10
+    start = time.perf_counter()
+    for frame in frames[:10]:
+        make_thumbnail(frame, (320, 240))
+    draft = (time.perf_counter() - start) / 10
+    print(f"{'thumbnail, full decode':<28} {full_decode * 1000:7.2f} ms")
+    print(f"{'thumbnail, JPEG draft':<28} {draft * 1000:7.2f} ms  ({full_decode / draft:.1f}x)\n")
+
+    root = tempfile.mkdtemp()
+    failures = []
+    try:
+        cache = FrameCache(root=os.path.join(root, "frames"), max_frames=cameras * 3)
+        put_seconds, shown_full, shown_thumb, display = 0.0, 0, 0, []
+        for r in range(rounds):
+            for cam in range(cameras):
+                # Every other round the camera sees the same picture as before
+                frame = frames[(cam + cameras * (r // 2 % 2)) % len(frames)]
+                start = time.perf_counter()
+                cache.put(f"cam{cam}", f"2026-01-01 00:00:{r:02d}", frame)
+                put_seconds += time.perf_counter() - start
+            cache.wait()
+            for cam in range(cameras):
+                start = time.perf_counter()
+                thumb = cache.thumbnail(f"cam{cam}", size="medium")
+                display.append(time.perf_counter() - start)
+                shown_thumb += len(thumb)
+                shown_full += len(cache.get(f"cam{cam}"))
+        stats = cache.stats()
+        stored = [name for _, _, files in os.walk(os.path.join(root, "frames"))
+                  for name in files if name.endswith(".frame")]
+
+        print(f"{'put() per frame':<28} {put_seconds / (cameras * rounds) * 1000:7.2f} ms")
+        print(f"{'thumbnail() per display':<28} {sorted(display)[len(display) // 2] * 1000:7.2f} ms (p50)")
+        print(f"{'bytes per refresh, full':<28} {shown_full / rounds / 1024:7.0f} KB")
+        print(f"{'bytes per refresh, medium':<28} {shown_thumb / rounds / 1024:7.0f} KB  "
+              f"({shown_full / shown_thumb:.0f}x less)")
+        print(f"\ncache: {stats}\nframe files on disk: {len(stored)}")
+
+        if stats["duplicates"] == 0:
+            failures.append("identical frames were not deduplicated")
+        if stats["frames"] > cameras * 2:
+            failures.append(f"stored {stats['frames']} distinct frames, expected at most {cameras * 2}")
+        if len(stored) > cameras * 3:
+            failures.append(f"{len(stored)} frame files on disk, bound is {cameras * 3}")
+
+        # A new process (fresh cache object) finds thumbnails on disk
+        reopened = FrameCache(root=os.path.join(root, "frames"))
+        if reopened.thumbnail("cam0", size="small") is None or reopened.stats()["misses"]:
+            failures.append("thumbnails were not reused from disk")
+
+        memory_only = FrameCache(root="", max_frames=4)
+        for i in range(6):
+            memory_only.put("cam", i, frames[i])
+        if memory_only.get("cam", 0) is not None or memory_only.get("cam", 5) != frames[5]:
+            failures.append("memory-only cache did not evict the oldest frames")
+        memory_only.wait()
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    print("\nChecks:", "OK" if not failures else "FAILED")
+    for failure in failures:
+        print(" -", failure)
+    return len(failures)
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    sys.exit(1 if main(*args) else 0)
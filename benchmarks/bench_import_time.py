@@ -0,0 +1,89 @@
+# benchmarks/bench_import_time.py
+### Import-time budget: cold import cost of modules and of each page's imports
+### Usage: python benchmarks/bench_import_time.py [budget_seconds]
+### Exits with status 1 if anything is over budget or fails to import (usable as a CI check).
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import ast
+import glob
+import subprocess
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Modules that must stay cheap to import (no models, corpora or network)
+MODULES = ["modules.nlp_utils", "modules.model_registry", "modules.data_loader"]
+
+# Only a missing Streamlit (the UI layer, not installed on bare servers) skips a page
+SKIP_ERROR = "ModuleNotFoundError: No module named 'streamlit'"
+
+# Heavy libraries that must not be imported by a module unless it is used
+HEAVY = ["textblob", "nltk", "transformers", "torch"]
+
+
+def page_imports(path):
+    """Top-level import statements of a page, without running the page"""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    return [ast.unparse(node) for node in tree.body
+            if isinstance(node, (ast.Import, ast.ImportFrom))]
+
+
+def cold_import(statements):
+    """
+    Run import statements in a fresh interpreter.
+
+    Returns:
+    - (seconds, heavy libraries loaded, error message or None)
+    """
+    code = "\n".join([
+        "import sys, time",
+        f"sys.path.insert(0, {ROOT!r})",
+        "start = time.perf_counter()",
+        *statements,
+        "elapsed = time.perf_counter() - start",
+        f"heavy = [m for m in {HEAVY!r} if m in sys.modules]",
+        "print(elapsed, ','.join(heavy))",
+    ])
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT,
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        return None, [], result.stderr.strip().splitlines()[-1]
+    seconds, _, heavy = result.stdout.strip().splitlines()[-1].partition(" ")
+    return float(seconds), [h for h in heavy.split(",") if h], None
+
+
+def main(budget=1.0):
+    targets = [(name, [f"import {name}"]) for name in MODULES]
+    for path in sorted(glob.glob(os.path.join(ROOT, "streamlit_app", "*.py")) +
+                       glob.glob(os.path.join(ROOT, "streamlit_app", "pages", "*.py"))):
+        targets.append((os.path.relpath(path, ROOT), page_imports(path)))
+
+    print(f"Cold import budget: {budget:.2f}s\n")
+    failures = 0
+    for name, statements in targets:
+        seconds, heavy, error = cold_import(statements)
+        if error == SKIP_ERROR:
+            # Still import the rest of the page, so a broken module import is caught
+            _, _, error = cold_import([line for line in statements
+                                       if not line.split()[1].startswith("streamlit")])
+            if not error:
+                print(f"{'SKIP':<5} {name:<50} {SKIP_ERROR} (other imports ok)")
+                continue
+        if error:
+            failures += 1
+            print(f"{'FAIL':<5} {name:<50} {error}")
+            continue
+        over = seconds > budget or (name in MODULES and bool(heavy))
+        failures += over
+        note = f"  loads {', '.join(heavy)}" if heavy else ""
+        print(f"{'FAIL' if over else 'ok':<5} {name:<50} {seconds:6.3f}s{note}")
+
+    print(f"\n{failures} over budget or broken")
+    return failures
+
+
+if __name__ == "__main__":
+    args = [float(a) for a in sys.argv[1:2]]
+    sys.exit(1 if main(*args) else 0)
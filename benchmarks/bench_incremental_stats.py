@@ -0,0 +1,89 @@
+# benchmarks/bench_incremental_stats.py
+### incremental_daily_stats vs. a full recompute (load_table + calculate) after
+### each new hourly reading is appended, on every storage backend available
+### Usage: python benchmarks/bench_incremental_stats.py [days] [appends]
+### Exits with status 1 if the statistics differ or the incremental path is slower.
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import shutil
+import statistics
+import tempfile
+import time
+from modules import daily_stats
+from modules.data_loader import load_table, invalidate_cache
+from modules.storage import get_backend
+from modules.visualization import generate_water_level_data, calculate_daily_water_consumption
+
+
+def run_backend(name, df, appends):
+    """Append readings one at a time; returns (incremental ms, recompute ms, failures)"""
+    os.environ["CAT_CARE_STORAGE"] = name
+    daily_stats._aggregators.clear()
+    invalidate_cache()
+    backend = get_backend(name)
+    backend.write(df.iloc[:-appends], "water")
+    daily_stats.incremental_daily_stats("water")  # first call reads the whole table once
+
+    incremental, recompute, failures = [], [], []
+    for i in range(len(df) - appends, len(df) - 1):
+        backend.append(df.iloc[i:i + 1], "water")
+        start = time.perf_counter()
+        fast = daily_stats.incremental_daily_stats("water")
+        incremental.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        full = calculate_daily_water_consumption(load_table("water"))
+        recompute.append(time.perf_counter() - start)
+        if not fast.equals(full):
+            failures.append(f"{name}: statistics differ after reading {i + 1}")
+            break
+
+    # A restarted server resumes from the saved state and cursor
+    daily_stats._aggregators.clear()
+    backend.append(df.iloc[-1:], "water")
+    if not daily_stats.incremental_daily_stats("water").equals(calculate_daily_water_consumption(df)):
+        failures.append(f"{name}: statistics differ after a restart")
+    # A replaced table is read again from the start
+    backend.write(df.iloc[:100], "water")
+    if not daily_stats.incremental_daily_stats("water").equals(calculate_daily_water_consumption(df.iloc[:100])):
+        failures.append(f"{name}: statistics differ after the table was replaced")
+    return statistics.median(incremental) * 1000, statistics.median(recompute) * 1000, failures
+
+
+def main(days=3650, appends=24):
+    df = generate_water_level_data(days=days, rng=42)
+    print(f"{len(df) - appends:,} hourly readings stored, then {appends} appended one at a time, "
+          f"the last after a restart (medians; includes a reading at midnight)\n")
+    print(f"{'backend':<8} {'incremental':>12} {'recompute':>11}")
+
+    failures = []
+    cwd = os.getcwd()
+    workdir = tempfile.mkdtemp()
+    try:
+        os.chdir(workdir)
+        os.makedirs("data")
+        for name in ("csv", "parquet", "sqlite"):
+            try:
+                get_backend(name)
+            except ImportError:
+                print(f"{name:<8} skipped (engine not installed)")
+                continue
+            fast, full, found = run_backend(name, df, appends)
+            print(f"{name:<8} {fast:9.2f} ms {full:8.2f} ms  ({full / fast:.1f}x)")
+            if fast > full:
+                found.append(f"{name}: incremental path slower than a full recompute")
+            failures += found
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir)
+
+    print("\nChecks:", "OK" if not failures else "FAILED")
+    for failure in failures:
+        print(" -", failure)
+    return len(failures)
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    sys.exit(1 if main(*args) else 0)
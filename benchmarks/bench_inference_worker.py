@@ -0,0 +1,97 @@
+# benchmarks/bench_inference_worker.py
+### Many sessions analyzing notes at once: serialized calls vs. the micro-batching worker
+### Usage: python benchmarks/bench_inference_worker.py [sessions] [notes_per_session] [--method M]
+### (M: transformer, textblob or keywords; default: the first of them that loads here)
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault("CAT_CARE_SENTIMENT_CACHE", "")  # memory-only cache, no files
+
+import threading
+import time
+from bench_sentiment import make_notes
+from modules.nlp_utils import analyze_notes_batch
+from modules.inference_worker import InferenceWorker
+from modules.sentiment_cache import get_sentiment_cache
+
+
+def percentiles(latencies):
+    latencies = sorted(latencies)
+    return latencies[len(latencies) // 2] * 1000, latencies[int(len(latencies) * 0.95)] * 1000
+
+
+def run_sessions(sessions, analyze):
+    """Start every session at once; return wall time and per-request latencies"""
+    latencies = []
+    lock = threading.Lock()
+
+    def session(notes):
+        for note in notes:
+            start = time.perf_counter()
+            analyze(note)
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=session, args=(notes,)) for notes in sessions]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - start, latencies
+
+
+def pick_method():
+    """The transformer if the model loads (installed and downloaded/cached), else textblob, else keywords"""
+    try:
+        from modules.model_registry import get_sentiment_pipeline
+        get_sentiment_pipeline()
+        return "transformer"
+    except Exception as e:
+        print(f"Transformer unavailable ({type(e).__name__}), falling back")
+    try:
+        import textblob  # noqa: F401
+        return "textblob"
+    except ImportError:
+        return "keywords"
+
+
+def main(num_sessions=32, notes_per_session=20, method=None):
+    method = method or pick_method()
+    notes = make_notes(num_sessions * notes_per_session, seed=3)
+    # Unique notes so the sentiment cache does not hide inference cost
+    notes = [f"{note} #{i}" for i, note in enumerate(notes)]
+    sessions = [notes[i::num_sessions] for i in range(num_sessions)]
+    print(f"{num_sessions} sessions x {notes_per_session} notes, method={method}\n")
+
+    analyze_notes_batch(["warm up"], method=method)
+    inference_lock = threading.Lock()
+
+    def serialized(note):
+        # What a blocking page call amounts to: one model, one request at a time
+        with inference_lock:
+            analyze_notes_batch([note], method=method)
+
+    worker = InferenceWorker()
+
+    def queued(note):
+        worker.submit(note, method=method).result(timeout=60)
+
+    for label, analyze in [("serialized calls", serialized), ("worker, micro-batched", queued)]:
+        get_sentiment_cache().clear()
+        elapsed, latencies = run_sessions(sessions, analyze)
+        p50, p95 = percentiles(latencies)
+        print(f"{label:<24} {elapsed:7.3f}s  {len(notes) / elapsed:9,.1f} notes/s  "
+              f"p50 {p50:7.2f} ms  p95 {p95:7.2f} ms")
+    print(f"\nworker: {worker.stats()}")
+    worker.shutdown()
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    method = None
+    if "--method" in args:
+        i = args.index("--method")
+        method = args[i + 1]
+        del args[i:i + 2]
+    main(*[int(a) for a in args[:2]], method=method)
@@ -0,0 +1,164 @@
+# benchmarks/bench_ingestion.py
+### Sensor ingestion: a stand-in sensor fleet posts water/feeder events to the
+### ingestion daemon, which batches them into storage (throughput, latency, parity)
+### Usage: python benchmarks/bench_ingestion.py [households] [days]
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import asyncio
+import shutil
+import tempfile
+import time
+import pandas as pd
+from modules.ingestion import (SensorIngestor, serve_http, publish_http, simulated_events, events_to_frame,
+                               storage_writer, EVENT_TABLES)
+from modules.preprocess import clean_water_data, clean_feeding_data
+from modules.simulation import make_population
+from modules.data_loader import append_table, load_table, invalidate_cache
+from modules.storage import drop_table
+
+
+async def ingest(events, batch_size, connections, **options):
+    """Run the daemon and the publisher together; returns (publisher report, ingestor stats)"""
+    ingestor = SensorIngestor(**options)
+    server = await serve_http(ingestor, port=0)
+    port = server.sockets[0].getsockname()[1]
+    flushing = asyncio.create_task(ingestor.run())
+    start = time.perf_counter()
+    report = await publish_http(events, port=port, batch_size=batch_size, connections=connections)
+    backlog_at_end = ingestor.stats()["backlog"]
+    ingestor.stop()
+    await flushing
+    report["end_to_end_seconds"] = time.perf_counter() - start
+    server.close()
+    await server.wait_closed()
+    stats = ingestor.stats()
+    stats["backlog_at_end"] = backlog_at_end
+    return report, stats
+
+
+async def malformed_requests():
+    """Status codes the daemon answers broken requests with"""
+    ingestor = SensorIngestor()
+    server = await serve_http(ingestor, port=0)
+    port = server.sockets[0].getsockname()[1]
+    statuses = []
+    for request in [b"GARBAGE\r\n\r\n", b"POST /events HTTP/1.1\r\nContent-Length: ten\r\n\r\n",
+                    b"POST /events HTTP/1.1\r\nContent-Length: -1\r\n\r\n"]:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(request)
+        await writer.drain()
+        statuses.append(int((await reader.readline()).split()[1]))
+        writer.close()
+    server.close()
+    await server.wait_closed()
+    return statuses
+
+
+async def flaky_storage(events):
+    """Ingest with a writer whose first two writes fail; returns the ingestor stats"""
+    calls = [0]
+
+    def writer(kind, df):
+        calls[0] += 1
+        if calls[0] <= 2:
+            raise OSError("storage unavailable")
+        storage_writer(kind, df)
+
+    ingestor = SensorIngestor(writer=writer, retry_delay=0.05)
+    flushing = asyncio.create_task(ingestor.run())
+    ingestor.submit_many(events)
+    while ingestor.stats()["backlog"]:
+        await asyncio.sleep(0.01)
+    ingestor.stop()
+    await flushing
+    return ingestor.stats()
+
+
+def row_per_write(events):
+    """The naive alternative: append every event to storage as it arrives"""
+    start = time.perf_counter()
+    for event in events:
+        df, _ = events_to_frame([event], event["type"])
+        append_table(df, EVENT_TABLES[event["type"]])
+    return time.perf_counter() - start
+
+
+def main(households=500, days=2):
+    events = simulated_events(make_population(households), days=days, seed=1)
+    # A few broken readings the cleaning rules must handle
+    events[10] = dict(events[10], timestamp="not a time")
+    water = next(i for i, e in enumerate(events) if e["type"] == "water" and i > 10)
+    events[water] = {k: v for k, v in events[water].items() if k != "water_level_percent"}
+    feeding = next(i for i, e in enumerate(events) if e["type"] == "feeding" and i > 10)
+    events[feeding] = dict(events[feeding], food_amount=-5.0)
+    print(f"{len(events):,} events from {households * 2} cats over {days} day(s)\n")
+
+    work = tempfile.mkdtemp()
+    cwd = os.getcwd()
+    os.environ["CAT_CARE_STORAGE"] = "sqlite"
+    failures = []
+    try:
+        os.chdir(work)
+        os.makedirs("data")
+
+        sample = events[:1000]
+        seconds = row_per_write(sample)
+        print(f"{'one write per event':<28} {len(sample) / seconds:10,.0f} events/s  (first {len(sample)} events)")
+        for batch_size, connections in [(1, 16), (100, 8)]:
+            for table in EVENT_TABLES.values():
+                drop_table(table)
+            invalidate_cache()
+            report, stats = asyncio.run(ingest(events, batch_size, connections))
+            rate = stats["written"] / report["end_to_end_seconds"]
+            print(f"{f'daemon, {batch_size} event(s)/request':<28} {rate:10,.0f} events/s  "
+                  f"accepting {report['accepted'] / report['seconds']:9,.0f}/s  batches {stats['batches']:3d}  "
+                  f"max latency {stats['max_latency_seconds']:.3f}s  backlog when sensors stopped "
+                  f"{stats['backlog_at_end']}")
+        print(f"\ningestor: {stats}")
+
+        # Stored rows equal the batch-cleaned events
+        expected = pd.DataFrame(events)
+        expected['timestamp'] = pd.to_datetime(expected['timestamp'], errors='coerce')
+        expected = expected[expected['timestamp'].notna()]
+        for kind, clean, value in [("water", clean_water_data, "water_level_percent"),
+                                   ("feeding", clean_feeding_data, "food_amount")]:
+            want = clean(expected[expected['type'] == kind]).sort_values(['household', 'cat_name', 'timestamp'])
+            got = load_table(EVENT_TABLES[kind]).sort_values(['household', 'cat_name', 'timestamp'])
+            if len(got) != len(want) or not (got[value].to_numpy() == want[value].to_numpy()).all():
+                failures.append(f"{kind}: stored rows differ from the cleaned events")
+            if (got[value] < 0).any() or got[value].isna().any():
+                failures.append(f"{kind}: cleaning rules not applied")
+        if stats["rejected"] != 1:
+            failures.append(f"expected 1 rejected event, got {stats['rejected']}")
+        if stats["max_latency_seconds"] > SensorIngestor().max_latency + 1.0:
+            failures.append("write latency not bounded")
+        if load_table("water").shape[0] or load_table("feeding").shape[0]:
+            failures.append("sensor rows written to the tracker's own water/feeding tables")
+
+        statuses = asyncio.run(malformed_requests())
+        if statuses != [400, 400, 400]:
+            failures.append(f"malformed requests answered {statuses}, expected 400s")
+
+        for table in EVENT_TABLES.values():
+            drop_table(table)
+        sample = [e for e in events[:2000] if e is not events[10]]
+        flaky = asyncio.run(flaky_storage(sample))
+        stored = sum(len(load_table(table)) for table in EVENT_TABLES.values())
+        print(f"storage failing twice: {flaky['retried']} events retried, {stored} of {len(sample)} stored")
+        if flaky["failed"] or stored != flaky["written"] or flaky["written"] + flaky["rejected"] != len(sample):
+            failures.append(f"events lost after storage errors: {flaky}")
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(work, ignore_errors=True)
+
+    print("\nChecks:", "OK" if not failures else "FAILED")
+    for failure in failures:
+        print(" -", failure)
+    return len(failures)
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    sys.exit(1 if main(*args) else 0)
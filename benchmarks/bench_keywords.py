@@ -0,0 +1,105 @@
+# benchmarks/bench_keywords.py
+### Cat keyword interpretation and keyword extraction vs. the previous loops
+### (best of `rounds` runs each, since timings on shared machines are noisy)
+### Usage: python benchmarks/bench_keywords.py [num_notes] [rounds]
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import gc
+import time
+from bench_sentiment import make_notes
+from modules.nlp_utils import (NEGATIVE_KEYWORDS, POSITIVE_KEYWORDS, find_cat_keywords,
+                               get_cat_specific_interpretation, analyze_notes_batch,
+                               extract_keywords, extract_keywords_batch, keyword_totals)
+
+
+# ============ PREVIOUS IMPLEMENTATIONS (baseline) ============
+
+def legacy_interpretation(text):
+    text_lower = text.lower()
+    negative_count = sum(1 for keyword in NEGATIVE_KEYWORDS if keyword in text_lower)
+    positive_count = sum(1 for keyword in POSITIVE_KEYWORDS if keyword in text_lower)
+    if negative_count > positive_count:
+        return "negative", negative_count
+    elif positive_count > negative_count:
+        return "positive", positive_count
+    else:
+        return "neutral", 0
+
+
+def legacy_extract_keywords(text, top_n=5):
+    words = text.lower().split()
+    stop_words = {"the", "is", "a", "and", "of", "in", "to", "for"}
+    keywords = [w for w in words if w not in stop_words]
+    freq = {}
+    for w in keywords:
+        freq[w] = freq.get(w, 0) + 1
+    sorted_words = sorted(freq.items(), key=lambda x: x[1], reverse=True)
+    return [w[0] for w in sorted_words[:top_n]]
+
+
+# Notes that stress overlaps and case
+EDGE_NOTES = [
+    "Not eating well today", "NOT DRINKING, weak and SICK", "bleeding? blood!",
+    "inactive but alert", "", "playful playful playful", "Eating well, good appetite, not eating",
+]
+
+
+def timed(label, num_notes, func, rounds):
+    # Results of earlier cases stay alive for the comparisons; freezing them
+    # keeps the garbage collector from rescanning them during later cases
+    gc.collect()
+    gc.freeze()
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{label:<32} {best:8.3f}s  {num_notes / best:12,.0f} notes/s")
+    return result, best
+
+
+def main(num_notes=200_000, rounds=3):
+    notes = make_notes(num_notes) + EDGE_NOTES
+    # Mostly distinct notes, like years of free-text history
+    notes = [f"{note} #{i}" for i, note in enumerate(notes)]
+    print(f"Processing {len(notes):,} notes, best of {rounds}\n")
+    failures = []
+
+    old, _ = timed("interpretation, substring loop", len(notes),
+                   lambda: [legacy_interpretation(n) for n in notes], rounds)
+    new, _ = timed("interpretation, per note", len(notes),
+                   lambda: [get_cat_specific_interpretation(n) for n in notes], rounds)
+    batch, _ = timed("interpretation, batch", len(notes),
+                     lambda: analyze_notes_batch(notes, method="keywords"), rounds)
+    timed("phrases with positions", len(notes),
+          lambda: [find_cat_keywords(n) for n in notes], rounds)
+    batch = list(zip(batch['sentiment'].str.lower(), batch['score']))
+    print(f"  same results: {old == new == batch}\n")
+    if not old == new == batch:
+        failures.append("interpretation results differ")
+
+    old, old_s = timed("keywords, dict loop", len(notes),
+                       lambda: [legacy_extract_keywords(n) for n in notes], rounds)
+    new, new_s = timed("keywords, per note", len(notes),
+                       lambda: [extract_keywords(n) for n in notes], rounds)
+    batch, batch_s = timed("keywords, batch", len(notes),
+                           lambda: extract_keywords_batch(notes), rounds)
+    timed("corpus keyword totals", len(notes), lambda: keyword_totals(notes), rounds)
+    print(f"  same results: {old == new == batch.tolist()}")
+    if not old == new == batch.tolist():
+        failures.append("keyword results differ")
+    if max(new_s, batch_s) > old_s:
+        failures.append("keyword extraction is slower than the dict loop")
+
+    print("\nChecks:", "OK" if not failures else "FAILED")
+    for failure in failures:
+        print(" -", failure)
+    return len(failures)
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    sys.exit(1 if main(*args) else 0)
@@ -0,0 +1,77 @@
+# benchmarks/bench_sentiment.py
+### Throughput benchmark for batch note scoring vs. one note at a time
+### Usage: python benchmarks/bench_sentiment.py [num_notes] [batch_size]
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault("CAT_CARE_SENTIMENT_CACHE", "")  # memory-only cache, no files
+
+import time
+import numpy as np
+from modules.nlp_utils import (analyze_text_sentiment, get_cat_specific_interpretation,
+                               analyze_notes_batch)
+from modules.sentiment_cache import get_sentiment_cache
+
+SAMPLE_NOTES = [
+    "Playful and energetic today, ate well",
+    "Cat eats too much and vomits frequently",
+    "Very lethargic, not playing, seems depressed",
+    "Purring a lot, very affectionate and happy",
+    "Hiding under bed, refuses to come out",
+    "Fresh water",
+    "Morning meal",
+    "Coughing and sneezing a lot",
+    "Curious and exploring, seems healthy",
+    "Laser pointer",
+]
+
+
+def make_notes(num_notes, seed=0):
+    """Build a realistic, repetitive set of notes with some unique suffixes"""
+    rng = np.random.default_rng(seed)
+    picks = rng.integers(0, len(SAMPLE_NOTES), num_notes)
+    suffixes = rng.integers(0, 500, num_notes)
+    return [f"{SAMPLE_NOTES[p]} (day {s})" for p, s in zip(picks, suffixes)]
+
+
+def timed(label, num_notes, func):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<32} {elapsed:8.3f}s  {num_notes / elapsed:12,.0f} notes/s")
+
+
+def main(num_notes=10_000, batch_size=32):
+    notes = make_notes(num_notes)
+    print(f"Scoring {num_notes:,} notes (batch_size={batch_size})\n")
+
+    timed("keywords, one by one", num_notes,
+          lambda: [get_cat_specific_interpretation(n) for n in notes])
+    timed("keywords, batch", num_notes,
+          lambda: analyze_notes_batch(notes, method="keywords"))
+    cache = get_sentiment_cache()
+    cache.clear()
+    timed("textblob, one by one", num_notes,
+          lambda: [analyze_text_sentiment(n) for n in notes])
+    cache.clear()
+    timed("textblob, batch", num_notes,
+          lambda: analyze_notes_batch(notes, method="textblob"))
+    timed("textblob, batch, warm cache", num_notes,
+          lambda: analyze_notes_batch(notes, method="textblob"))
+    print(f"  cache: {cache.stats()}")
+
+    try:
+        import transformers  # noqa: F401
+    except ImportError:
+        print("\ntransformers not installed, skipping the transformer benchmark")
+        return
+    cache.clear()
+    timed("transformer, batch", num_notes,
+          lambda: analyze_notes_batch(notes, method="transformer", batch_size=batch_size))
+    timed("transformer, batch, warm cache", num_notes,
+          lambda: analyze_notes_batch(notes, method="transformer", batch_size=batch_size))
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    main(*args)
@@ -0,0 +1,144 @@
+# benchmarks/bench_sentiment_backends.py
+### Accuracy parity, latency and memory of the sentiment inference backends
+### Usage: python benchmarks/bench_sentiment_backends.py [backend ...] [--repeat N] [--save]
+### (default backends: pytorch quantized onnx; the onnx backend needs an export,
+###  see modules/model_registry.export_onnx; --save records the results in
+###  benchmarks/baselines/sentiment_backends.json; exit 1 if a backend fails or drifts)
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+import subprocess
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+LABELED_NOTES = os.path.join(ROOT, "data", "labeled_cat_notes.csv")
+RESULTS_PATH = os.path.join(ROOT, "benchmarks", "baselines", "sentiment_backends.json")
+
+# Largest allowed drop in accuracy and disagreement with the fp32 pipeline
+MAX_ACCURACY_DROP = 0.03
+MAX_DISAGREEMENT = 0.05
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process in MB"""
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def run_backend(backend, repeat):
+    """Score the labeled notes on one backend (run in its own process for clean memory numbers)"""
+    import pandas as pd
+    from modules.model_registry import get_sentiment_pipeline, registry_stats
+
+    notes = pd.read_csv(LABELED_NOTES)
+    texts = notes['note'].tolist()
+    baseline_mb = peak_rss_mb()
+
+    start = time.perf_counter()
+    pipe = get_sentiment_pipeline(backend)
+    load_seconds = time.perf_counter() - start
+
+    outputs = pipe(texts, batch_size=16, truncation=True)  # also warms up
+    single = []
+    for text in texts[:10] * repeat:
+        start = time.perf_counter()
+        pipe(text)
+        single.append(time.perf_counter() - start)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        pipe(texts, batch_size=16, truncation=True)
+    batch_seconds = (time.perf_counter() - start) / repeat
+
+    single.sort()
+    return {
+        "backend": backend,
+        "labels": [o['label'] for o in outputs],
+        "scores": [float(o['score']) for o in outputs],
+        "accuracy": round(float((pd.Series([o['label'] for o in outputs]) == notes['label']).mean()), 3),
+        "load_s": round(load_seconds, 2),
+        "p50_ms": round(single[len(single) // 2] * 1000, 2),
+        "p95_ms": round(single[int(len(single) * 0.95)] * 1000, 2),
+        "notes_per_s": round(len(texts) / batch_seconds, 1),
+        "model_mb": round(peak_rss_mb() - baseline_mb, 1),
+        "model_version": next(iter(registry_stats()), {}).get("version"),
+    }
+
+
+def save_results(results):
+    """Record the measured backends with the weights and library versions they ran on"""
+    import platform
+    from modules.model_registry import LOCAL_MODEL_PATH, SENTIMENT_MODEL
+    record = {
+        "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "model": LOCAL_MODEL_PATH or SENTIMENT_MODEL,
+        "notes_file": os.path.relpath(LABELED_NOTES, ROOT),
+        "machine": f"{platform.machine()} / {os.cpu_count()} CPUs / Python {platform.python_version()}",
+        "backends": {backend: {key: value for key, value in r.items() if key not in ("labels", "scores")}
+                     for backend, r in results.items()},
+    }
+    os.makedirs(os.path.dirname(RESULTS_PATH), exist_ok=True)
+    with open(RESULTS_PATH, "w") as f:
+        json.dump(record, f, indent=2)
+    print(f"Results saved to {os.path.relpath(RESULTS_PATH, ROOT)}")
+
+
+def main(backends=("pytorch", "quantized", "onnx"), repeat=5, save=False):
+    results = {}
+    failures = 0
+    for backend in backends:
+        proc = subprocess.run([sys.executable, __file__, "--worker", backend, "--repeat", str(repeat)],
+                              cwd=ROOT, capture_output=True, text=True)
+        if proc.returncode != 0:
+            lines = proc.stderr.strip().splitlines() or ["no output"]
+            print(f"{backend:<10} FAILED: {lines[-1]}")
+            failures += 1
+            continue
+        results[backend] = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    print(f"\n{'backend':<10} {'accuracy':>8} {'agree':>6} {'max Δscore':>10} {'load s':>7} "
+          f"{'p50 ms':>7} {'p95 ms':>7} {'notes/s':>8} {'+MB':>7}")
+    reference = results.get("pytorch")
+    for backend, r in results.items():
+        agree, drift = 1.0, 0.0
+        if reference:
+            same = [a == b for a, b in zip(r['labels'], reference['labels'])]
+            agree = sum(same) / len(same)
+            drift = max(abs(a - b) for a, b, s in zip(r['scores'], reference['scores'], same) if s) \
+                if any(same) else 1.0
+            if reference['accuracy'] - r['accuracy'] > MAX_ACCURACY_DROP or \
+                    1 - agree > MAX_DISAGREEMENT:
+                failures += 1
+            r['agreement'], r['max_score_drift'] = round(agree, 3), round(drift, 4)
+        print(f"{backend:<10} {r['accuracy']:8.3f} {agree:6.3f} {drift:10.4f} {r['load_s']:7.2f} "
+              f"{r['p50_ms']:7.2f} {r['p95_ms']:7.2f} {r['notes_per_s']:8.1f} {r['model_mb']:7.1f}")
+
+    if not reference:
+        print("\nNo pytorch (fp32) result, parity not checked")
+        failures += len(results)
+    else:
+        print(f"\nParity (accuracy drop ≤ {MAX_ACCURACY_DROP}, disagreement ≤ {MAX_DISAGREEMENT}): "
+              f"{'OK' if not failures else f'{failures} backend(s) FAILED'}")
+    if save and results and not failures:
+        save_results(results)
+    elif save:
+        print("Not saving: every backend must run and pass the parity check")
+    return failures
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    repeat = 5
+    save = "--save" in args
+    if save:
+        args.remove("--save")
+    if "--repeat" in args:
+        i = args.index("--repeat")
+        repeat = int(args[i + 1])
+        del args[i:i + 2]
+    if args[:1] == ["--worker"]:
+        print(json.dumps(run_backend(args[1], repeat)))
+    else:
+        sys.exit(1 if main(tuple(args) or ("pytorch", "quantized", "onnx"), repeat, save) else 0)
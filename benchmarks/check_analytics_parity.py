@@ -0,0 +1,205 @@
+# benchmarks/check_analytics_parity.py
+### Locks the outputs of the shared analytics functions (modules/visualization.py,
+### daily_stats, simulation) against golden values, so faster implementations
+### can be swapped in safely, and checks tables read back as written on every
+### storage backend. Exits 1 on any difference.
+### Usage: python benchmarks/check_analytics_parity.py [--update]
+### (--update rewrites the golden file after an intended behaviour change)
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+import tempfile
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+from modules import visualization as viz
+from modules.daily_stats import DailyAggregator
+from modules.simulation import simulate_cat
+from modules.storage import get_backend
+
+GOLDEN_PATH = os.path.join(os.path.dirname(__file__), "golden", "analytics_parity.json")
+# Float tolerance: reordered arithmetic may change the last bits, nothing more
+RTOL, ATOL = 1e-9, 1e-9
+
+
+def to_plain(df):
+    """DataFrame -> JSON-friendly {column: values} (times as ISO strings)"""
+    out = {}
+    for column in df.columns:
+        values = df[column]
+        if pd.api.types.is_datetime64_any_dtype(values):
+            out[column] = values.dt.strftime("%Y-%m-%dT%H:%M:%S").tolist()
+        elif pd.api.types.is_timedelta64_dtype(values):
+            out[column] = (values.dt.total_seconds()).tolist()
+        elif pd.api.types.is_bool_dtype(values):
+            out[column] = values.astype(bool).tolist()
+        elif pd.api.types.is_numeric_dtype(values):
+            out[column] = values.astype(float).tolist()
+        else:
+            out[column] = values.astype(str).tolist()
+    return out
+
+
+def chart_data(fig):
+    """The plotted series of every axis (labels and y-values)"""
+    series = []
+    for ax in fig.axes:
+        for line in ax.get_lines():
+            series.append({"label": line.get_label(), "y": np.asarray(line.get_ydata(), dtype=float).tolist()})
+        for collection in ax.collections:
+            offsets = collection.get_offsets()
+            series.append({"label": collection.get_label(), "y": np.asarray(offsets)[:, 1].astype(float).tolist()
+                           if len(offsets) else []})
+        series.append({"label": "title", "y": ax.get_title()})
+    plt.close(fig)
+    return series
+
+
+def compute_outputs():
+    """Every locked output, from fixed seeds"""
+    outputs = {}
+    for method in ("vectorized", "reference"):
+        water = viz.generate_water_level_data("2024-12-13", days=7, rng=11, method=method)
+        outputs[f"generate_water_level_data[{method}]"] = to_plain(water)
+    sim = viz.simulate_water_levels("2024-12-13", days=3, n_bowls=3, rng=5, bowl_ml=750)
+    outputs["simulate_water_levels[3 bowls]"] = {"levels": np.round(sim["levels"], 9).tolist(),
+                                                 "cat_drinking": sim["cat_drinking"].tolist()}
+
+    water = viz.generate_water_level_data("2024-12-13", days=7, rng=11)
+    feeding = viz.generate_feeding_records("2024-12-13", days=7, rng=12)
+    outputs["generate_feeding_records"] = to_plain(feeding)
+    outputs["calculate_daily_water_consumption"] = to_plain(viz.calculate_daily_water_consumption(water))
+    outputs["calculate_daily_feeding_stats"] = to_plain(viz.calculate_daily_feeding_stats(feeding))
+
+    cat_water, cat_feeding = simulate_cat({"household": "h1", "cat_name": "Mimi",
+                                           "drinking_profile": "heavy", "bowl_ml": 300}, days=3, seed=3)
+    outputs["simulate_cat[water]"] = to_plain(cat_water)
+    outputs["simulate_cat[feeding]"] = to_plain(cat_feeding)
+    both = pd.concat([water.assign(cat_name="A"), cat_water.drop(columns="household")], ignore_index=True)
+    outputs["calculate_daily_water_consumption[by cat]"] = to_plain(
+        viz.calculate_daily_water_consumption(both, group_by="cat_name"))
+
+    # Incremental statistics fed in uneven chunks
+    aggregator = DailyAggregator("water", path="")
+    for chunk in np.array_split(np.arange(len(water)), [5, 50, 51, 120]):
+        aggregator.update(water.iloc[chunk])
+    outputs["DailyAggregator[water]"] = to_plain(aggregator.result())
+
+    levels = np.concatenate([np.arange(-5, 105, 0.5), [np.nan, 20.0, 20.05, 0.0, -0.0]])
+    outputs["check_water_alerts"] = [viz.check_water_alerts(level) for level in levels.tolist()]
+    outputs["classify_water_levels"] = viz.classify_water_levels(pd.Series(levels), threshold=20).astype(str).tolist()
+    outputs["water_alert_episodes"] = to_plain(viz.water_alert_episodes(water, threshold=70))
+    outputs["water_alert_episodes[by cat]"] = to_plain(
+        viz.water_alert_episodes(both, threshold=40, group_by="cat_name"))
+
+    outputs["plot_water_level_chart"] = chart_data(viz.plot_water_level_chart(water, alert_threshold=25))
+    outputs["plot_feeding_chart"] = chart_data(viz.plot_feeding_chart(feeding))
+    long_water = viz.generate_water_level_data("2024-01-01", days=120, rng=2)
+    outputs["plot_water_level_chart[downsampled]"] = chart_data(
+        viz.plot_water_level_chart(long_water, max_points=400))
+    return json.loads(json.dumps(outputs))  # same types as a reloaded golden file
+
+
+def storage_round_trips(water):
+    """
+    (written, read back, name) for every storage backend available here.
+
+    The appended reading is stamped exactly at midnight, which CSV files used
+    to store as a bare date that later reads could not parse.
+    """
+    midnight = water.iloc[[-1]].assign(timestamp=pd.Timestamp("2024-12-20 00:00:00"))
+    written = pd.concat([water, midnight], ignore_index=True)
+    pairs = []
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        os.makedirs("data")
+        try:
+            for name in ("csv", "parquet", "sqlite"):
+                try:
+                    backend = get_backend(name)
+                except ImportError:
+                    continue
+                backend.write(water, "water")
+                backend.append(midnight, "water")
+                backend.append(midnight.iloc[0:0], "water")
+                read = backend.read("water")[written.columns]
+                pairs.append((to_plain(written), to_plain(read), f"storage round trip, midnight row [{name}]"))
+        finally:
+            os.chdir(cwd)
+    return pairs
+
+
+def differences(expected, actual, path=""):
+    """Paths where actual differs from expected (floats compared with tolerance)"""
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        found = [f"{path}: keys {sorted(set(expected) ^ set(actual))}"] if set(expected) != set(actual) else []
+        for key in expected.keys() & actual.keys():
+            found += differences(expected[key], actual[key], f"{path}.{key}" if path else key)
+        return found
+    if isinstance(expected, list) and isinstance(actual, list):
+        if len(expected) != len(actual):
+            return [f"{path}: {len(actual)} items, expected {len(expected)}"]
+        if expected and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in expected + actual):
+            same = np.isclose(np.asarray(actual, dtype=float), np.asarray(expected, dtype=float),
+                              rtol=RTOL, atol=ATOL, equal_nan=True)
+            return [] if same.all() else [f"{path}: {int((~same).sum())} values differ "
+                                          f"(first at index {int(np.argmin(same))})"]
+        found = []
+        for i, (e, a) in enumerate(zip(expected, actual)):
+            found += differences(e, a, f"{path}[{i}]")
+            if len(found) > 5:
+                break
+        return found
+    if isinstance(expected, float) and isinstance(actual, (int, float)):
+        return [] if np.isclose(actual, expected, rtol=RTOL, atol=ATOL, equal_nan=True) else \
+            [f"{path}: {actual!r}, expected {expected!r}"]
+    return [] if expected == actual else [f"{path}: {actual!r}, expected {expected!r}"]
+
+
+def main(update=False):
+    outputs = compute_outputs()
+    if update or not os.path.exists(GOLDEN_PATH):
+        os.makedirs(os.path.dirname(GOLDEN_PATH), exist_ok=True)
+        with open(GOLDEN_PATH, "w") as f:
+            json.dump(outputs, f, indent=None, separators=(",", ":"))
+            f.write("\n")
+        print(f"Wrote {len(outputs)} golden outputs to {os.path.relpath(GOLDEN_PATH)}")
+        return 0
+
+    with open(GOLDEN_PATH) as f:
+        golden = json.load(f)
+    failures = 0
+    for name in sorted(golden.keys() | outputs.keys()):
+        if name not in outputs or name not in golden:
+            print(f"{name:<45} {'MISSING' if name not in outputs else 'NEW (run --update)'}")
+            failures += 1
+            continue
+        found = differences(golden[name], outputs[name])
+        print(f"{name:<45} {'OK' if not found else 'DIFFERS'}")
+        for line in found[:5]:
+            print("   -", line)
+        failures += bool(found)
+    print(f"\n{len(golden) - failures}/{len(golden)} outputs match the golden values")
+
+    # Fast and reference implementations must also agree with each other
+    pairs = [(outputs["generate_water_level_data[reference]"], outputs["generate_water_level_data[vectorized]"],
+              "water simulation: reference loop vs. vectorized"),
+             ([alert["severity"] for alert in outputs["check_water_alerts"]], outputs["classify_water_levels"],
+              "check_water_alerts vs. classify_water_levels"),
+             (outputs["calculate_daily_water_consumption"], outputs["DailyAggregator[water]"],
+              "calculate_daily_water_consumption vs. DailyAggregator")]
+    pairs += storage_round_trips(viz.generate_water_level_data("2024-12-13", days=7, rng=11))
+    for expected, actual, name in pairs:
+        found = differences(expected, actual)
+        print(f"{name:<60} {'OK' if not found else 'DIFFERS'}")
+        failures += bool(found)
+    return failures
+
+
+if __name__ == "__main__":
+    sys.exit(1 if main(update="--update" in sys.argv[1:]) else 0)
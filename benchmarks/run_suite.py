@@ -0,0 +1,306 @@
+# benchmarks/run_suite.py
+### Benchmark suite for the simulation, aggregation, I/O, NLP and chart hot paths,
+### parameterized by data size, compared against stored baselines (runs offline)
+### Usage: python benchmarks/run_suite.py [--quick] [--filter TEXT] [--threshold 0.5]
+###                                       [--baseline PATH] [--save]
+### --save stores the results as the new baseline; otherwise cases more than
+### --threshold slower than the baseline are reported and the exit code is 1
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault("CAT_CARE_SENTIMENT_CACHE", "")  # memory-only cache, no files
+
+import argparse
+import json
+import platform
+import shutil
+import tempfile
+import time
+import matplotlib
+matplotlib.use("Agg")
+import pandas as pd
+from bench_sentiment import make_notes
+from modules.data_loader import load_csv, save_csv, invalidate_cache
+from modules.nlp_utils import extract_keywords, extract_keywords_batch, get_cat_specific_interpretation
+from modules.simulation import make_population, simulate_population
+from modules.visualization import (generate_water_level_data, generate_feeding_records,
+                                   calculate_daily_water_consumption, calculate_daily_feeding_stats,
+                                   plot_water_level_chart, plot_feeding_chart,
+                                   render_chart_png, clear_render_cache)
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baselines", "baseline.json")
+DEFAULT_THRESHOLD = 0.5            # 50% slower than the baseline is a regression
+NOISE_FLOOR_SECONDS = 0.0002       # ... unless it is less than this in absolute terms
+TARGET_SECONDS = 0.2               # time each measurement for about this long
+RECHECKS = 2                       # extra measurements before a slowdown counts
+
+# Data sizes: 7 days -> 10 years, 1 -> 1000 cats
+DAYS = (7, 365, 3650)
+CATS = (1, 100, 1000)
+NOTES = (100, 10_000, 100_000)
+
+CASES = []   # (group, name, param, value, setup); setup(value) returns the timed callable
+
+
+def case(group, param, values):
+    """Register a benchmark: the decorated setup(value) returns the function to time"""
+    def register(setup):
+        for value in values:
+            CASES.append((group, setup.__name__, param, value, setup))
+        return setup
+    return register
+
+
+def population_water(cats, days=30):
+    """Water table of `cats` simulated cats"""
+    frames = []
+    simulate_population(make_population(max(1, cats // 2), cats_per_household=min(cats, 2)),
+                        days=days, workers=0, sink=lambda water, feeding: frames.append((water, feeding)))
+    return (pd.concat([w for w, _ in frames], ignore_index=True),
+            pd.concat([f for _, f in frames], ignore_index=True))
+
+
+# ============ SIMULATION ============
+
+@case("simulation", "days", DAYS)
+def generate_water(days):
+    return lambda: generate_water_level_data(days=days, rng=0)
+
+
+@case("simulation", "days", DAYS)
+def generate_feeding(days):
+    return lambda: generate_feeding_records(days=days, rng=0)
+
+
+@case("simulation", "cats", CATS)
+def simulate_population_7d(cats):
+    population = make_population(max(1, cats // 2), cats_per_household=min(cats, 2))
+    return lambda: simulate_population(population, days=7, workers=0, sink=lambda water, feeding: None)
+
+
+# ============ AGGREGATION ============
+
+@case("aggregation", "days", DAYS)
+def daily_water_stats(days):
+    water = generate_water_level_data(days=days, rng=0)
+    return lambda: calculate_daily_water_consumption(water)
+
+
+@case("aggregation", "days", DAYS)
+def daily_feeding_stats(days):
+    feeding = generate_feeding_records(days=days, rng=0)
+    return lambda: calculate_daily_feeding_stats(feeding)
+
+
+@case("aggregation", "cats", CATS)
+def daily_water_stats_by_cat_30d(cats):
+    water, _ = population_water(cats)
+    return lambda: calculate_daily_water_consumption(water, group_by=["household", "cat_name"])
+
+
+@case("aggregation", "cats", CATS)
+def daily_feeding_stats_by_cat_30d(cats):
+    _, feeding = population_water(cats)
+    return lambda: calculate_daily_feeding_stats(feeding, group_by=["household", "cat_name"])
+
+
+# ============ I/O (CSV files growing with history and cats) ============
+
+_WORK_DIR = tempfile.mkdtemp(prefix="cat_care_bench_")
+
+
+def _csv_frame(param, value):
+    if param == "days":
+        return generate_water_level_data(days=value, rng=0)
+    return population_water(value)[0]
+
+
+@case("io", "days", DAYS)
+def save_csv_water(days):
+    df, path = _csv_frame("days", days), os.path.join(_WORK_DIR, f"save_{days}d.csv")
+    return lambda: save_csv(df, path)
+
+
+@case("io", "cats", CATS)
+def save_csv_water_30d(cats):
+    df, path = _csv_frame("cats", cats), os.path.join(_WORK_DIR, f"save_{cats}c.csv")
+    return lambda: save_csv(df, path)
+
+
+def _cold_load(path):
+    def run():
+        invalidate_cache(path)
+        return load_csv(path)
+    return run
+
+
+@case("io", "days", DAYS)
+def load_csv_water(days):
+    path = os.path.join(_WORK_DIR, f"load_{days}d.csv")
+    save_csv(_csv_frame("days", days), path)
+    return _cold_load(path)
+
+
+@case("io", "cats", CATS)
+def load_csv_water_30d(cats):
+    path = os.path.join(_WORK_DIR, f"load_{cats}c.csv")
+    save_csv(_csv_frame("cats", cats), path)
+    return _cold_load(path)
+
+
+# ============ NLP ============
+
+@case("nlp", "notes", NOTES[:2])
+def extract_keywords_each(notes):
+    texts = make_notes(notes, seed=1)
+    return lambda: [extract_keywords(text) for text in texts]
+
+
+@case("nlp", "notes", NOTES)
+def extract_keywords_batched(notes):
+    texts = pd.Series(make_notes(notes, seed=1))
+    return lambda: extract_keywords_batch(texts)
+
+
+@case("nlp", "notes", NOTES[:2])
+def cat_specific_interpretation(notes):
+    texts = make_notes(notes, seed=1)
+    return lambda: [get_cat_specific_interpretation(text) for text in texts]
+
+
+# ============ CHARTS (render cache cleared, so every call draws) ============
+
+def _render(plot_func, df, **params):
+    def run():
+        clear_render_cache()
+        return render_chart_png(plot_func, df, **params)
+    return run
+
+
+@case("charts", "days", DAYS)
+def water_level_chart(days):
+    return _render(plot_water_level_chart, generate_water_level_data(days=days, rng=0))
+
+
+@case("charts", "days", DAYS)
+def feeding_chart(days):
+    return _render(plot_feeding_chart, generate_feeding_records(days=days, rng=0))
+
+
+# ============ RUNNER ============
+
+def measure(func):
+    """Best time per call in seconds, over a few rounds of about TARGET_SECONDS each"""
+    start = time.perf_counter()
+    func()  # warm-up, also estimates the cost of one call
+    once = time.perf_counter() - start
+    loops = max(1, int(TARGET_SECONDS / max(once, 1e-9)))
+    rounds = 1 if once > 2 else 3 if once > TARGET_SECONDS else 5
+    best = once
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        best = min(best, (time.perf_counter() - start) / loops)
+    return best
+
+
+def machine_info():
+    return {"python": platform.python_version(), "platform": platform.platform(),
+            "processor": platform.processor() or platform.machine(), "cpus": os.cpu_count(),
+            "pandas": pd.__version__}
+
+
+def format_seconds(seconds):
+    if seconds is None:
+        return "-"
+    return f"{seconds * 1000:10.3f} ms" if seconds < 1 else f"{seconds:10.3f} s "
+
+
+def run(cases, baseline, threshold):
+    """Time every case and compare it with the baseline; returns (results, regressions)"""
+    results, regressions = {}, []
+    print(f"{'case':<48} {'baseline':>13} {'current':>13} {'change':>8}  status")
+    group = None
+    for case_group, name, param, value, setup in cases:
+        if case_group != group:
+            group = case_group
+            print(f"-- {group}")
+        key = f"{name}[{param}={value}]"
+        func = setup(value)
+        seconds = measure(func)
+        before = baseline.get(key)
+        # A slow reading may be noise (other processes, CPU boost): measure again
+        for _ in range(RECHECKS):
+            if before is None or seconds <= before * (1 + threshold):
+                break
+            seconds = min(seconds, measure(func))
+        results[key] = seconds
+        if before is None:
+            change, status = "", "new"
+        else:
+            ratio = seconds / before - 1
+            change = f"{ratio:+7.0%}"
+            if ratio > threshold and seconds - before > NOISE_FLOOR_SECONDS:
+                status = "REGRESSED"
+                regressions.append((key, before, seconds))
+            elif ratio < -threshold:
+                status = "faster"
+            else:
+                status = "ok"
+        print(f"{key:<48} {format_seconds(before):>13} {format_seconds(seconds):>13} {change:>8}  {status}")
+    return results, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark suite with baseline comparison")
+    parser.add_argument("--quick", action="store_true", help="skip the largest size of every case")
+    parser.add_argument("--filter", default="", help="only cases whose name contains this text")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="relative slowdown reported as a regression (default: 0.5; shared machines vary by ~30%)")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="baseline JSON file")
+    parser.add_argument("--save", action="store_true", help="store these results as the baseline")
+    args = parser.parse_args()
+
+    largest = {}
+    for _, name, _, value, _ in CASES:
+        largest[name] = max(largest.get(name, value), value)
+    cases = [c for c in CASES if args.filter in c[1]
+             and not (args.quick and c[3] == largest[c[1]])]
+
+    stored = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            stored = json.load(f)
+    if stored and stored.get("machine") != machine_info():
+        print(f"Note: baseline recorded on a different machine/setup ({stored.get('machine')}); "
+              "compare with care or re-run with --save\n")
+
+    try:
+        results, regressions = run(cases, stored.get("results", {}), args.threshold)
+    finally:
+        shutil.rmtree(_WORK_DIR, ignore_errors=True)
+
+    if args.save:
+        # Keep baseline entries of cases that were filtered out this time
+        merged = dict(stored.get("results", {}), **results)
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump({"machine": machine_info(), "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+                       "results": dict(sorted(merged.items()))}, f, indent=2)
+            f.write("\n")
+        print(f"\nSaved {len(results)} results to {os.path.relpath(args.baseline)}")
+        return 0
+
+    if not stored:
+        print("\nNo baseline yet; run with --save to store one")
+        return 0
+    print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}")
+    for key, before, after in regressions:
+        print(f" - {key}: {format_seconds(before).strip()} -> {format_seconds(after).strip()} "
+              f"({after / before:.2f}x)")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
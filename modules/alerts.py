@@ -0,0 +1,217 @@
+# modules/alerts.py
+import math
+import threading
+import numpy as np
+import pandas as pd
+
+# Severities as numbers so escalation is a comparison
+NORMAL, WARNING, CRITICAL = 0, 1, 2
+SEVERITY_NAMES = ("NORMAL", "WARNING", "CRITICAL")
+
+# Same thresholds as check_water_alerts
+DEFAULT_THRESHOLD = 20
+CRITICAL_THRESHOLD = 0
+# A bowl only counts as recovered this many points above the threshold
+DEFAULT_HYSTERESIS = 5
+# No repeat notification of the same severity for a bowl within this time
+DEFAULT_COOLDOWN_SECONDS = 30 * 60
+
+
+def alert_message(severity, level):
+    """Notification text, worded like check_water_alerts"""
+    if severity == CRITICAL:
+        return '🚨 CRITICAL: Water bowl is empty! Refill immediately!' if level <= 0 else \
+            f'🚨 CRITICAL: Water bowl is almost empty ({level:.1f}%)! Refill immediately!'
+    if severity == WARNING:
+        return f'⚠️ WARNING: Water level is low ({level:.1f}%). Please refill soon.'
+    return f'✅ Water level is adequate again ({level:.1f}%).'
+
+
+def _seconds(timestamp):
+    """Reading time as seconds since the epoch (numbers are taken as seconds)"""
+    if timestamp is None:
+        return 0.0
+    if isinstance(timestamp, (int, float)):
+        return float(timestamp)
+    return pd.Timestamp(timestamp).value / 1e9
+
+
+class AlertEngine:
+    """
+    Streaming low-water alerts for any number of bowls.
+
+    Every reading is evaluated as it arrives with constant work per reading
+    (one dictionary lookup and a few comparisons). Each bowl has a state:
+    - it escalates as soon as a reading crosses a threshold
+    - it only drops back once the level is `hysteresis` points above the
+      threshold, so a level hovering around 20% does not flap
+    Notifications are sent on escalation (and on recovery of a notified
+    alert); a bowl is not notified again at the same or a lower severity
+    within `cooldown` seconds of reading time, which deduplicates and
+    rate-limits them.
+    """
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD, critical=CRITICAL_THRESHOLD,
+                 hysteresis=DEFAULT_HYSTERESIS, cooldown=DEFAULT_COOLDOWN_SECONDS,
+                 notify=None, notify_recovery=True):
+        self.cooldown = cooldown
+        self.notify = notify
+        self.notify_recovery = notify_recovery
+        self._default = (threshold, critical, hysteresis)
+        self._thresholds = {}   # bowl key -> (threshold, critical, hysteresis)
+        # bowl key -> [state, last notified time, last notified severity, alert open]
+        self._bowls = {}
+        self._lock = threading.Lock()
+        self._stats = {"readings": 0, "transitions": 0, "notifications": 0, "suppressed": 0}
+
+    def set_threshold(self, key, threshold=None, critical=None, hysteresis=None):
+        """
+        Use different limits for one bowl (e.g. a cat that needs more water).
+
+        Parameters:
+        - key: Bowl key, as passed to process() (e.g. (household, cat_name))
+        - threshold / critical / hysteresis: Limits in percent (default: the engine's)
+        """
+        default = self._default
+        self._thresholds[key] = (default[0] if threshold is None else threshold,
+                                 default[1] if critical is None else critical,
+                                 default[2] if hysteresis is None else hysteresis)
+
+    def process(self, key, level, timestamp=None):
+        """
+        Evaluate one reading.
+
+        Parameters:
+        - key: Bowl key (any hashable, e.g. (household, cat_name))
+        - level: Water level in percent
+        - timestamp: Reading time (datetime, string or epoch seconds)
+
+        Returns:
+        - The notification dictionary if one was sent, otherwise None
+        """
+        with self._lock:
+            return self._process(key, level, _seconds(timestamp))
+
+    def _process(self, key, level, now):
+        """process() body; caller holds the lock and passes seconds"""
+        self._stats["readings"] += 1
+        bowl = self._bowls.get(key)
+        if bowl is None:
+            bowl = self._bowls[key] = [NORMAL, -math.inf, NORMAL, False]
+        threshold, critical, hysteresis = self._thresholds.get(key, self._default)
+        state = bowl[0]
+
+        if level <= critical:
+            new = CRITICAL
+        elif level <= threshold:
+            new = WARNING if state != CRITICAL or level > critical + hysteresis else CRITICAL
+        elif state == NORMAL or level > threshold + hysteresis:
+            new = NORMAL
+        else:
+            new = WARNING if state == WARNING or level > critical + hysteresis else CRITICAL
+        if new == state:
+            return None
+
+        bowl[0] = new
+        self._stats["transitions"] += 1
+        if new < state:
+            if new != NORMAL or not bowl[3]:
+                return None
+            bowl[3] = False
+            if not self.notify_recovery:
+                return None
+        elif now - bowl[1] < self.cooldown and new <= bowl[2]:
+            self._stats["suppressed"] += 1
+            return None
+        else:
+            bowl[1], bowl[2], bowl[3] = now, new, True
+
+        self._stats["notifications"] += 1
+        notification = {"key": key, "severity": SEVERITY_NAMES[new], "level": float(level),
+                        "timestamp": now, "message": alert_message(new, level)}
+        if self.notify is not None:
+            self.notify(notification)
+        return notification
+
+    def process_many(self, keys, levels, timestamps=None):
+        """
+        Evaluate readings in arrival order.
+
+        Parameters:
+        - keys: Bowl key of each reading
+        - levels: Water levels in percent
+        - timestamps: Reading times (datetime-like array or epoch seconds)
+
+        Returns:
+        - List of the notifications sent
+        """
+        if timestamps is None:
+            seconds = [0.0] * len(levels)
+        elif isinstance(timestamps, np.ndarray) and timestamps.dtype.kind in "if":
+            seconds = timestamps.tolist()
+        else:
+            seconds = (pd.to_datetime(pd.Series(timestamps)).astype("datetime64[ns]")
+                       .astype("int64") / 1e9).tolist()
+        if isinstance(levels, (np.ndarray, pd.Series)):
+            levels = levels.tolist()
+        process = self._process
+        with self._lock:
+            return [n for n in map(process, keys, levels, seconds) if n is not None]
+
+    def process_frame(self, df, key_columns=("household", "cat_name")):
+        """Evaluate the rows of a water table chunk (bowls keyed by key_columns)"""
+        if df.empty:
+            return []
+        columns = [c for c in key_columns if c in df.columns]
+        keys = list(zip(*(df[c].tolist() for c in columns))) if columns else ["bowl"] * len(df)
+        return self.process_many(keys, df["water_level_percent"].to_numpy(dtype=float),
+                                 df["timestamp"])
+
+    def state(self, key):
+        """Current severity name of a bowl ('NORMAL' for unknown bowls)"""
+        with self._lock:
+            bowl = self._bowls.get(key)
+            return SEVERITY_NAMES[bowl[0] if bowl else NORMAL]
+
+    def active_alerts(self):
+        """Dictionary of bowl key -> severity name for bowls not in NORMAL state"""
+        with self._lock:
+            return {key: SEVERITY_NAMES[bowl[0]] for key, bowl in self._bowls.items() if bowl[0]}
+
+    def stats(self):
+        """Readings, state changes, notifications sent and suppressed, bowls tracked"""
+        with self._lock:
+            return dict(self._stats, bowls=len(self._bowls),
+                        active=sum(1 for bowl in self._bowls.values() if bowl[0]))
+
+
+def alerting_writer(engine, writer=None):
+    """
+    Wrap an ingestion writer so water batches are run through an AlertEngine.
+
+    Usage:
+        SensorIngestor(writer=alerting_writer(get_alert_engine()))
+    """
+    if writer is None:
+        from modules.ingestion import storage_writer
+        writer = storage_writer
+
+    def write(kind, df):
+        writer(kind, df)
+        if kind == "water":
+            engine.process_frame(df)
+    return write
+
+
+# Process-wide, like the model registry
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_alert_engine():
+    """Return the shared alert engine"""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = AlertEngine(notify=lambda n: print(n["message"], n["key"]))
+        return _engine
@@ -1,15 +1,205 @@
 # modules/api_utils.py
-import requests
-
-def get_cat_camera_image(api_url, params=None):
-    """Fetch image from a cat camera API"""
-    try:
-        response = requests.get(api_url, params=params)
-        if response.status_code == 200:
-            return response.content  # return image bytes
+import asyncio
+import random
+import threading
+import time
+
+DEFAULT_TIMEOUT = 10.0
+
+# Polling many cameras (CameraClient)
+MAX_CONNECTIONS = 20
+MAX_CONCURRENCY = 10
+MAX_RETRIES = 3
+BACKOFF_SECONDS = 0.25
+MAX_BACKOFF_SECONDS = 30.0  # caps exponential backoff and a server's Retry-After
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# One HTTP client per thread: Streamlit runs each session in its own thread,
+# and sharing one connection pool between them is not safe
+_local = threading.local()
+
+
+def _thread_client():
+    client = getattr(_local, "client", None)
+    if client is None:
+        import httpx  # imported lazily, only camera pages need it
+        client = _local.client = httpx.Client(follow_redirects=True)  # like requests did
+    return client
+
+
+def get_cat_camera_image(api_url, params=None, timeout=DEFAULT_TIMEOUT):
+    """
+    Fetch one image from a cat camera API.
+
+    The calling thread's connection is reused between calls.
+
+    Returns:
+    - The image bytes
+
+    Raises:
+    - httpx.HTTPStatusError if the camera answers with an error status,
+      httpx.TimeoutException / httpx.TransportError if it cannot be reached
+    """
+    response = _thread_client().get(api_url, params=params, timeout=timeout)
+    response.raise_for_status()
+    return response.content
+
+
+class CameraClient:
+    """
+    Asynchronous client for polling many cat cameras.
+
+    One pooled httpx connection pool is kept open for the life of the client,
+    at most `concurrency` requests are in flight, failed requests are retried
+    with exponential backoff, and frames are fetched conditionally
+    (If-None-Match / If-Modified-Since) so unchanged images are not downloaded
+    again. A request only holds its concurrency slot while it is on the wire,
+    not while it waits to retry, and no wait is longer than max_backoff.
+
+    Usage:
+        async with CameraClient() as client:
+            frames = await client.fetch_many(urls)
+    """
+
+    def __init__(self, max_connections=MAX_CONNECTIONS, concurrency=MAX_CONCURRENCY,
+                 timeout=DEFAULT_TIMEOUT, retries=MAX_RETRIES, backoff=BACKOFF_SECONDS,
+                 max_backoff=MAX_BACKOFF_SECONDS, headers=None):
+        self.max_connections = max_connections
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.headers = dict(headers or {})
+        self._client = None
+        self._semaphore = None
+        # url -> (etag, last_modified, content) of the last frame downloaded
+        self._validators = {}
+        self._stats = {"requests": 0, "downloaded": 0, "not_modified": 0,
+                       "retries": 0, "failed": 0, "bytes": 0}
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def open(self):
+        import httpx  # imported lazily, only camera polling needs it
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_connections),
+                timeout=httpx.Timeout(self.timeout),
+                headers=self.headers,
+                follow_redirects=True,
+            )
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _conditional_headers(self, key):
+        etag, last_modified, _ = self._validators.get(key, (None, None, None))
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        return headers
+
+    def _delay(self, attempt, response=None):
+        """Exponential backoff with jitter, honouring a numeric Retry-After (both capped at max_backoff)"""
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), self.max_backoff)
+        return min(self.backoff * 2 ** attempt * random.uniform(0.5, 1.5), self.max_backoff)
+
+    async def fetch(self, api_url, params=None):
+        """
+        Fetch one camera frame.
+
+        Parameters:
+        - api_url: Camera image endpoint
+        - params: Optional query parameters
+
+        Returns:
+        - Dictionary with url, status, content (image bytes or None), changed
+          (False when the camera answered 304 and the previous frame is
+          returned), attempts, seconds and error
+        """
+        if self._client is None:
+            await self.open()
+        import httpx
+        key = str(httpx.URL(api_url, params=params))
+        frame = {"url": key, "status": None, "content": None, "changed": False,
+                 "attempts": 0, "seconds": 0.0, "error": None}
+        start = time.perf_counter()
+
+        for attempt in range(self.retries + 1):
+            frame["attempts"] = attempt + 1
+            response = None
+            # The slot is released before any backoff, so waiting retries
+            # don't keep other cameras from being polled
+            async with self._semaphore:
+                try:
+                    self._stats["requests"] += 1
+                    response = await self._client.get(key, headers=self._conditional_headers(key))
+                    frame["status"] = response.status_code
+                    if response.status_code not in RETRY_STATUSES:
+                        frame["error"] = None
+                        break
+                    frame["error"] = f"HTTP {response.status_code}"
+                except (httpx.TimeoutException, httpx.TransportError) as e:
+                    frame["error"] = f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+            if attempt < self.retries:
+                self._stats["retries"] += 1
+                await asyncio.sleep(self._delay(attempt, response))
+
+        frame["seconds"] = round(time.perf_counter() - start, 4)
+        status = frame["status"]
+        if frame["error"] is None and status == 304 and key in self._validators:
+            self._stats["not_modified"] += 1
+            frame["content"] = self._validators[key][2]
+        elif frame["error"] is None and status == 200:
+            self._stats["downloaded"] += 1
+            self._stats["bytes"] += len(response.content)
+            frame["content"] = response.content
+            frame["changed"] = True
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+            if etag or last_modified:
+                self._validators[key] = (etag, last_modified, response.content)
         else:
-            print("API request failed:", response.status_code)
-            return None
-    except Exception as e:
-        print("Error fetching API:", e)
-        return None
+            frame["error"] = frame["error"] or f"HTTP {status}"
+            self._stats["failed"] += 1
+        return frame
+
+    async def fetch_many(self, api_urls, params=None):
+        """Fetch every camera concurrently; returns frames in the order of api_urls"""
+        return await asyncio.gather(*(self.fetch(url, params) for url in api_urls))
+
+    def stats(self):
+        """Request, download, 304, retry and failure counts"""
+        return dict(self._stats, cached_frames=len(self._validators))
+
+
+def fetch_camera_images(api_urls, params=None, **client_options):
+    """
+    Synchronous helper: fetch many cameras once with a temporary CameraClient.
+
+    Parameters:
+    - api_urls: List of camera image endpoints
+    - params: Optional query parameters sent to every camera
+    - client_options: Passed to CameraClient (concurrency, timeout, retries, ...)
+
+    Returns:
+    - List of frame dictionaries (see CameraClient.fetch)
+    """
+    async def _run():
+        async with CameraClient(**client_options) as client:
+            return await client.fetch_many(api_urls, params)
+    return asyncio.run(_run())
@@ -0,0 +1,310 @@
+# modules/daily_stats.py
+import datetime
+import json
+import os
+import tempfile
+import threading
+import numpy as np
+import pandas as pd
+from modules.data_loader import load_json, load_table_after
+
+# Running per-day state for each kind of table. Everything else in the daily
+# statistics (means, rates, consumption) is derived from these on demand.
+STATE_COLUMNS = {
+    'water': ['first_level', 'last_level', 'min_level', 'level_sum', 'level_count',
+              'num_refills', 'drinking_events'],
+    'feeding': ['total_food', 'num_feedings', 'cat_present_count'],
+}
+
+STATE_DIR = "data"
+
+
+def _keys(group_by):
+    return ([group_by] if isinstance(group_by, str) else list(group_by or [])) + ['date']
+
+
+def _row_marker(row):
+    """Compact identity of one raw row, used to notice a replaced source frame"""
+    return [str(v) for v in row]
+
+
+def _partial_water(df, keys):
+    """Per-day state of a batch of water readings"""
+    grouped = df.groupby(keys, sort=False)
+    state = grouped.agg(
+        min_level=('water_level_percent', 'min'),
+        level_sum=('water_level_percent', 'sum'),
+        level_count=('water_level_percent', 'count'),
+        num_refills=('is_refill', 'sum'),
+        drinking_events=('cat_drinking', 'sum')
+    )
+    # First/last reading of each day (keeps NaN like iloc[0]/iloc[-1] would)
+    state['first_level'] = df.drop_duplicates(keys, keep='first').set_index(keys)['water_level_percent']
+    state['last_level'] = df.drop_duplicates(keys, keep='last').set_index(keys)['water_level_percent']
+    return state
+
+
+def _partial_feeding(df, keys):
+    """Per-day state of a batch of feeding records"""
+    return df.groupby(keys, sort=False).agg(
+        total_food=('food_amount', 'sum'),
+        num_feedings=('food_amount', 'size'),
+        cat_present_count=('cat_present', 'sum')
+    )
+
+
+class DailyAggregator:
+    """
+    Daily water/feeding statistics maintained incrementally.
+
+    Readings are folded into running per-day state (first/last/min level,
+    level sum and count, refill, drinking, food and presence counts), so an
+    update costs O(new rows) instead of a recompute over the whole history.
+    Rows are assumed to arrive in time order, like the append-only tables.
+    """
+
+    def __init__(self, kind, group_by=None, path=None):
+        if kind not in STATE_COLUMNS:
+            raise ValueError(f"Unknown statistics kind: {kind}")
+        self.kind = kind
+        self.keys = _keys(group_by)
+        self.path = path
+        # Reentrant: refresh() holds it across the read, update and save
+        self._lock = threading.RLock()
+        self.reset()
+
+    def reset(self):
+        """Forget all folded rows"""
+        with self._lock:
+            index = pd.MultiIndex.from_arrays([[] for _ in self.keys], names=self.keys)
+            self.state = pd.DataFrame(columns=STATE_COLUMNS[self.kind], index=index, dtype=float)
+            self.rows_seen = 0
+            self.last_marker = None
+            self.version = None  # storage version of the table the state was built from
+            self.cursor = None   # where the next read of the table starts (see load_table_after)
+
+    def update(self, rows):
+        """
+        Fold new raw rows (a DataFrame in the table's format) into the state.
+
+        Returns:
+        - Number of days whose statistics changed
+        """
+        if rows.empty:
+            return 0
+        df = rows.copy()
+        df['date'] = pd.to_datetime(df['timestamp']).dt.date
+        if self.kind == 'water':
+            df['is_refill'] = df['refill_event'] == True
+            partial = _partial_water(df, self.keys)
+        else:
+            partial = _partial_feeding(df, self.keys)
+        partial = partial[STATE_COLUMNS[self.kind]].astype(float)
+        if not isinstance(partial.index, pd.MultiIndex):
+            partial.index = pd.MultiIndex.from_arrays([partial.index], names=self.keys)
+
+        with self._lock:
+            self._merge(partial)
+            self.rows_seen += len(rows)
+            self.last_marker = _row_marker(rows.iloc[-1])
+        return len(partial)
+
+    def _merge(self, partial):
+        """Combine per-day partial state with the running state (only touched days)"""
+        known = partial.index.isin(self.state.index)
+        old = partial[known]
+        if len(old):
+            current = self.state.loc[old.index]
+            if self.kind == 'water':
+                merged = current.copy()
+                # first_level stays; the batch's readings come after the known ones
+                merged['last_level'] = old['last_level']
+                merged['min_level'] = np.fmin(current['min_level'], old['min_level'])
+                for column in ['level_sum', 'level_count', 'num_refills', 'drinking_events']:
+                    merged[column] = current[column] + old[column]
+            else:
+                merged = current + old
+            self.state.loc[old.index] = merged
+        if (~known).any():
+            new = partial[~known]
+            self.state = new if self.state.empty else pd.concat([self.state, new])
+
+    def sync(self, df):
+        """
+        Bring the state up to date with a full raw frame.
+
+        Only rows past the ones already folded are processed. If the frame
+        was replaced (fewer rows, or the last folded row changed), the state
+        is rebuilt from scratch.
+
+        Returns:
+        - True if anything changed
+        """
+        with self._lock:
+            if self.rows_seen and (len(df) < self.rows_seen or
+                                   _row_marker(df.iloc[self.rows_seen - 1]) != self.last_marker):
+                self.reset()
+            if len(df) == self.rows_seen:
+                return False
+            self.update(df.iloc[self.rows_seen:])
+            return True
+
+    def refresh(self, table):
+        """
+        Bring the state up to date with a stored table and persist it.
+
+        The table is only read when its storage version (file mtime/size or
+        database write counter) differs from the one the state was built
+        from, so unchanged tables cost one stat call. Then only the rows
+        appended since the last refresh are read (new SQLite rowids, new
+        Parquet parts, the end of the CSV file), so an update costs O(new
+        rows); a replaced table is read again once. The whole check, read
+        and save runs under the lock, so concurrent sessions never fold the
+        same rows twice.
+
+        Returns:
+        - True if anything changed
+        """
+        with self._lock:
+            version = table_version(table)
+            if version == self.version:
+                return False
+            if version is None:  # table deleted
+                self.reset()
+                changed = True
+            else:
+                delta = None if self.cursor is None else load_table_after(table, self.cursor)
+                rebuilt = delta is None
+                if rebuilt:  # first read, or the table was replaced
+                    self.reset()
+                    delta = load_table_after(table)
+                rows, self.cursor = delta
+                changed = self.update(rows) > 0 or rebuilt
+            self.version = version
+            self.save()
+            return changed
+
+    def result(self):
+        """Return daily statistics in the format of calculate_daily_water_consumption / _feeding_stats"""
+        with self._lock:
+            s = self.state.copy()
+        if self.kind == 'water':
+            daily = pd.DataFrame({
+                'total_consumed_percent': (100 * s['num_refills'] + (s['first_level'] - s['last_level'])).round(2),
+                'avg_level_percent': (s['level_sum'] / s['level_count']).round(2),
+                'min_level_percent': s['min_level'].round(2),
+                'num_refills': s['num_refills'].astype(int),
+                'drinking_events': s['drinking_events'].astype(int)
+            }, index=s.index)
+        else:
+            daily = pd.DataFrame({
+                'total_food_g': s['total_food'].round(1),
+                'num_feedings': s['num_feedings'].astype(int),
+                'cat_present_count': s['cat_present_count'].astype(int),
+                'presence_rate_percent': (s['cat_present_count'] / s['num_feedings'] * 100).round(1),
+                'avg_food_per_meal_g': (s['total_food'] / s['num_feedings']).round(1)
+            }, index=s.index)
+        return daily.reset_index()
+
+    def save(self):
+        """Persist the running state (a small JSON file next to the raw data)"""
+        if self.path is None:
+            return
+        with self._lock:
+            records = self.state.reset_index()
+            records['date'] = records['date'].astype(str)
+            data = {
+                'kind': self.kind,
+                'keys': self.keys,
+                'rows_seen': self.rows_seen,
+                'last_marker': self.last_marker,
+                'version': self.version,
+                'cursor': self.cursor,
+                # Column lists, not one dict per day: years of history stay a small file
+                'state': {column: values.astype(object).where(values.notna(), None).tolist()
+                          for column, values in records.items()}
+            }
+            # A unique temp file, so other processes saving the same state don't collide
+            directory = os.path.dirname(self.path) or "."
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(prefix=".", suffix=".tmp", dir=directory)
+            try:
+                # Compact json.dumps runs in C; save_json's indented output is
+                # written by the pure-Python encoder, slower than the update itself
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    f.write(json.dumps(data))
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                os.remove(tmp_path)
+                raise
+
+    def load(self):
+        """Restore persisted state; returns False (and starts empty) if there is none"""
+        data = load_json(self.path) if self.path else {}
+        if data.get('kind') != self.kind or data.get('keys') != self.keys:
+            return False
+        with self._lock:
+            self.reset()
+            if data['state']:
+                records = pd.DataFrame(data['state'])
+                records['date'] = [datetime.date.fromisoformat(d) for d in records['date']]
+                self.state = records.set_index(self.keys)[STATE_COLUMNS[self.kind]].astype(float)
+                if not isinstance(self.state.index, pd.MultiIndex):
+                    self.state.index = pd.MultiIndex.from_arrays([self.state.index], names=self.keys)
+            self.rows_seen = data['rows_seen']
+            self.last_marker = data['last_marker']
+            self.version = data.get('version')
+            self.cursor = data.get('cursor')
+        return True
+
+
+def table_version(table):
+    """Storage version of a table (None if it does not exist), in a JSON-comparable form"""
+    from modules.storage import get_backend, migrate_csv
+    backend = get_backend()
+    migrate_csv(table, backend)
+    if not backend.exists(table):
+        return None
+    return json.loads(json.dumps(backend.signature(table)))
+
+
+# Process-wide, so reruns and sessions share the running state
+_aggregators = {}
+_aggregators_lock = threading.Lock()
+
+
+def get_aggregator(table, group_by=None):
+    """
+    Return the shared aggregator of a table ("water" or "feeding"), restoring
+    its persisted state on first use.
+    """
+    key = (table, tuple(_keys(group_by)))
+    with _aggregators_lock:
+        aggregator = _aggregators.get(key)
+        if aggregator is None:
+            suffix = "" if not group_by else "_by_" + "_".join(_keys(group_by)[:-1])
+            path = os.path.join(STATE_DIR, f"{table}_daily_state{suffix}.json")
+            aggregator = DailyAggregator(table, group_by, path)
+            aggregator.load()
+            _aggregators[key] = aggregator
+        return aggregator
+
+
+def incremental_daily_stats(table, group_by=None):
+    """
+    Daily statistics of the stored water or feeding table, updated incrementally.
+
+    The statistics follow the table in storage (not a session's copy of it):
+    rows appended since the last call are folded in, a replaced table is
+    rebuilt once, and an unchanged table is not read at all.
+
+    Parameters:
+    - table: "water" or "feeding"
+    - group_by: Optional extra column(s), e.g. 'cat_name'
+
+    Returns:
+    - Same DataFrame as calculate_daily_water_consumption / calculate_daily_feeding_stats
+    """
+    aggregator = get_aggregator(table, group_by)
+    aggregator.refresh(table)
+    return aggregator.result()
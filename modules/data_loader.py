@@ -1,19 +1,376 @@
 # modules/data_loader.py
 import pandas as pd
+import csv
+import io
 import json
 import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+try:
+    import fcntl  # POSIX file locking
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# ============ LOAD CACHE ============
+# Process-wide, so every Streamlit session and rerun shares parsed frames.
+# Entries are keyed by path and validated against the file's mtime and size.
+
+CACHE_MAX_BYTES = 256 * 1024 * 1024
+CACHE_MAX_ENTRIES = 32
+
+_cache = OrderedDict()  # path -> (signature, DataFrame, nbytes)
+_cache_stats = {"hits": 0, "misses": 0, "evictions": 0}
+_cache_lock = threading.Lock()
+
+
+def _file_signature(path):
+    """(mtime, size) of a file, or of every visible file in a directory"""
+    if os.path.isdir(path):
+        return tuple(sorted(
+            (entry.name, entry.stat().st_mtime_ns, entry.stat().st_size)
+            for entry in os.scandir(path) if not entry.name.startswith(".")
+        ))
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _copy_on_write():
+    """True when pandas copies shared data lazily on modification"""
+    if int(pd.__version__.split(".")[0]) >= 3:
+        return True
+    return pd.options.mode.copy_on_write is True
+
+
+def _protect(df):
+    """Hand out a frame callers can modify without corrupting the cache"""
+    return df.copy(deep=not _copy_on_write())
+
+
+def cached_read(path, loader, signature=None):
+    """
+    Return loader() for path, reusing the last result while the file is unchanged.
+
+    Parameters:
+    - path: File or directory the data comes from (used as key and for mtime/size)
+    - loader: Zero-argument function that reads and returns a DataFrame
+    - signature: Version marker to use instead of the file's mtime/size
+      (e.g. a per-table write counter for database backends)
+
+    Returns:
+    - A private copy of the (possibly cached) DataFrame
+    """
+    key = os.path.abspath(path)
+    if signature is None:
+        signature = _file_signature(path)
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is not None and entry[0] == signature:
+            _cache.move_to_end(key)
+            _cache_stats["hits"] += 1
+            return _protect(entry[1])
+        _cache_stats["misses"] += 1
+
+    df = loader()
+    nbytes = int(df.memory_usage(deep=True).sum())
+    with _cache_lock:
+        _cache.pop(key, None)
+        if nbytes <= CACHE_MAX_BYTES:
+            _cache[key] = (signature, df, nbytes)
+            while len(_cache) > CACHE_MAX_ENTRIES or \
+                    sum(e[2] for e in _cache.values()) > CACHE_MAX_BYTES:
+                _cache.popitem(last=False)
+                _cache_stats["evictions"] += 1
+    return _protect(df)
+
+
+def invalidate_cache(path=None):
+    """Forget the cached frame for path (or everything when path is None)"""
+    with _cache_lock:
+        if path is None:
+            _cache.clear()
+        else:
+            _cache.pop(os.path.abspath(path), None)
+
+
+def cache_info():
+    """Return hit/miss/eviction counts and current cache size"""
+    with _cache_lock:
+        return dict(_cache_stats, entries=len(_cache),
+                    bytes=sum(e[2] for e in _cache.values()))
+
+
+# Timestamps are always written in full: pandas writes a column whose values
+# all fall at midnight as bare dates, which later rows in the file would not match
+CSV_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
 
 def load_csv(file_path):
     """Load CSV data into a DataFrame"""
     if os.path.exists(file_path):
-        return pd.read_csv(file_path)
+        return cached_read(file_path, lambda: pd.read_csv(file_path))
     else:
         print(f"File {file_path} not found.")
         return pd.DataFrame()
 
 def save_csv(df, file_path):
     """Save DataFrame to CSV"""
-    df.to_csv(file_path, index=False)
+    df.to_csv(file_path, index=False, date_format=CSV_DATE_FORMAT)
+    invalidate_cache(file_path)
+
+@contextmanager
+def _locked(f):
+    """Hold an exclusive lock on an open file (blocks other sessions/processes)"""
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+    try:
+        yield
+    finally:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+def append_csv(rows, file_path, fsync=False):
+    """
+    Append one or more rows to a CSV without rewriting the existing file.
+
+    Parameters:
+    - rows: dict (one row), list of dicts, or DataFrame
+    - file_path: CSV file; created with a header if missing or empty
+    - fsync: Force the data to disk before returning (slower, crash-safe)
+
+    Rows follow the column order of the existing header; columns the row
+    lacks are left empty. Columns the header lacks raise ValueError (use
+    save_csv to change the file's schema).
+    """
+    if isinstance(rows, dict):
+        rows = [rows]
+    new_df = rows if isinstance(rows, pd.DataFrame) else pd.DataFrame(rows, dtype=object)
+    if new_df.empty:
+        return
+
+    with open(file_path, "a+b") as f:
+        with _locked(f):
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+
+            if size == 0:
+                columns = list(new_df.columns)
+                write_header = True
+            else:
+                f.seek(0)
+                header_line = f.readline().decode("utf-8-sig")
+                columns = next(csv.reader([header_line]))
+                write_header = False
+
+                unknown = [c for c in new_df.columns if c not in columns]
+                if unknown:
+                    raise ValueError(f"Columns not in {file_path}: {', '.join(unknown)}")
+
+                # Make sure we start on a fresh line
+                f.seek(size - 1)
+                if f.read(1) != b"\n":
+                    f.write(b"\n")
+
+            buffer = io.StringIO()
+            new_df.reindex(columns=columns).to_csv(buffer, index=False, header=write_header,
+                                                   date_format=CSV_DATE_FORMAT)
+            f.write(buffer.getvalue().encode("utf-8"))
+            f.flush()
+            if fsync:
+                os.fsync(f.fileno())
+    invalidate_cache(file_path)
+
+def load_table(table):
+    """
+    Load a known table (activity, feeding_log, feeding, water, pet_log) with its schema.
+
+    Uses the configured storage backend (see modules/storage.py). The first
+    time a table is read from a binary backend, its existing CSV is migrated.
+    Returns an empty DataFrame if the table has no data yet.
+    """
+    from modules.storage import get_backend, migrate_csv
+    backend = get_backend()
+    migrate_csv(table, backend)
+    if not backend.exists(table):
+        return pd.DataFrame()
+    return cached_read(backend.cache_key(table), lambda: backend.read(table),
+                       backend.signature(table))
+
+def load_table_after(table, cursor=None):
+    """
+    Load only the rows appended to a known table since cursor.
+
+    Parameters:
+    - table: Known table name (see load_table)
+    - cursor: Cursor returned by the previous call, or None for every row
+
+    Returns:
+    - (rows, cursor to pass next time), or None if the table was replaced
+      or rewritten since cursor (read it again from None)
+    """
+    from modules.storage import get_backend, migrate_csv
+    backend = get_backend()
+    migrate_csv(table, backend)
+    if not backend.exists(table):
+        return pd.DataFrame(), None
+    return backend.read_after(table, cursor)
+
+def query_table(table, cat_name=None, start=None, end=None):
+    """
+    Load only the rows of one cat and/or a date range [start, end) of a known table.
+
+    With the SQLite backend the filter runs in the database using its
+    (cat_name, time) indexes; other backends filter after loading.
+    """
+    from modules.storage import get_backend, migrate_csv
+    backend = get_backend()
+    migrate_csv(table, backend)
+    if not backend.exists(table):
+        return pd.DataFrame()
+    return backend.query(table, cat_name=cat_name, start=start, end=end)
+
+def save_table(df, table):
+    """Replace a known table's contents"""
+    from modules.storage import get_backend
+    backend = get_backend()
+    backend.write(df, table)
+    invalidate_cache(backend.cache_key(table))
+
+def save_table_chunks(chunks, table):
+    """
+    Replace a known table's contents with a stream of DataFrames.
+
+    The table keeps its old contents until the last chunk has been written;
+    if producing or writing a chunk raises, the table is left untouched.
+    """
+    from modules.storage import get_backend
+    backend = get_backend()
+    try:
+        backend.write_chunks(chunks, table)
+    finally:
+        invalidate_cache(backend.cache_key(table))
+
+def append_table(rows, table):
+    """Append rows (dict, list of dicts or DataFrame) to a known table"""
+    from modules.storage import get_backend, migrate_csv
+    backend = get_backend()
+    migrate_csv(table, backend)
+    if isinstance(rows, dict):
+        rows = [rows]
+    backend.append(rows if isinstance(rows, pd.DataFrame) else pd.DataFrame(rows), table)
+    invalidate_cache(backend.cache_key(table))
+
+# ============ STREAMING CSV IMPORT ============
+
+ACTIVITY_COLUMNS = ['date', 'time', 'activity', 'cat_name', 'amount', 'notes']
+
+
+def validate_activity_rows(chunk):
+    """Return a boolean mask of rows with a real date, time, activity and cat name"""
+    valid_date = pd.to_datetime(chunk['date'], format='%Y-%m-%d', errors='coerce').notna()
+    valid_time = pd.to_datetime(chunk['time'], format='%H:%M', errors='coerce').notna() | \
+        pd.to_datetime(chunk['time'], format='%H:%M:%S', errors='coerce').notna()
+    has_activity = chunk['activity'].fillna('').str.strip() != ''
+    has_cat = chunk['cat_name'].fillna('').str.strip() != ''
+    return valid_date & valid_time & has_activity & has_cat
+
+
+def read_csv_header(source):
+    """Return the column names of a CSV path or file object (file position is restored)"""
+    if hasattr(source, 'seek'):
+        position = source.tell()
+        columns = list(pd.read_csv(source, nrows=0).columns)
+        source.seek(position)
+        return columns
+    return list(pd.read_csv(source, nrows=0).columns)
+
+
+def import_csv_chunks(source, table="activity", required_columns=ACTIVITY_COLUMNS,
+                      validate=validate_activity_rows, chunksize=50_000, progress=None,
+                      max_errors=20):
+    """
+    Stream a (possibly huge) CSV into a table without holding it in memory.
+
+    Parameters:
+    - source: File path or file object (e.g. a Streamlit upload)
+    - table: Table to replace with the imported rows (default: "activity")
+    - required_columns: Columns the file must have; checked before anything is written
+    - validate: Function returning a boolean mask of valid rows for a chunk (or None)
+    - chunksize: Rows per chunk, which bounds memory use (default: 50,000)
+    - progress: Optional callback(rows_read, fraction_done) called after each chunk
+      (fraction_done is None when the size of the source is unknown)
+    - max_errors: How many rejected-row messages to keep
+
+    The rows are staged and replace the table only once the whole file has
+    been read; if the file turns out to be unreadable part-way (bad encoding,
+    broken quoting), the table is left as it was.
+
+    Returns:
+    - Dictionary with rows_read, rows_imported, rows_rejected, errors (list of str)
+      and failed (None, or why the import stopped and nothing was saved)
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            return import_csv_chunks(f, table, required_columns, validate, chunksize,
+                                     progress, max_errors)
+
+    header = read_csv_header(source)
+    missing = [c for c in required_columns if c not in header]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+
+    total_bytes = getattr(source, 'size', None)
+    if total_bytes is None and hasattr(source, 'fileno'):
+        try:
+            total_bytes = os.fstat(source.fileno()).st_size
+        except io.UnsupportedOperation:  # in-memory files (BytesIO, StringIO)
+            total_bytes = None
+
+    report = {'rows_read': 0, 'rows_imported': 0, 'rows_rejected': 0, 'errors': [],
+              'failed': None}
+
+    def valid_chunks():
+        written = False
+        for chunk in pd.read_csv(source, chunksize=chunksize, dtype=str):
+            valid = validate(chunk) if validate is not None else pd.Series(True, index=chunk.index)
+            rejected = chunk.index[~valid]
+            for row in rejected[:max(0, max_errors - len(report['errors']))]:
+                # +2: header line and 1-based line numbers
+                report['errors'].append(f"Line {row + 2}: invalid or missing date/time/activity/cat_name")
+
+            rows = chunk[valid]
+            if not written or not rows.empty:
+                yield rows
+                written = True
+
+            report['rows_read'] += len(chunk)
+            report['rows_imported'] += len(rows)
+            report['rows_rejected'] += len(rejected)
+            if progress is not None:
+                done = None
+                if total_bytes and hasattr(source, 'tell'):
+                    done = min(1.0, source.tell() / total_bytes)
+                progress(report['rows_read'], done)
+
+        if not written:  # header only
+            yield pd.DataFrame(columns=header)
+
+    try:
+        save_table_chunks(valid_chunks(), table)
+    except ValueError as e:  # includes UnicodeDecodeError and pandas' ParserError
+        report['failed'] = (f"Stopped after {report['rows_read']:,} rows, nothing was saved: "
+                            f"{type(e).__name__}: {e}")
+        report['rows_imported'] = 0
+        print(f"Import into {table} failed: {report['failed']}")
+    return report
 
 def load_json(file_path):
     """Load JSON data"""
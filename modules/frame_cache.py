@@ -0,0 +1,325 @@
+# modules/frame_cache.py
+import hashlib
+import io
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+
+# On-disk layer ("" keeps frames in memory only)
+FRAME_CACHE_DIR = os.environ.get("CAT_CARE_FRAME_CACHE", "data/frames")
+# Display sizes (bounding boxes in pixels) generated for every new frame
+THUMBNAIL_SIZES = {"small": (160, 120), "medium": (320, 240), "large": (640, 480)}
+THUMBNAIL_QUALITY = 80
+MAX_FRAMES = 5_000            # frames kept on disk, oldest dropped first
+MEMORY_MAX_BYTES = 64 * 1024 * 1024
+
+
+def content_hash(content):
+    """Hash identifying a frame's bytes (identical frames share one file)"""
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+
+def make_thumbnail(content, size):
+    """
+    Downscale an image to fit in a bounding box.
+
+    Parameters:
+    - content: Encoded image bytes (JPEG, PNG, ...)
+    - size: (width, height) bounding box
+
+    Returns:
+    - JPEG bytes of the thumbnail
+    """
+    from PIL import Image  # imported lazily, only thumbnailing needs it
+    with Image.open(io.BytesIO(content)) as image:
+        # For JPEGs, decode at a reduced scale instead of decoding full size
+        image.draft("RGB", size)
+        image = image.convert("RGB")
+        image.thumbnail(size, Image.Resampling.LANCZOS, reducing_gap=2.0)
+        out = io.BytesIO()
+        image.save(out, "JPEG", quality=THUMBNAIL_QUALITY)
+        return out.getvalue()
+
+
+class FrameCache:
+    """
+    Bounded cache of camera frames and their thumbnails.
+
+    Frames are indexed by (camera, timestamp) and stored once per content
+    hash, so a camera sending the same picture again costs no extra space.
+    Thumbnails at THUMBNAIL_SIZES are generated on a background thread when a
+    new frame is stored. Recently used frames and thumbnails stay in an
+    in-memory LRU bounded by bytes; everything else is read from disk.
+    """
+
+    def __init__(self, root=FRAME_CACHE_DIR, sizes=None, max_frames=MAX_FRAMES,
+                 memory_max_bytes=MEMORY_MAX_BYTES, workers=2):
+        self.root = root or None
+        self.sizes = dict(sizes or THUMBNAIL_SIZES)
+        self.max_frames = max_frames
+        self.memory_max_bytes = memory_max_bytes
+        self._memory = OrderedDict()   # (hash, size or "frame") -> bytes
+        self._memory_bytes = 0
+        self._index = OrderedDict()    # (camera, timestamp) -> hash, oldest first (memory-only mode)
+        self._pending = {}             # hash -> Future of its thumbnails
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="thumbnails")
+        self._stats = {"frames": 0, "duplicates": 0, "thumbnails": 0, "hits": 0, "misses": 0,
+                       "evicted_frames": 0}
+
+    # ---- disk layer ----
+
+    def _path(self, digest, size="frame"):
+        return os.path.join(self.root, digest[:2], f"{digest}.{size}")
+
+    def _connect(self):
+        os.makedirs(self.root, exist_ok=True)
+        conn = sqlite3.connect(os.path.join(self.root, "index.db"), timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS frames "
+                     "(camera TEXT, timestamp TEXT, hash TEXT, PRIMARY KEY (camera, timestamp))")
+        return conn
+
+    def _write(self, path, content):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(content)
+        os.replace(tmp, path)
+
+    def _read(self, digest, size="frame"):
+        content = self._recall((digest, size))
+        if content is None and self.root:
+            try:
+                with open(self._path(digest, size), "rb") as f:
+                    content = f.read()
+            except FileNotFoundError:
+                return None
+            with self._lock:
+                self._remember((digest, size), content)
+        return content
+
+    # ---- memory layer ----
+
+    def _recall(self, key):
+        with self._lock:
+            content = self._memory.get(key)
+            if content is not None:
+                self._memory.move_to_end(key)
+            return content
+
+    def _remember(self, key, content):
+        """Insert into the byte-bounded LRU (caller holds the lock)"""
+        if key in self._memory:
+            self._memory_bytes -= len(self._memory.pop(key))
+        self._memory[key] = content
+        self._memory_bytes += len(content)
+        while self._memory_bytes > self.memory_max_bytes and len(self._memory) > 1:
+            _, old = self._memory.popitem(last=False)
+            self._memory_bytes -= len(old)
+
+    def _forget(self, digest):
+        with self._lock:
+            for size in ["frame", *self.sizes]:
+                content = self._memory.pop((digest, size), None)
+                if content is not None:
+                    self._memory_bytes -= len(content)
+
+    # ---- public API ----
+
+    def put(self, camera, timestamp, content):
+        """
+        Store a frame and start generating its thumbnails.
+
+        Parameters:
+        - camera: Camera identifier (e.g. its URL)
+        - timestamp: When the frame was taken (any string or datetime)
+        - content: Encoded image bytes
+
+        Returns:
+        - Content hash of the frame
+        """
+        digest = content_hash(content)
+        timestamp = str(timestamp)
+        with self._lock:
+            known = (digest, "frame") in self._memory or digest in self._pending or \
+                    (self.root is not None and os.path.exists(self._path(digest)))
+            self._stats["duplicates" if known else "frames"] += 1
+            self._remember((digest, "frame"), content)
+            if not self.root:
+                self._index[(camera, timestamp)] = digest
+                self._index.move_to_end((camera, timestamp))
+
+        if not known:
+            if self.root:
+                self._write(self._path(digest), content)
+            with self._lock:
+                self._pending[digest] = self._executor.submit(self._make_thumbnails, digest, content)
+        if self.root:
+            with closing(self._connect()) as conn, conn:
+                conn.execute("INSERT OR REPLACE INTO frames VALUES (?, ?, ?)", (camera, timestamp, digest))
+                self._trim_disk(conn)
+        else:
+            self._trim_memory()
+        return digest
+
+    def _make_thumbnails(self, digest, content):
+        try:
+            for size, box in self.sizes.items():
+                thumbnail = make_thumbnail(content, box)
+                if self.root:
+                    self._write(self._path(digest, size), thumbnail)
+                with self._lock:
+                    self._remember((digest, size), thumbnail)
+                    self._stats["thumbnails"] += 1
+        except Exception as e:
+            print("Thumbnail generation failed:", e)
+        finally:
+            with self._lock:
+                self._pending.pop(digest, None)
+
+    def _trim_memory(self):
+        """Drop the oldest index entries beyond max_frames (memory-only mode)"""
+        with self._lock:
+            dropped = []
+            while len(self._index) > self.max_frames:
+                dropped.append(self._index.popitem(last=False)[1])
+            live = set(self._index.values())
+            self._stats["evicted_frames"] += len(dropped)
+        for digest in set(dropped) - live:
+            self._forget(digest)
+
+    def _trim_disk(self, conn):
+        """Drop the oldest frames beyond max_frames and files no frame refers to"""
+        excess = conn.execute("SELECT COUNT(*) FROM frames").fetchone()[0] - self.max_frames
+        if excess <= 0:
+            return
+        dropped = [row[0] for row in conn.execute(
+            "SELECT hash FROM frames ORDER BY rowid LIMIT ?", (excess,))]
+        conn.execute("DELETE FROM frames WHERE rowid IN "
+                     "(SELECT rowid FROM frames ORDER BY rowid LIMIT ?)", (excess,))
+        marks = ", ".join("?" for _ in dropped)
+        still_used = {row[0] for row in conn.execute(
+            f"SELECT DISTINCT hash FROM frames WHERE hash IN ({marks})", dropped)}
+        with self._lock:
+            self._stats["evicted_frames"] += len(dropped)
+        for digest in set(dropped) - still_used:
+            self._forget(digest)
+            for size in ["frame", *self.sizes]:
+                try:
+                    os.remove(self._path(digest, size))
+                except FileNotFoundError:
+                    pass
+
+    def _lookup(self, camera, timestamp=None):
+        """Hash of a camera's frame at timestamp (most recently stored when None)"""
+        if not self.root:
+            with self._lock:
+                if timestamp is not None:
+                    return self._index.get((camera, str(timestamp)))
+                for (cam, _), digest in reversed(self._index.items()):
+                    if cam == camera:
+                        return digest
+                return None
+        with closing(self._connect()) as conn:
+            if timestamp is not None:
+                row = conn.execute("SELECT hash FROM frames WHERE camera = ? AND timestamp = ?",
+                                   (camera, str(timestamp))).fetchone()
+            else:
+                row = conn.execute("SELECT hash FROM frames WHERE camera = ? ORDER BY rowid DESC LIMIT 1",
+                                   (camera,)).fetchone()
+        return row[0] if row else None
+
+    def get(self, camera, timestamp=None):
+        """Full-resolution frame bytes (most recent frame when timestamp is None), or None"""
+        digest = self._lookup(camera, timestamp)
+        return self._read(digest) if digest else None
+
+    def thumbnail(self, camera, timestamp=None, size="medium"):
+        """
+        Thumbnail of a camera's frame for display.
+
+        Parameters:
+        - camera: Camera identifier
+        - timestamp: Frame time (default: the latest frame)
+        - size: One of the THUMBNAIL_SIZES names
+
+        Returns:
+        - JPEG bytes, or None if the frame is unknown; waits for a thumbnail
+          still being generated and creates a missing one on the spot
+        """
+        if size not in self.sizes:
+            raise ValueError(f"Unknown thumbnail size: {size} (choose from {', '.join(self.sizes)})")
+        digest = self._lookup(camera, timestamp)
+        if digest is None:
+            return None
+        content = self._read(digest, size)
+        if content is None:
+            with self._lock:
+                pending = self._pending.get(digest)
+            if pending is not None:
+                pending.result()
+                content = self._read(digest, size)
+        if content is not None:
+            with self._lock:
+                self._stats["hits"] += 1
+            return content
+
+        frame = self._read(digest)
+        if frame is None:
+            return None
+        content = make_thumbnail(frame, self.sizes[size])
+        if self.root:
+            self._write(self._path(digest, size), content)
+        with self._lock:
+            self._remember((digest, size), content)
+            self._stats["misses"] += 1
+        return content
+
+    def wait(self):
+        """Block until every queued thumbnail is generated"""
+        with self._lock:
+            pending = list(self._pending.values())
+        for future in pending:
+            future.result()
+
+    def stats(self):
+        """Stored and duplicate frame counts, thumbnails made and memory use"""
+        with self._lock:
+            return dict(self._stats, pending=len(self._pending), memory_entries=len(self._memory),
+                        memory_mb=round(self._memory_bytes / 1024 / 1024, 2))
+
+
+def store_frames(frames, timestamp=None, cache=None):
+    """
+    Store the frames returned by api_utils.CameraClient.fetch_many.
+
+    Only frames that were actually downloaded (changed=True) are stored;
+    the camera URL is used as the camera identifier.
+
+    Returns:
+    - List of content hashes (None for frames that were not stored)
+    """
+    cache = cache or get_frame_cache()
+    timestamp = timestamp or time.strftime("%Y-%m-%d %H:%M:%S")
+    return [cache.put(frame["url"], timestamp, frame["content"])
+            if frame.get("changed") and frame.get("content") else None
+            for frame in frames]
+
+
+# Process-wide, like the sentiment cache
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_frame_cache():
+    """Return the shared frame cache"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = FrameCache()
+        return _shared
@@ -0,0 +1,243 @@
+# modules/inference_worker.py
+import queue
+import threading
+import time
+
+# Micro-batching: after the first request arrives, wait this long for others
+# (from any session) so they share one forward pass
+MAX_WAIT_SECONDS = 0.02
+MAX_BATCH_NOTES = 128
+DEFAULT_TIMEOUT = 30.0
+
+
+class InferenceJob:
+    """
+    Handle for a queued scoring request.
+
+    Pages keep it (e.g. in st.session_state) and poll done() on reruns
+    instead of blocking on inference. The timeout does not count time the
+    worker spends loading a model (minutes on the first download).
+    """
+
+    def __init__(self, notes, method, timeout, load_clock=None):
+        self.notes = ["" if note is None else str(note) for note in notes]
+        self.method = method
+        self.submitted_at = time.monotonic()
+        self.deadline = self.submitted_at + timeout
+        # Seconds spent loading models, read at submission and when checking the deadline
+        self._load_clock = load_clock or (lambda: 0.0)
+        self._load_seconds_at_submit = self._load_clock()
+        self.status = "pending"  # pending -> done / failed / timeout
+        self.error = None
+        self._result = None
+        self._event = threading.Event()
+
+    def done(self):
+        """True once the job finished, failed or timed out"""
+        return self._event.is_set()
+
+    def expired(self):
+        loading = self._load_clock() - self._load_seconds_at_submit
+        return not self.done() and time.monotonic() - loading > self.deadline
+
+    def wait(self, timeout=None):
+        """Block until done (or timeout seconds); returns done()"""
+        return self._event.wait(timeout)
+
+    def result(self, timeout=0):
+        """
+        Return the scores, waiting at most timeout seconds.
+
+        Returns:
+        - List of {'note', 'sentiment', 'score'} dicts in the order of the notes
+          (raises TimeoutError if not ready, RuntimeError if inference failed)
+        """
+        if not self._event.wait(timeout):
+            if self.expired():
+                self._finish("timeout", error=f"No result within {self.deadline - self.submitted_at:.0f}s")
+            else:
+                raise TimeoutError("Inference still running")
+        if self.status != "done":
+            raise RuntimeError(self.error)
+        return self._result
+
+    def elapsed(self):
+        return time.monotonic() - self.submitted_at
+
+    def _finish(self, status, result=None, error=None):
+        if self._event.is_set():
+            return
+        self.status, self._result, self.error = status, result, error
+        self._event.set()
+
+
+class InferenceWorker:
+    """
+    Background thread that scores notes for every session.
+
+    Requests go into one queue; the worker drains whatever arrived within a
+    short window into a micro-batch, scores the distinct notes of each method
+    in one call and hands every job its results. A thread (not a process) is
+    used so the model registry and sentiment cache stay shared; PyTorch
+    releases the GIL during forward passes, so Streamlit stays responsive.
+    """
+
+    def __init__(self, max_wait=MAX_WAIT_SECONDS, max_batch=MAX_BATCH_NOTES, batch_size=32):
+        self.max_wait = max_wait
+        self.max_batch = max_batch
+        self.batch_size = batch_size
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stats = {"submitted": 0, "completed": 0, "failed": 0, "timed_out": 0,
+                       "batches": 0, "batched_jobs": 0}
+        self._load_seconds = 0.0     # total time spent loading models
+        self._loading_since = None   # start of the load in progress
+
+    def submit(self, notes, method="transformer", timeout=DEFAULT_TIMEOUT):
+        """
+        Queue notes for scoring and return immediately.
+
+        Parameters:
+        - notes: A note string or a list of notes
+        - method: "transformer", "textblob" or "keywords" (see analyze_notes_batch)
+        - timeout: Seconds after which the job is given up if not yet scored
+          (time spent loading the model is not counted)
+
+        Returns:
+        - InferenceJob handle to poll
+        """
+        job = InferenceJob([notes] if isinstance(notes, str) else notes, method, timeout,
+                           load_clock=self.load_seconds)
+        with self._lock:
+            self._stats["submitted"] += 1
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="inference-worker", daemon=True)
+                self._thread.start()
+        self._queue.put(job)
+        return job
+
+    def _collect(self):
+        """Block for one job, then gather more for up to max_wait seconds"""
+        jobs = [self._queue.get()]
+        if jobs[0] is None:
+            return jobs
+        size = len(jobs[0].notes)
+        window_ends = time.monotonic() + self.max_wait
+        while size < self.max_batch:
+            remaining = window_ends - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                job = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            jobs.append(job)
+            if job is None:
+                break
+            size += len(job.notes)
+        return jobs
+
+    def _run(self):
+        while True:
+            jobs = self._collect()
+            stopping = jobs[-1] is None
+            by_method = {}
+            for job in jobs[:-1] if stopping else jobs:
+                if job.expired():
+                    job._finish("timeout", error="Timed out waiting in the queue")
+                    with self._lock:
+                        self._stats["timed_out"] += 1
+                elif not job.done():
+                    by_method.setdefault(job.method, []).append(job)
+            for method, group in by_method.items():
+                self._score(method, group)
+            if stopping:
+                return
+
+    def load_seconds(self):
+        """Seconds spent loading models so far, including a load in progress"""
+        with self._lock:
+            total = self._load_seconds
+            if self._loading_since is not None:
+                total += time.monotonic() - self._loading_since
+            return total
+
+    def is_loading(self):
+        """True while the worker waits for a model to load"""
+        with self._lock:
+            return self._loading_since is not None
+
+    def _load_model(self, method):
+        """Load the transformer before scoring, on the load clock (not the jobs' timeouts)"""
+        if method != "transformer":
+            return
+        from modules.model_registry import get_sentiment_pipeline, is_loaded
+        if is_loaded():
+            return
+        with self._lock:
+            self._loading_since = time.monotonic()
+        try:
+            get_sentiment_pipeline()  # also waits for a warm-up already loading it
+        finally:
+            with self._lock:
+                self._load_seconds += time.monotonic() - self._loading_since
+                self._loading_since = None
+
+    def _score(self, method, jobs):
+        """One batched call for every note of every job using the same method"""
+        from modules.nlp_utils import analyze_notes_batch
+        notes = list(dict.fromkeys(note for job in jobs for note in job.notes))
+        try:
+            self._load_model(method)
+            scored = analyze_notes_batch(notes, method=method, batch_size=self.batch_size)
+            by_note = {row.note: {'note': row.note, 'sentiment': row.sentiment, 'score': float(row.score)}
+                       for row in scored.itertuples(index=False)}
+        except Exception as e:
+            for job in jobs:
+                job._finish("failed", error=f"{type(e).__name__}: {e}")
+            with self._lock:
+                self._stats["failed"] += len(jobs)
+            return
+        for job in jobs:
+            job._finish("done", result=[dict(by_note[note]) for note in job.notes])
+        with self._lock:
+            self._stats["completed"] += len(jobs)
+            self._stats["batches"] += 1
+            self._stats["batched_jobs"] += len(jobs)
+
+    def stats(self):
+        """Job counts, queue depth and average jobs per forward pass"""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["queue_depth"] = self._queue.qsize()
+        stats["loading_model"] = self.is_loading()
+        stats["load_seconds"] = round(self.load_seconds(), 3)
+        stats["avg_jobs_per_batch"] = round(stats["batched_jobs"] / stats["batches"], 2) \
+            if stats["batches"] else None
+        return stats
+
+    def shutdown(self, wait=True):
+        """Stop the worker thread after the jobs already queued"""
+        self._queue.put(None)
+        if wait and self._thread is not None:
+            self._thread.join()
+
+
+# Process-wide, shared by every Streamlit session
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def get_worker():
+    """Return the shared inference worker"""
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = InferenceWorker()
+        return _worker
+
+
+def submit_notes(notes, method="transformer", timeout=DEFAULT_TIMEOUT):
+    """Queue notes on the shared worker; returns an InferenceJob to poll"""
+    return get_worker().submit(notes, method=method, timeout=timeout)
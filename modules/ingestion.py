@@ -0,0 +1,375 @@
+# modules/ingestion.py
+import asyncio
+import json
+import logging
+import time
+import pandas as pd
+from modules.preprocess import clean_water_data, clean_feeding_data
+from modules.storage import TABLES, apply_schema
+
+logger = logging.getLogger(__name__)
+
+# Sensor event types and the table each one is written to. These hold many
+# bowls (household, cat_name), so they are kept apart from the tracker's
+# single-bowl "water"/"feeding" tables.
+EVENT_TABLES = {"water": "water_sensors", "feeding": "feeding_sensors"}
+MAX_BATCH_EVENTS = 5_000      # flush as soon as this many events are pending
+MAX_LATENCY_SECONDS = 0.5     # ... or when the oldest pending event is this old
+MAX_BACKLOG_EVENTS = 200_000  # beyond this, new events are refused (back-pressure)
+RETRY_SECONDS = 1.0           # wait before writing a batch again after a storage error
+
+# Values the sensors may leave out
+EVENT_DEFAULTS = {
+    "water": {"household": "household_0", "cat_name": "Whiskers",
+              "refill_event": False, "cat_drinking": False},
+    "feeding": {"household": "household_0", "cat_name": "Whiskers",
+                "cat_present": False, "event_type": "feeding"},
+}
+CLEANERS = {"water": clean_water_data, "feeding": clean_feeding_data}
+
+
+def events_to_frame(events, kind):
+    """
+    Turn a batch of sensor events into rows of the water or feeding table.
+
+    Applies the same rules as clean_water_data / clean_feeding_data and drops
+    events without a valid timestamp.
+
+    Returns:
+    - (DataFrame in the table's schema, number of rejected events)
+    """
+    columns = list(TABLES[EVENT_TABLES[kind]]["schema"])
+    df = pd.DataFrame.from_records(events).reindex(columns=columns)
+    for column, default in EVENT_DEFAULTS[kind].items():
+        df[column] = df[column].where(df[column].notna(), default)
+    df['timestamp'] = pd.to_datetime(df['timestamp'], errors='coerce', format='mixed')
+    valid = df['timestamp'].notna()
+    df = df[valid]
+    if kind == "water":
+        df = df.assign(water_level_percent=pd.to_numeric(df['water_level_percent'], errors='coerce'))
+    df = CLEANERS[kind](df)
+    return apply_schema(df.reset_index(drop=True), EVENT_TABLES[kind]), int((~valid).sum())
+
+
+def storage_writer(kind, df):
+    """Default writer: append a cleaned batch to its storage table"""
+    from modules.data_loader import append_table
+    append_table(df, EVENT_TABLES[kind])
+
+
+class SensorIngestor:
+    """
+    Accepts water-bowl and feeder events at a high rate and writes them in batches.
+
+    submit() only queues an event, so transports (HTTP, MQTT) never wait on
+    storage. A flush loop writes each event type as one cleaned batch when
+    max_batch events are pending or the oldest one has waited max_latency
+    seconds, cleaning and writing in a thread so the event loop keeps accepting.
+    A batch storage refused is put back in front of the queue and retried
+    after retry_delay seconds (still counting towards the backlog).
+
+    Usage:
+        ingestor = SensorIngestor()
+        asyncio.create_task(ingestor.run())
+        ingestor.submit({"type": "water", "timestamp": ..., "water_level_percent": 82.5})
+    """
+
+    def __init__(self, max_batch=MAX_BATCH_EVENTS, max_latency=MAX_LATENCY_SECONDS,
+                 max_backlog=MAX_BACKLOG_EVENTS, writer=storage_writer, retry_delay=RETRY_SECONDS):
+        self.max_batch = max_batch
+        self.max_latency = max_latency
+        self.max_backlog = max_backlog
+        self.retry_delay = retry_delay
+        self.writer = writer
+        self._pending = {kind: [] for kind in EVENT_TABLES}
+        self._backlog = 0
+        self._oldest = None
+        self._wake = asyncio.Event()
+        self._stopping = False
+        self._started = time.monotonic()
+        self._stats = {"received": 0, "written": 0, "rejected": 0, "refused": 0, "failed": 0,
+                       "retried": 0, "batches": 0, "write_seconds": 0.0, "max_write_seconds": 0.0,
+                       "max_latency_seconds": 0.0}
+
+    def submit(self, event):
+        """
+        Queue one event (a dict with "type": "water" or "feeding" and a timestamp).
+
+        Returns:
+        - True if accepted, False if refused (unknown type or backlog full)
+        """
+        kind = event.get("type") if isinstance(event, dict) else None
+        if kind not in self._pending:
+            self._stats["rejected"] += 1
+            return False
+        if self._backlog >= self.max_backlog:
+            self._stats["refused"] += 1
+            return False
+        self._pending[kind].append(event)
+        self._backlog += 1
+        self._stats["received"] += 1
+        if self._oldest is None:
+            self._oldest = time.monotonic()
+            self._wake.set()
+        elif self._backlog >= self.max_batch:
+            self._wake.set()
+        return True
+
+    def submit_many(self, events):
+        """Queue many events; returns how many were accepted"""
+        return sum(self.submit(event) for event in events)
+
+    async def run(self):
+        """Flush loop; returns after stop() once everything pending is written"""
+        while True:
+            if self._oldest is None:
+                if self._stopping:
+                    return
+                self._wake.clear()
+                await self._wake.wait()
+                continue
+            remaining = self._oldest + self.max_latency - time.monotonic()
+            if self._backlog < self.max_batch and remaining > 0 and not self._stopping:
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            if not await self.flush() and not self._stopping:
+                await asyncio.sleep(self.retry_delay)
+
+    async def flush(self):
+        """
+        Write everything pending now, one batch per event type.
+
+        Returns:
+        - False if a batch could not be written and was queued again
+        """
+        batches, oldest = self._pending, self._oldest
+        self._pending = {kind: [] for kind in EVENT_TABLES}
+        self._oldest = None
+        written = True
+        for kind, events in batches.items():
+            if not events:
+                continue
+            start = time.monotonic()
+            try:
+                df, rejected = await asyncio.to_thread(events_to_frame, events, kind)
+            except Exception:
+                # The events themselves are unusable: retrying would fail again
+                logger.exception("Dropping %d %s events that could not be cleaned", len(events), kind)
+                self._backlog -= len(events)
+                self._stats["failed"] += len(events)
+                continue
+            try:
+                if len(df):
+                    await asyncio.to_thread(self.writer, kind, df)
+            except Exception:
+                if self._stopping:
+                    logger.exception("Dropping %d %s events on shutdown, storage failed", len(events), kind)
+                    self._backlog -= len(events)
+                    self._stats["failed"] += len(events)
+                    continue
+                logger.exception("Writing %d %s events failed, retrying in %.1fs",
+                                 len(events), kind, self.retry_delay)
+                self._pending[kind][:0] = events  # keep arrival order
+                self._oldest = oldest if self._oldest is None else min(oldest, self._oldest)
+                self._stats["retried"] += len(events)
+                written = False
+                continue
+            seconds = time.monotonic() - start
+            self._backlog -= len(events)
+            self._stats["rejected"] += rejected
+            self._stats["written"] += len(df)
+            self._stats["batches"] += 1
+            self._stats["write_seconds"] += seconds
+            self._stats["max_write_seconds"] = max(self._stats["max_write_seconds"], seconds)
+        if oldest is not None:
+            self._stats["max_latency_seconds"] = max(self._stats["max_latency_seconds"],
+                                                     time.monotonic() - oldest)
+        return written
+
+    def stop(self):
+        """Ask run() to write what is pending and return"""
+        self._stopping = True
+        self._wake.set()
+
+    def stats(self):
+        """Throughput, backlog and write latency of the ingestor"""
+        stats = dict(self._stats, backlog=self._backlog)
+        elapsed = time.monotonic() - self._started
+        stats["events_per_second"] = round(stats["written"] / elapsed, 1) if elapsed > 0 else None
+        stats["avg_write_seconds"] = round(stats["write_seconds"] / stats["batches"], 4) \
+            if stats["batches"] else None
+        for key in ("write_seconds", "max_write_seconds", "max_latency_seconds"):
+            stats[key] = round(stats[key], 4)
+        return stats
+
+
+# ============ TRANSPORTS ============
+
+def _decode_events(payload):
+    """JSON object, JSON array or newline-delimited JSON -> list of events"""
+    text = payload.decode("utf-8") if isinstance(payload, bytes) else payload
+    text = text.strip()
+    if not text:
+        return []
+    if text[0] == "[":
+        return json.loads(text)
+    if "\n" in text:
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+    return [json.loads(text)]
+
+
+async def _respond(writer, status, body):
+    reason = {200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found",
+              503: "Service Unavailable"}[status]
+    data = json.dumps(body).encode()
+    writer.write(f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(data)}\r\n\r\n".encode() + data)
+    await writer.drain()
+
+
+async def serve_http(ingestor, host="127.0.0.1", port=8765):
+    """
+    Minimal HTTP/1.1 endpoint for sensors and gateways (keep-alive supported).
+
+    - POST /events: JSON event, JSON array or newline-delimited JSON;
+      answers 202 with the accepted count, or 503 when the backlog is full
+    - GET /stats: ingest throughput and backlog
+
+    Returns:
+    - The asyncio server (call .close() to stop listening)
+    """
+    async def handle(reader, writer):
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                request_line, *header_lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, path = request_line.split(" ")[:2]
+                    headers = {k.strip().lower(): v.strip()
+                               for k, v in (line.split(":", 1) for line in header_lines if ":" in line)}
+                    length = int(headers.get("content-length", 0))
+                    if length < 0:
+                        raise ValueError(f"negative Content-Length {length}")
+                except ValueError as e:
+                    # Without a usable request line or length the stream can't be resynced
+                    await _respond(writer, 400, {"error": f"Malformed request: {e}"})
+                    break
+                body = await reader.readexactly(length)
+                if method == "POST" and path == "/events":
+                    try:
+                        events = _decode_events(body)
+                    except ValueError as e:
+                        await _respond(writer, 400, {"error": str(e)})
+                        continue
+                    accepted = ingestor.submit_many(events)
+                    full = accepted < len(events) and ingestor._backlog >= ingestor.max_backlog
+                    await _respond(writer, 503 if full else 202,
+                                   {"accepted": accepted, "backlog": ingestor._backlog})
+                elif method == "GET" and path == "/stats":
+                    await _respond(writer, 200, ingestor.stats())
+                else:
+                    await _respond(writer, 404, {"error": f"No route for {method} {path}"})
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port, backlog=1024)
+
+
+async def consume_mqtt(ingestor, broker="localhost", port=1883, topic="catcare/events/#"):
+    """
+    Feed events from an MQTT broker (payloads use the same JSON as POST /events).
+
+    Needs `pip install aiomqtt`; runs until cancelled.
+    """
+    import aiomqtt  # imported lazily, only MQTT deployments need it
+    async with aiomqtt.Client(broker, port) as client:
+        await client.subscribe(topic)
+        async for message in client.messages:
+            try:
+                ingestor.submit_many(_decode_events(message.payload))
+            except ValueError as e:
+                logger.warning("Bad sensor message on %s: %s", message.topic, e)
+
+
+# ============ STAND-IN PUBLISHER ============
+
+def simulated_events(population, start_date="2024-12-13", days=1, seed=0):
+    """
+    Sensor events for a population, in time order, from the simulator.
+
+    Returns:
+    - List of event dictionaries ("type" plus the table's columns)
+    """
+    from modules.simulation import simulate_cat
+    frames = []
+    for cat in population:
+        water, feeding = simulate_cat(cat, start_date, days, seed)
+        frames.append(water.assign(type="water"))
+        frames.append(feeding.assign(type="feeding"))
+    events = pd.concat(frames, ignore_index=True).sort_values("timestamp", kind="stable")
+    events['timestamp'] = events['timestamp'].dt.strftime("%Y-%m-%dT%H:%M:%S")
+    return [{k: v for k, v in event.items() if not pd.isna(v)}
+            for event in events.to_dict("records")]
+
+
+async def publish_http(events, host="127.0.0.1", port=8765, batch_size=100, connections=8):
+    """
+    Stand-in for a fleet of sensors: POST events to serve_http over keep-alive connections.
+
+    Parameters:
+    - events: List of event dictionaries
+    - batch_size: Events per request (gateways usually batch; 1 = one per request)
+    - connections: Concurrent publisher connections
+
+    Returns:
+    - Dictionary with requests, accepted, refused and seconds
+    """
+    batches = [events[i:i + batch_size] for i in range(0, len(events), batch_size)]
+    report = {"requests": 0, "accepted": 0, "refused": 0}
+
+    async def publisher(share):
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            for batch in share:
+                body = "\n".join(json.dumps(event) for event in batch).encode()
+                writer.write(f"POST /events HTTP/1.1\r\nHost: {host}\r\n"
+                             f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+                await writer.drain()
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = int(head.lower().split(b"content-length:")[1].split(b"\r\n")[0])
+                answer = json.loads(await reader.readexactly(length))
+                report["requests"] += 1
+                report["accepted"] += answer["accepted"]
+                report["refused"] += len(batch) - answer["accepted"]
+        finally:
+            writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(publisher(batches[i::connections]) for i in range(connections)))
+    report["seconds"] = round(time.perf_counter() - start, 3)
+    return report
+
+
+async def _serve_forever(host, port):
+    from modules.alerts import alerting_writer, get_alert_engine
+    # Every water reading is checked for low-water alerts as it is stored
+    ingestor = SensorIngestor(writer=alerting_writer(get_alert_engine()))
+    server = await serve_http(ingestor, host, port)
+    logger.info("Ingesting sensor events on http://%s:%s/events (stats: /stats)", host, port)
+    async with server:
+        await asyncio.gather(server.serve_forever(), ingestor.run())
+
+
+if __name__ == "__main__":
+    # python -m modules.ingestion [port]
+    import sys
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    asyncio.run(_serve_forever("0.0.0.0", int(sys.argv[1]) if len(sys.argv) > 1 else 8765))
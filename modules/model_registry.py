@@ -0,0 +1,221 @@
+# modules/model_registry.py
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+SENTIMENT_TASK = "sentiment-analysis"
+SENTIMENT_MODEL = "distilbert-base-uncased-finetuned-sst-2-english"
+
+# Inference backends for CPU servers:
+# - "pytorch": the fp32 Hugging Face pipeline (default)
+# - "quantized": the same weights with Linear layers dynamically quantized to int8
+# - "onnx": an ONNX Runtime export (see export_onnx) loaded from CAT_CARE_ONNX_PATH
+BACKENDS = ("pytorch", "quantized", "onnx")
+DEFAULT_BACKEND = os.environ.get("CAT_CARE_SENTIMENT_BACKEND", "pytorch")
+# Local copy of the weights (hub name is used when unset)
+LOCAL_MODEL_PATH = os.environ.get("CAT_CARE_MODEL_PATH") or None
+ONNX_MODEL_PATH = os.environ.get("CAT_CARE_ONNX_PATH", "models/sentiment-onnx")
+
+# Process-wide registry: Streamlit imports this module once per server process,
+# so every session and every rerun shares the same loaded models.
+# _lock only guards these dictionaries; a load (seconds to minutes on the first
+# download) holds the model's own lock in _load_locks, so stats, cache hits on
+# other models and warm-up calls never wait for it.
+_models = {}
+_stats = {}
+_errors = {}
+_warming = set()
+_load_locks = {}
+_lock = threading.Lock()
+
+
+def _resolve_backend(backend):
+    backend = backend or DEFAULT_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown inference backend: {backend} (choose from {', '.join(BACKENDS)})")
+    return backend
+
+
+def _load_pipeline(task, model_name, backend="pytorch"):
+    """Build a Hugging Face pipeline (imported lazily, it is heavy)"""
+    from transformers import pipeline
+    source = LOCAL_MODEL_PATH or model_name
+
+    if backend == "pytorch":
+        return pipeline(task, model=source)
+
+    if backend == "quantized":
+        import torch
+        from transformers import AutoModelForSequenceClassification, AutoTokenizer
+        tokenizer = AutoTokenizer.from_pretrained(source)
+        model = AutoModelForSequenceClassification.from_pretrained(source)
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        model.eval()
+        return pipeline(task, model=model, tokenizer=tokenizer)
+
+    # onnx: never exports implicitly, the server must not download or convert at runtime
+    if not os.path.isdir(ONNX_MODEL_PATH):
+        raise FileNotFoundError(f"No ONNX model at {ONNX_MODEL_PATH}; create it with "
+                                "modules.model_registry.export_onnx()")
+    from optimum.onnxruntime import ORTModelForSequenceClassification
+    from transformers import AutoTokenizer
+    tokenizer = AutoTokenizer.from_pretrained(ONNX_MODEL_PATH)
+    model = ORTModelForSequenceClassification.from_pretrained(ONNX_MODEL_PATH)
+    return pipeline(task, model=model, tokenizer=tokenizer)
+
+
+def export_onnx(model_name=SENTIMENT_MODEL, target=ONNX_MODEL_PATH):
+    """
+    Export a sequence-classification model to ONNX for the "onnx" backend.
+
+    Parameters:
+    - model_name: Hub name or local path of the fp32 model
+    - target: Folder to write the ONNX model and tokenizer to
+
+    Returns:
+    - The target folder (requires `pip install optimum[onnxruntime]`)
+    """
+    from optimum.onnxruntime import ORTModelForSequenceClassification
+    from transformers import AutoTokenizer
+    model = ORTModelForSequenceClassification.from_pretrained(model_name, export=True)
+    model.save_pretrained(target)
+    AutoTokenizer.from_pretrained(model_name).save_pretrained(target)
+    return target
+
+
+def _version_of(model, backend):
+    """Identify the exact weights of a pipeline (hub commit + library version + backend)"""
+    config = getattr(getattr(model, "model", None), "config", None)
+    commit = getattr(config, "_commit_hash", None) or "local"
+    try:
+        import transformers
+        return f"{commit}/transformers-{transformers.__version__}/{backend}"
+    except ImportError:
+        return f"{commit}/{backend}"
+
+
+def get_model(task=SENTIMENT_TASK, model_name=SENTIMENT_MODEL, backend=None):
+    """
+    Return a shared model pipeline, loading it on first use.
+
+    Parameters:
+    - task: Hugging Face pipeline task (default: "sentiment-analysis")
+    - model_name: Model identifier (default: DistilBERT SST-2)
+    - backend: "pytorch", "quantized" or "onnx" (default: CAT_CARE_SENTIMENT_BACKEND)
+
+    Returns:
+    - Loaded pipeline object (raises ImportError if transformers is missing)
+    """
+    key = (task, model_name, _resolve_backend(backend))
+    with _lock:
+        model = _models.get(key)
+        if model is not None:
+            _stats[key]["hits"] += 1
+            return model
+        load_lock = _load_locks.setdefault(key, threading.Lock())
+
+    # Only callers of this same model wait here while it loads
+    with load_lock:
+        with _lock:
+            # Another session may have finished loading while we waited
+            if key in _models:
+                _stats[key]["hits"] += 1
+                return _models[key]
+
+        start = time.perf_counter()
+        try:
+            model = _load_pipeline(*key)
+        except Exception as e:
+            with _lock:
+                _errors[key] = {"task": task, "model": model_name, "backend": key[2],
+                                "error": f"{type(e).__name__}: {e}",
+                                "failed_at": time.strftime("%Y-%m-%d %H:%M:%S")}
+            raise
+        stats = {
+            "task": task,
+            "model": model_name,
+            "backend": key[2],
+            "version": _version_of(model, key[2]),
+            "load_seconds": round(time.perf_counter() - start, 3),
+            "loaded_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "hits": 0,
+        }
+        with _lock:
+            _models[key] = model
+            _stats[key] = stats
+            _errors.pop(key, None)
+        return model
+
+
+def get_sentiment_pipeline(backend=None):
+    """Return the shared DistilBERT sentiment pipeline on the configured backend"""
+    return get_model(SENTIMENT_TASK, SENTIMENT_MODEL, backend)
+
+
+def model_version(task=SENTIMENT_TASK, model_name=SENTIMENT_MODEL, backend=None):
+    """Version string of a model's weights and backend (loads the model if needed)"""
+    key = (task, model_name, _resolve_backend(backend))
+    with _lock:
+        stats = _stats.get(key)
+    if stats is None:
+        get_model(*key)
+        with _lock:
+            stats = _stats[key]
+    # Read from the stats, not through get_model(), so it does not count as a hit
+    return stats["version"]
+
+
+def warm_up(task=SENTIMENT_TASK, model_name=SENTIMENT_MODEL, backend=None, background=True):
+    """
+    Load a model ahead of the first request (e.g. at server start).
+
+    Parameters:
+    - task / model_name / backend: Which model to load
+    - background: Load in a daemon thread so the caller is not blocked
+
+    Returns:
+    - The loading thread when background=True, otherwise None
+    """
+    key = (task, model_name, _resolve_backend(backend))
+    with _lock:
+        # Already loaded, loading, or failed before (e.g. transformers missing)
+        if key in _models or key in _warming:
+            return None
+        _warming.add(key)
+
+    def _load():
+        try:
+            get_model(*key)
+        except Exception:
+            # The error is also kept for registry_stats()
+            logger.exception("Warm-up of %s (%s) failed", key[1], key[2])
+
+    if background:
+        thread = threading.Thread(target=_load, name="model-warm-up", daemon=True)
+        thread.start()
+        return thread
+    _load()
+    return None
+
+
+def is_loaded(task=SENTIMENT_TASK, model_name=SENTIMENT_MODEL, backend=None):
+    """Return True if the model is already in memory"""
+    return (task, model_name, _resolve_backend(backend)) in _models
+
+
+def registry_stats():
+    """Return load time and hit counts for every loaded model, and the error of every failed load"""
+    with _lock:
+        return [dict(s) for s in _stats.values()] + [dict(e) for e in _errors.values()]
+
+
+def clear_registry():
+    """Drop all loaded models (frees memory, next call reloads)"""
+    with _lock:
+        _models.clear()
+        _stats.clear()
+        _errors.clear()
+        _warming.clear()
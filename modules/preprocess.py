@@ -10,5 +10,8 @@ def clean_water_data(df):
 def clean_feeding_data(df):
     """Example: Ensure food amount is non-negative"""
     df = df.copy()
-    df['food_amount_g'] = df['food_amount_g'].apply(lambda x: max(0, x))
+    # Feeding logs call it food_amount_g, the simulated/sensor table food_amount
+    column = 'food_amount_g' if 'food_amount_g' in df.columns else 'food_amount'
+    # Same result as max(0, x) per row (missing amounts become 0), vectorized
+    df[column] = pd.to_numeric(df[column], errors='coerce').fillna(0).clip(lower=0)
     return df
@@ -0,0 +1,206 @@
+# modules/sentiment_cache.py
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+from contextlib import closing
+
+# On-disk layer shared by every server process ("" disables it)
+CACHE_DB_PATH = os.environ.get("CAT_CARE_SENTIMENT_CACHE", "data/sentiment_cache.db")
+MEMORY_MAX_ENTRIES = 50_000
+DISK_MAX_ENTRIES = 1_000_000
+
+
+def normalize_text(text):
+    """
+    Canonical form of a note for cache lookups.
+
+    Unicode-normalized, lowercased, with runs of whitespace collapsed. Both
+    TextBlob and the uncased DistilBERT model score these forms identically.
+    """
+    text = unicodedata.normalize("NFKC", "" if text is None else str(text))
+    return " ".join(text.lower().split())
+
+
+def cache_key(text, model, version):
+    """Stable key of a (normalized note, model, model version) triple"""
+    raw = "\x1f".join([model, str(version), normalize_text(text)])
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class SentimentCache:
+    """
+    Bounded two-level cache of sentiment results.
+
+    An in-memory LRU in front of an optional SQLite file, so results survive
+    restarts and are shared between server processes. Results are any
+    JSON-serializable value (e.g. {'label': ..., 'score': ...}).
+    """
+
+    def __init__(self, db_path=CACHE_DB_PATH, max_entries=MEMORY_MAX_ENTRIES,
+                 max_disk_entries=DISK_MAX_ENTRIES):
+        self.db_path = db_path or None
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+        self._disk_writes = 0
+
+    # ---- disk layer ----
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS sentiment_cache "
+                     "(key TEXT PRIMARY KEY, model TEXT, version TEXT, result TEXT)")
+        return conn
+
+    def _disk_get(self, keys):
+        if not self.db_path or not keys:
+            return {}
+        found = {}
+        with closing(self._connect()) as conn:
+            # Stay under SQLite's bound-parameter limit
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                marks = ", ".join("?" for _ in chunk)
+                for key, result in conn.execute(
+                        f"SELECT key, result FROM sentiment_cache WHERE key IN ({marks})", chunk):
+                    found[key] = json.loads(result)
+        return found
+
+    def _disk_put(self, rows):
+        if not self.db_path or not rows:
+            return
+        with closing(self._connect()) as conn, conn:
+            conn.executemany("INSERT OR REPLACE INTO sentiment_cache VALUES (?, ?, ?, ?)", rows)
+            self._disk_writes += len(rows)
+            # Trim the oldest rows now and then rather than on every write
+            if self._disk_writes >= 1000:
+                self._disk_writes = 0
+                conn.execute("DELETE FROM sentiment_cache WHERE rowid <= "
+                             "(SELECT MAX(rowid) FROM sentiment_cache) - ?", (self.max_disk_entries,))
+
+    # ---- public API ----
+
+    def get_many(self, texts, model, version):
+        """
+        Look up many notes at once.
+
+        Returns:
+        - Dictionary of text -> cached result for the texts that were found
+        """
+        keys = {text: cache_key(text, model, version) for text in texts}
+        found, missing = {}, []
+        with self._lock:
+            for text, key in keys.items():
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    found[text] = self._memory[key]
+                    self._stats["hits"] += 1
+                else:
+                    missing.append(text)
+
+        if missing:
+            on_disk = self._disk_get([keys[text] for text in missing])
+            with self._lock:
+                for text in missing:
+                    key = keys[text]
+                    if key in on_disk:
+                        found[text] = on_disk[key]
+                        self._remember(key, on_disk[key])
+                        self._stats["disk_hits"] += 1
+                    else:
+                        self._stats["misses"] += 1
+        return found
+
+    def put_many(self, results, model, version):
+        """Store a dictionary of text -> result for one model version"""
+        rows = []
+        with self._lock:
+            for text, result in results.items():
+                key = cache_key(text, model, version)
+                self._remember(key, result)
+                rows.append((key, model, str(version), json.dumps(result)))
+        self._disk_put(rows)
+
+    def get(self, text, model, version):
+        """Cached result of one note, or None"""
+        return self.get_many([text], model, version).get(text)
+
+    def put(self, text, result, model, version):
+        self.put_many({text: result}, model, version)
+
+    def _remember(self, key, result):
+        """Insert into the in-memory LRU (caller holds the lock)"""
+        self._memory[key] = result
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def stats(self):
+        """Hit/miss counts and the hit rate (memory and disk hits count as hits)"""
+        with self._lock:
+            stats = dict(self._stats, entries=len(self._memory))
+        lookups = stats["hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = round((stats["hits"] + stats["disk_hits"]) / lookups, 3) if lookups else None
+        return stats
+
+    def clear(self, disk=False):
+        """Empty the in-memory layer (and the SQLite file when disk=True)"""
+        with self._lock:
+            self._memory.clear()
+            self._stats = dict.fromkeys(self._stats, 0)
+        if disk and self.db_path and os.path.exists(self.db_path):
+            with closing(self._connect()) as conn, conn:
+                conn.execute("DELETE FROM sentiment_cache")
+
+
+def cached_scores(texts, model, version, score_func, cache=None):
+    """
+    Score notes through the cache, running score_func only on the misses.
+
+    Parameters:
+    - texts: Iterable of note strings (duplicates are looked up once)
+    - model / version: Identify the scorer; a new version never reuses old results
+    - score_func: Function taking a list of texts and returning a list of results
+    - cache: SentimentCache to use (default: the shared one)
+
+    Returns:
+    - Dictionary of text -> result for every distinct text
+    """
+    cache = cache or get_sentiment_cache()
+    texts = list(dict.fromkeys(texts))
+    results = cache.get_many(texts, model, version)
+    missing = [text for text in texts if text not in results]
+    if missing:
+        computed = dict(zip(missing, score_func(missing)))
+        cache.put_many(computed, model, version)
+        results.update(computed)
+    return results
+
+
+# Process-wide, like the model registry
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_sentiment_cache():
+    """Return the shared sentiment cache"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = SentimentCache()
+        return _shared
+
+
+def sentiment_cache_stats():
+    """Hit-rate metrics of the shared cache"""
+    return get_sentiment_cache().stats()
@@ -0,0 +1,181 @@
+# modules/simulation.py
+import hashlib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from modules.visualization import (simulate_water_levels, simulate_feeding_records,
+                                   DRINKING_PROFILE, REFILL_HOUR, REFERENCE_BOWL_ML, FEEDING_TIMES)
+
+# Named drinking profiles a population spec can refer to
+DRINKING_PROFILES = {
+    'normal': DRINKING_PROFILE,
+    'light': dict(DRINKING_PROFILE, active_probability=0.5, rest_probability=0.2,
+                  active_consumption=(1.5, 3.5), rest_consumption=(0.3, 1.2)),
+    'heavy': dict(DRINKING_PROFILE, active_probability=0.85, rest_probability=0.45,
+                  active_consumption=(3.0, 6.0), rest_consumption=(1.0, 2.5)),
+}
+
+# Defaults for any field a cat spec leaves out
+DEFAULT_CAT = {
+    'household': 'household_0',
+    'cat_name': 'Whiskers',
+    'bowl_ml': REFERENCE_BOWL_ML,
+    'refill_hour': REFILL_HOUR,
+    'feeding_times': FEEDING_TIMES,
+    'portion_g': 50,
+    'drinking_profile': 'normal',
+    'presence_probability': 0.9,
+}
+
+
+def make_population(n_households, cats_per_household=2, seed=0):
+    """
+    Build a random population spec for load tests and capacity planning.
+
+    Parameters:
+    - n_households: Number of virtual households
+    - cats_per_household: Cats in each household (default: 2)
+    - seed: Seed for the spec itself (cat data is seeded per cat later)
+
+    Returns:
+    - List of cat spec dictionaries (see DEFAULT_CAT for the fields)
+    """
+    rng = np.random.default_rng(seed)
+    schedules = [FEEDING_TIMES, (7, 19), (6, 12, 18), (9, 14, 20, 23)]
+    population = []
+    for h in range(n_households):
+        for c in range(cats_per_household):
+            population.append({
+                'household': f"household_{h}",
+                'cat_name': f"cat_{c}",
+                'bowl_ml': int(rng.choice([300, 500, 750, 1000])),
+                'refill_hour': int(rng.integers(6, 10)),
+                'feeding_times': schedules[rng.integers(len(schedules))],
+                'portion_g': int(rng.choice([35, 50, 65])),
+                'drinking_profile': str(rng.choice(list(DRINKING_PROFILES))),
+            })
+    return population
+
+
+def cat_seed(seed, cat):
+    """Seed derived from the run seed and the cat's identity, not its position"""
+    identity = f"{cat.get('household')}/{cat.get('cat_name')}".encode()
+    return np.random.SeedSequence([seed, int.from_bytes(hashlib.blake2b(identity, digest_size=8).digest(), 'little')])
+
+
+def simulate_cat(cat, start_date="2024-12-13", days=7, seed=0):
+    """
+    Simulate one cat's water and feeding tables.
+
+    Parameters:
+    - cat: Cat spec dictionary (missing fields use DEFAULT_CAT)
+    - start_date / days: Simulation window
+    - seed: Run seed; the same seed and cat always give the same data
+
+    Returns:
+    - (water DataFrame, feeding DataFrame), both with household and cat_name columns
+    """
+    cat = dict(DEFAULT_CAT, **cat)
+    water_seed, feeding_seed = cat_seed(seed, cat).spawn(2)
+    profile = cat['drinking_profile']
+    if isinstance(profile, str):
+        profile = DRINKING_PROFILES[profile]
+
+    sim = simulate_water_levels(start_date, days, rng=np.random.default_rng(water_seed),
+                                profile=profile, refill_hour=cat['refill_hour'],
+                                bowl_ml=cat['bowl_ml'])
+    water = pd.DataFrame({
+        'household': cat['household'],
+        'cat_name': cat['cat_name'],
+        'timestamp': sim['timestamps'],
+        'water_level_percent': np.round(sim['levels'][0], 2),
+        'refill_event': sim['refill_event'],
+        'cat_drinking': sim['cat_drinking'][0]
+    })
+
+    feeding = simulate_feeding_records(start_date, days, rng=np.random.default_rng(feeding_seed),
+                                       feeding_times=cat['feeding_times'],
+                                       portion_g=cat['portion_g'],
+                                       presence_probability=cat['presence_probability'])
+    feeding.insert(0, 'cat_name', cat['cat_name'])
+    feeding.insert(0, 'household', cat['household'])
+    return water, feeding
+
+
+def _simulate_batch(args):
+    """Process-pool task: simulate a batch of cats and concatenate their tables"""
+    cats, start_date, days, seed = args
+    results = [simulate_cat(cat, start_date, days, seed) for cat in cats]
+    return (pd.concat([w for w, _ in results], ignore_index=True),
+            pd.concat([f for _, f in results], ignore_index=True))
+
+
+def storage_sink(water_table="water_population", feeding_table="feeding_population"):
+    """
+    Return a sink that writes each simulated chunk to storage.
+
+    The first chunk replaces the tables, later chunks are appended.
+    """
+    from modules.data_loader import save_table, append_table
+    first = [True]
+
+    def sink(water, feeding):
+        if first[0]:
+            save_table(water, water_table)
+            save_table(feeding, feeding_table)
+            first[0] = False
+        else:
+            append_table(water, water_table)
+            append_table(feeding, feeding_table)
+    return sink
+
+
+def simulate_population(population, start_date="2024-12-13", days=7, seed=0,
+                        workers=None, cats_per_task=16, sink=None):
+    """
+    Simulate every cat of a population in parallel and stream the tables out.
+
+    Parameters:
+    - population: List of cat spec dictionaries (e.g. from make_population)
+    - start_date / days: Simulation window
+    - seed: Run seed; each cat's data depends only on this and its identity
+    - workers: Worker processes (default: CPU count; 0 runs in this process)
+    - cats_per_task: Cats per pool task, amortizing inter-process overhead
+    - sink: callback(water_df, feeding_df) per finished chunk, in population
+      order (default: storage_sink(), replacing the water_population and
+      feeding_population tables; the tracker's single-bowl water/feeding
+      tables are never touched)
+
+    Returns:
+    - Throughput report dictionary (cats, cat_days, rows, seconds, cat_days_per_second)
+    """
+    sink = sink or storage_sink()
+    tasks = [(population[i:i + cats_per_task], str(start_date), days, seed)
+             for i in range(0, len(population), cats_per_task)]
+    workers = os.cpu_count() if workers is None else workers
+
+    report = {'cats': len(population), 'days': days, 'workers': workers,
+              'water_rows': 0, 'feeding_rows': 0}
+    start = time.perf_counter()
+    if workers == 0:
+        chunks = map(_simulate_batch, tasks)
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        chunks = executor.map(_simulate_batch, tasks)
+    try:
+        for water, feeding in chunks:
+            sink(water, feeding)
+            report['water_rows'] += len(water)
+            report['feeding_rows'] += len(feeding)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    elapsed = time.perf_counter() - start
+    report['cat_days'] = len(population) * days
+    report['seconds'] = round(elapsed, 3)
+    report['cat_days_per_second'] = round(report['cat_days'] / elapsed, 1) if elapsed > 0 else None
+    return report
@@ -0,0 +1,577 @@
+# modules/storage.py
+import glob
+import io
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+import uuid
+from contextlib import closing, contextmanager
+import pandas as pd
+from modules import data_loader
+
+DB_PATH = "data/cat_care.db"
+
+# Known tables: where their CSV lives, the column types they must have and
+# the column used for date-range queries. Typed columns let binary backends
+# skip text parsing and dtype inference.
+TABLES = {
+    "activity": {
+        "csv": "data/sample_data.csv",
+        "time_column": "date",
+        "schema": {
+            "date": "string", "time": "string", "activity": "string",
+            "cat_name": "string", "amount": "string", "notes": "string"
+        }
+    },
+    "feeding_log": {
+        "csv": "data/feeding_log.csv",
+        "time_column": "date",
+        "schema": {
+            "date": "string", "food_amount_g": "float64",
+            "water_amount_ml": "float64", "weight_kg": "float64"
+        }
+    },
+    "feeding": {
+        "csv": "data/feeding_simulation.csv",
+        "time_column": "timestamp",
+        "schema": {
+            "household": "string", "cat_name": "string",
+            "timestamp": "datetime64[ns]", "food_amount": "float64",
+            "cat_present": "bool", "event_type": "string"
+        }
+    },
+    "water": {
+        "csv": "data/water_simulation.csv",
+        "time_column": "timestamp",
+        "schema": {
+            "household": "string", "cat_name": "string",
+            "timestamp": "datetime64[ns]", "water_level_percent": "float64",
+            "refill_event": "bool", "cat_drinking": "bool"
+        }
+    },
+    "pet_log": {
+        "csv": "pet_log.csv",
+        "time_column": "timestamp",
+        "schema": {
+            "timestamp": "datetime64[ns]", "event": "string", "amount": "float64",
+            "unit": "string", "weight_kg": "float64", "food_stock_g": "float64",
+            "water_stock_ml": "float64"
+        }
+    }
+}
+
+
+# Multi-bowl copies of the water/feeding tables. The tracker page reads
+# "water" and "feeding" as the history of a single bowl, so simulated
+# populations and sensor streams from many households are kept apart.
+TABLES["water_population"] = dict(TABLES["water"], csv="data/water_population.csv")
+TABLES["feeding_population"] = dict(TABLES["feeding"], csv="data/feeding_population.csv")
+TABLES["water_sensors"] = dict(TABLES["water"], csv="data/water_sensors.csv")
+TABLES["feeding_sensors"] = dict(TABLES["feeding"], csv="data/feeding_sensors.csv")
+
+
+def apply_schema(df, table):
+    """Cast the table's known columns to their schema types (other columns untouched)"""
+    schema = TABLES[table]["schema"]
+    df = df.copy()
+    for column, dtype in schema.items():
+        if column not in df.columns or df[column].dtype == dtype:
+            continue
+        if dtype.startswith("datetime"):
+            # ISO8601 accepts both "2024-12-14" and "2024-12-14 00:00:00" in one column
+            df[column] = pd.to_datetime(df[column], format="ISO8601").astype(dtype)
+        elif dtype == "bool" and df[column].dtype == object:
+            df[column] = df[column].astype(str).str.lower().map({"true": True, "false": False}) \
+                .fillna(False).astype(bool)
+        elif dtype == "bool":
+            df[column] = df[column].fillna(0).astype(bool)
+        else:
+            df[column] = df[column].astype(dtype)
+    return df
+
+
+def _time_bound(value, table):
+    """Convert a date-range bound to the type of the table's time column"""
+    time_column = TABLES[table]["time_column"]
+    bound = pd.Timestamp(value)
+    if TABLES[table]["schema"][time_column].startswith("datetime"):
+        return bound
+    return bound.strftime("%Y-%m-%d")
+
+
+def filter_frame(df, table, cat_name=None, start=None, end=None):
+    """
+    Keep the rows of one cat and/or a time range [start, end).
+
+    Filtering on a cat the table has no cat_name column for returns no rows.
+    """
+    if df.empty:
+        return df
+    mask = pd.Series(True, index=df.index)
+    if cat_name is not None:
+        if "cat_name" not in df.columns:
+            return df.iloc[0:0]
+        mask &= df["cat_name"] == cat_name
+    time_column = TABLES[table]["time_column"]
+    if start is not None:
+        mask &= df[time_column] >= _time_bound(start, table)
+    if end is not None:
+        mask &= df[time_column] < _time_bound(end, table)
+    return df[mask].reset_index(drop=True)
+
+
+class CsvBackend:
+    """Plain CSV files (the original format, needs no extra packages)"""
+
+    name = "csv"
+
+    def path(self, table):
+        return TABLES[table]["csv"]
+
+    def cache_key(self, table):
+        return self.path(table)
+
+    def signature(self, table):
+        return data_loader._file_signature(self.path(table))
+
+    def exists(self, table):
+        return os.path.exists(self.path(table))
+
+    def read(self, table):
+        df = pd.read_csv(self.path(table))
+        return apply_schema(df, table) if not df.empty else df
+
+    def write(self, df, table):
+        df.to_csv(self.path(table), index=False, date_format=data_loader.CSV_DATE_FORMAT)
+
+    def write_chunks(self, chunks, table):
+        """Replace the table with a stream of frames; the old file stays until the last one is written"""
+        path = self.path(table)
+        fd, tmp = tempfile.mkstemp(prefix=".", suffix=".csv", dir=os.path.dirname(path) or ".")
+        try:
+            with os.fdopen(fd, "w", newline="", encoding="utf-8") as f:
+                header = True
+                for df in chunks:
+                    df.to_csv(f, index=False, header=header, date_format=data_loader.CSV_DATE_FORMAT)
+                    header = False
+            os.replace(tmp, path)
+        except BaseException:
+            os.remove(tmp)
+            raise
+
+    def append(self, df, table):
+        data_loader.append_csv(df, self.path(table))
+
+    def read_after(self, table, cursor=None):
+        """
+        Rows appended since cursor (all rows when cursor is None).
+
+        The cursor is the byte offset read up to and the last line before it;
+        if that line is no longer there the file was rewritten.
+
+        Returns:
+        - (rows, new cursor), or None if the file was replaced since cursor
+        """
+        with open(self.path(table), "rb") as f:
+            with data_loader._locked(f):  # appenders hold it while writing
+                header = f.readline()
+                start, last_line = len(header), b""
+                if cursor is not None:
+                    start, last_line = cursor[0], cursor[1].encode("utf-8")
+                    f.seek(max(start - len(last_line), 0))
+                    if start < len(header) or f.read(len(last_line)) != last_line:
+                        return None
+                f.seek(start)
+                data = f.read()
+        if not header.strip():
+            return pd.DataFrame(), [0, ""]
+        # Only complete lines; a partly written row is picked up next time
+        data = data[:data.rfind(b"\n") + 1]
+        if data:
+            last_line = data[data.rfind(b"\n", 0, len(data) - 1) + 1:]
+        cursor = [start + len(data), last_line.decode("utf-8")]
+        if not data.strip():
+            return pd.DataFrame(columns=pd.read_csv(io.BytesIO(header), encoding="utf-8-sig").columns), cursor
+        df = pd.read_csv(io.BytesIO(header + data), encoding="utf-8-sig")
+        return apply_schema(df, table), cursor
+
+    def query(self, table, cat_name=None, start=None, end=None):
+        return filter_frame(self.read(table), table, cat_name, start, end)
+
+    def drop(self, table):
+        if os.path.exists(self.path(table)):
+            os.remove(self.path(table))
+
+
+class ParquetBackend:
+    """
+    Columnar Parquet storage: one directory of part files per table.
+
+    Appends add a small part file instead of rewriting the table; once a
+    table has more than max_parts parts they are compacted into one.
+    """
+
+    name = "parquet"
+
+    def __init__(self, max_parts=64):
+        import pyarrow  # noqa: F401  (fail early if the engine is missing)
+        self.max_parts = max_parts
+
+    def path(self, table):
+        return os.path.splitext(TABLES[table]["csv"])[0] + ".parquet"
+
+    def cache_key(self, table):
+        return self.path(table)
+
+    def signature(self, table):
+        return data_loader._file_signature(self.path(table))
+
+    @contextmanager
+    def _table_lock(self, table):
+        """Serialize writers (and readers during compaction) across sessions"""
+        os.makedirs(self.path(table), exist_ok=True)
+        with open(os.path.join(self.path(table), ".lock"), "a+b") as f:
+            with data_loader._locked(f):
+                yield
+
+    def _parts(self, table):
+        return sorted(glob.glob(os.path.join(self.path(table), "*.parquet")))
+
+    def exists(self, table):
+        return len(self._parts(table)) > 0
+
+    def read(self, table):
+        with self._table_lock(table):
+            parts = self._parts(table)
+            if not parts:
+                return pd.DataFrame()
+            if len(parts) == 1:
+                return pd.read_parquet(parts[0])
+            return pd.concat([pd.read_parquet(p) for p in parts], ignore_index=True)
+
+    def _write_part(self, df, table):
+        # Time-ordered names keep parts (and rows) in insertion order
+        name = f"part-{time.time_ns():020d}-{uuid.uuid4().hex[:8]}.parquet"
+        tmp = os.path.join(self.path(table), "." + name)
+        df.to_parquet(tmp, index=False)
+        os.replace(tmp, os.path.join(self.path(table), name))
+
+    def _replace(self, df, table):
+        old_parts = self._parts(table)
+        self._write_part(apply_schema(df, table), table)
+        for part in old_parts:
+            os.remove(part)
+
+    def write(self, df, table):
+        with self._table_lock(table):
+            self._replace(df, table)
+
+    def write_chunks(self, chunks, table):
+        """
+        Replace the table with a stream of frames.
+
+        Each frame is staged as a hidden part file (ignored by readers); the
+        old parts are swapped for the staged ones only after the last frame.
+        """
+        os.makedirs(self.path(table), exist_ok=True)
+        staged = []
+        try:
+            for df in chunks:
+                name = f"part-{time.time_ns():020d}-{uuid.uuid4().hex[:8]}.parquet"
+                staged.append(name)
+                apply_schema(pd.DataFrame(df), table).to_parquet(
+                    os.path.join(self.path(table), ".staged-" + name), index=False)
+        except BaseException:
+            for name in staged:
+                tmp = os.path.join(self.path(table), ".staged-" + name)
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+            raise
+        with self._table_lock(table):
+            old_parts = self._parts(table)
+            for part in old_parts:
+                os.remove(part)
+            for name in staged:
+                os.replace(os.path.join(self.path(table), ".staged-" + name),
+                           os.path.join(self.path(table), name))
+            parts = self._parts(table)
+            if len(parts) > self.max_parts:
+                self._compact(table, parts)
+
+    def append(self, df, table):
+        with self._table_lock(table):
+            self._write_part(apply_schema(pd.DataFrame(df), table), table)
+            parts = self._parts(table)
+            if len(parts) > self.max_parts:
+                self._compact(table, parts)
+
+    def read_after(self, table, cursor=None):
+        """
+        Rows appended since cursor (all rows when cursor is None).
+
+        Part files are never modified, so the cursor is the names of the parts
+        already read; if one of them is gone the table was rewritten or compacted.
+
+        Returns:
+        - (rows, new cursor), or None if the table was rewritten since cursor
+        """
+        with self._table_lock(table):
+            parts = self._parts(table)
+            names = [os.path.basename(part) for part in parts]
+            seen = set(cursor or ())
+            if not seen.issubset(names):
+                return None
+            new = [pd.read_parquet(part) for part, name in zip(parts, names) if name not in seen]
+        if not new:
+            return pd.DataFrame(), names
+        return (new[0] if len(new) == 1 else pd.concat(new, ignore_index=True)), names
+
+    def _compact(self, table, parts):
+        """Merge parts into one file, streaming a part at a time (bounded memory)"""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        schema = pa.unify_schemas([pq.read_schema(p) for p in parts])
+        name = f"part-{time.time_ns():020d}-{uuid.uuid4().hex[:8]}.parquet"
+        tmp = os.path.join(self.path(table), "." + name)
+        with pq.ParquetWriter(tmp, schema) as writer:
+            for part in parts:
+                data = pq.read_table(part)
+                for field in schema:
+                    if field.name not in data.column_names:
+                        data = data.append_column(field, pa.nulls(len(data), field.type))
+                writer.write_table(data.select(schema.names).cast(schema))
+        os.replace(tmp, os.path.join(self.path(table), name))
+        for part in parts:
+            os.remove(part)
+
+    def query(self, table, cat_name=None, start=None, end=None):
+        return filter_frame(self.read(table), table, cat_name, start, end)
+
+    def drop(self, table):
+        if os.path.isdir(self.path(table)):
+            shutil.rmtree(self.path(table))
+
+
+class SqliteBackend:
+    """
+    Embedded SQLite event store: one database file, one SQL table per table.
+
+    Runs in WAL mode so dashboards keep reading while another session
+    writes, and indexes (cat_name, time) and activity so filtered queries
+    only touch the rows they return. Timestamps are stored as
+    'YYYY-MM-DD HH:MM:SS' text, which sorts and compares chronologically.
+    """
+
+    name = "sqlite"
+    TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+    def __init__(self, db_path=DB_PATH):
+        self.db_path = db_path
+
+    def path(self, table):
+        return self.db_path
+
+    def cache_key(self, table):
+        return f"{self.db_path}#{table}"
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS _table_versions "
+                     "(name TEXT PRIMARY KEY, version INTEGER NOT NULL)")
+        # Bumped when a table is dropped or replaced (its rowids start over)
+        conn.execute("CREATE TABLE IF NOT EXISTS _table_generations "
+                     "(name TEXT PRIMARY KEY, generation INTEGER NOT NULL)")
+        return conn
+
+    def _new_generation(self, conn, table):
+        conn.execute("INSERT INTO _table_generations (name, generation) VALUES (?, 1) "
+                     "ON CONFLICT(name) DO UPDATE SET generation = generation + 1", (table,))
+
+    def _columns(self, conn, table):
+        return [row[1] for row in conn.execute(f'PRAGMA table_info("{table}")')]
+
+    def signature(self, table):
+        """Per-table write counter, so cached frames survive writes to other tables"""
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT version FROM _table_versions WHERE name = ?",
+                               (table,)).fetchone()
+        return row[0] if row else None
+
+    def exists(self, table):
+        if not os.path.exists(self.db_path):
+            return False
+        with closing(self._connect()) as conn:
+            return len(self._columns(conn, table)) > 0
+
+    def _sql_type(self, df, table, column):
+        dtype = TABLES[table]["schema"].get(column) or str(df[column].dtype)
+        if dtype == "bool":
+            return "INTEGER"
+        if dtype.startswith(("float", "int")):
+            return "REAL" if dtype.startswith("float") else "INTEGER"
+        return "TEXT"
+
+    def _create(self, conn, df, table):
+        columns = ", ".join(f'"{c}" {self._sql_type(df, table, c)}' for c in df.columns)
+        conn.execute(f'CREATE TABLE "{table}" ({columns})')
+        time_column = TABLES[table]["time_column"]
+        if "cat_name" in df.columns and time_column in df.columns:
+            conn.execute(f'CREATE INDEX "idx_{table}_cat_time" ON "{table}" (cat_name, "{time_column}")')
+        if time_column in df.columns:
+            conn.execute(f'CREATE INDEX "idx_{table}_time" ON "{table}" ("{time_column}")')
+        if "activity" in df.columns:
+            conn.execute(f'CREATE INDEX "idx_{table}_activity" ON "{table}" (activity)')
+
+    def _insert(self, conn, df, table):
+        df = apply_schema(df, table)
+        for column in df.columns:
+            if pd.api.types.is_datetime64_any_dtype(df[column]):
+                df[column] = df[column].dt.strftime(self.TIME_FORMAT)
+        values = df.astype(object).where(df.notna(), None)
+        names = ", ".join(f'"{c}"' for c in df.columns)
+        marks = ", ".join("?" for _ in df.columns)
+        conn.executemany(f'INSERT INTO "{table}" ({names}) VALUES ({marks})',
+                         values.itertuples(index=False, name=None))
+        conn.execute("INSERT INTO _table_versions (name, version) VALUES (?, 1) "
+                     "ON CONFLICT(name) DO UPDATE SET version = version + 1", (table,))
+
+    def write(self, df, table):
+        self.write_chunks([df], table)
+
+    def write_chunks(self, chunks, table):
+        """
+        Replace the table with a stream of frames in one transaction.
+
+        Readers keep seeing the old rows until the commit; if a frame
+        fails, the transaction is rolled back and the table is unchanged.
+        """
+        with closing(self._connect()) as conn, conn:
+            conn.execute("BEGIN IMMEDIATE")  # DDL would otherwise autocommit
+            conn.execute(f'DROP TABLE IF EXISTS "{table}"')
+            self._new_generation(conn, table)
+            created = False
+            for df in chunks:
+                if not created:
+                    self._create(conn, df, table)
+                    created = True
+                self._insert(conn, df, table)
+
+    def append(self, df, table):
+        df = pd.DataFrame(df)
+        with closing(self._connect()) as conn, conn:
+            columns = self._columns(conn, table)
+            if not columns:
+                self._create(conn, df, table)
+            else:
+                unknown = [c for c in df.columns if c not in columns]
+                if unknown:
+                    raise ValueError(f"Columns not in table {table}: {', '.join(unknown)}")
+            self._insert(conn, df, table)
+
+    def _select(self, table, where="", params=()):
+        with closing(self._connect()) as conn:
+            if not self._columns(conn, table):
+                return pd.DataFrame()
+            df = pd.read_sql_query(f'SELECT * FROM "{table}" {where} ORDER BY rowid',
+                                   conn, params=params)
+        return apply_schema(df, table) if not df.empty else df
+
+    def read(self, table):
+        return self._select(table)
+
+    def read_after(self, table, cursor=None):
+        """
+        Rows appended since cursor (all rows when cursor is None).
+
+        The cursor is the table's generation and the last rowid read; rows
+        are only ever appended, so newer rows have larger rowids.
+
+        Returns:
+        - (rows, new cursor), or None if the table was replaced since cursor
+        """
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN")  # one snapshot for the generation and the rows
+            row = conn.execute("SELECT generation FROM _table_generations WHERE name = ?",
+                               (table,)).fetchone()
+            generation = row[0] if row else 0
+            if cursor is not None and cursor[0] != generation:
+                return None
+            last_rowid = cursor[1] if cursor is not None else 0
+            if not self._columns(conn, table):
+                return pd.DataFrame(), [generation, last_rowid]
+            df = pd.read_sql_query(f'SELECT rowid AS "_rowid", * FROM "{table}" WHERE rowid > ? '
+                                   'ORDER BY rowid', conn, params=(last_rowid,))
+            conn.rollback()
+        if df.empty:
+            return df.drop(columns="_rowid"), [generation, last_rowid]
+        cursor = [generation, int(df["_rowid"].iloc[-1])]
+        return apply_schema(df.drop(columns="_rowid"), table), cursor
+
+    def query(self, table, cat_name=None, start=None, end=None):
+        """Let SQLite (and its indexes) pick the rows instead of filtering in pandas"""
+        with closing(self._connect()) as conn:
+            columns = self._columns(conn, table)
+        if cat_name is not None and "cat_name" not in columns:
+            return pd.DataFrame(columns=columns)
+
+        clauses, params = [], []
+        time_column = TABLES[table]["time_column"]
+        if cat_name is not None:
+            clauses.append("cat_name = ?")
+            params.append(cat_name)
+        for bound, op in [(start, ">="), (end, "<")]:
+            if bound is not None:
+                value = _time_bound(bound, table)
+                if isinstance(value, pd.Timestamp):
+                    value = value.strftime(self.TIME_FORMAT)
+                clauses.append(f'"{time_column}" {op} ?')
+                params.append(value)
+        where = "WHERE " + " AND ".join(clauses) if clauses else ""
+        return self._select(table, where, params)
+
+    def drop(self, table):
+        with closing(self._connect()) as conn, conn:
+            conn.execute(f'DROP TABLE IF EXISTS "{table}"')
+            conn.execute("DELETE FROM _table_versions WHERE name = ?", (table,))
+            self._new_generation(conn, table)
+
+
+def get_backend(name=None):
+    """
+    Return the storage backend to use.
+
+    Parameters:
+    - name: "parquet", "sqlite" or "csv"; defaults to the CAT_CARE_STORAGE
+      environment variable, then to Parquet when pyarrow is installed, else CSV
+    """
+    name = name or os.environ.get("CAT_CARE_STORAGE")
+    if name == "csv":
+        return CsvBackend()
+    if name == "sqlite":
+        return SqliteBackend()
+    try:
+        return ParquetBackend()
+    except ImportError:
+        if name == "parquet":
+            raise
+        return CsvBackend()
+
+
+def migrate_csv(table, backend=None):
+    """Copy a table's CSV into the backend (no-op if already there or no CSV)"""
+    backend = backend or get_backend()
+    csv_backend = CsvBackend()
+    if backend.name == "csv" or backend.exists(table) or not csv_backend.exists(table):
+        return False
+    backend.write(csv_backend.read(table), table)
+    return True
+
+
+def drop_table(table, backend=None):
+    """Delete a table's stored data from the backend"""
+    (backend or get_backend()).drop(table)
@@ -1,7 +1,10 @@
 import matplotlib.pyplot as plt
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+import hashlib
+import io
+import threading
+from collections import OrderedDict
 
 def plot_line_chart(df, x, y, title="Line Chart"):
     fig, ax = plt.subplots(figsize=(10,4))
@@ -25,68 +28,339 @@ def plot_bar_chart(df, x, y, title="Bar Chart"):
     return fig
 
 
+def plot_daily_bar_chart(df, y, ylabel, title, color):
+    """
+    Bar chart with one bar per day (e.g. daily stats from calculate_daily_*).
+    
+    Parameters:
+    - df: DataFrame with a 'date' column and the value column y
+    - y / ylabel / title / color: Value column and styling
+    
+    Returns:
+    - matplotlib figure
+    """
+    fig, ax = plt.subplots(figsize=(10, 4))
+    ax.bar(df['date'].astype(str), df[y], color=color, alpha=0.8)
+    ax.set_xlabel('Date', fontsize=11)
+    ax.set_ylabel(ylabel, fontsize=11)
+    ax.set_title(title, fontsize=13, fontweight='bold')
+    ax.grid(axis='y', alpha=0.3)
+    plt.xticks(rotation=45)
+    plt.tight_layout()
+    return fig
+
+
+def plot_hourly_bar_chart(df, y, ylabel, title, color, highlight_hours=None,
+                          highlight_color=None, xticks=None, figsize=(10, 4)):
+    """
+    Bar chart with one bar per hour of day.
+    
+    Parameters:
+    - df: DataFrame with an 'hour' column and the value column y
+    - y / ylabel / title / color: Value column and styling
+    - highlight_hours: Hours drawn in highlight_color instead of color (e.g. meal times)
+    - xticks: Tick positions for the hour axis
+    - figsize: Figure size (default: (10, 4))
+    
+    Returns:
+    - matplotlib figure
+    """
+    fig, ax = plt.subplots(figsize=figsize)
+    if highlight_hours is not None:
+        color = [highlight_color if h in highlight_hours else color for h in df['hour']]
+        alpha = 0.8
+    else:
+        alpha = 0.7
+    ax.bar(df['hour'], df[y], color=color, alpha=alpha)
+    ax.set_xlabel('Hour of Day', fontsize=11)
+    ax.set_ylabel(ylabel, fontsize=11)
+    ax.set_title(title, fontsize=13 if figsize[0] >= 10 else 12, fontweight='bold')
+    if xticks is not None:
+        ax.set_xticks(list(xticks))
+    ax.grid(axis='y', alpha=0.3)
+    plt.tight_layout()
+    return fig
+
+
+# ============ DOWNSAMPLING FOR LONG TIME SERIES ============
+
+def downsample_minmax(df, column, max_points):
+    """
+    Reduce a series to at most ~max_points rows, keeping each bucket's min and max.
+    
+    Rows are split into max_points // 2 equal buckets along the existing
+    order; from each bucket the rows holding the lowest and highest value
+    are kept (in original order), plus the first and last row. Spikes such
+    as refills and dips such as an empty bowl therefore survive, which
+    plain every-Nth-row sampling would skip.
+    
+    Parameters:
+    - df: DataFrame ordered by time
+    - column: Value column to preserve extremes of
+    - max_points: Point budget (e.g. 2 × chart width in pixels)
+    
+    Returns:
+    - DataFrame with a subset of the rows (df itself if already small enough)
+    """
+    n = len(df)
+    if max_points is None or n <= max_points or max_points < 4:
+        return df
+    
+    n_buckets = max_points // 2
+    bucket_size = -(-n // n_buckets)  # ceil
+    padded = n_buckets * bucket_size
+    values = df[column].to_numpy(dtype=float)
+    
+    # Pad with values that never win, then find extremes bucket by bucket
+    low = np.full(padded, np.inf)
+    high = np.full(padded, -np.inf)
+    low[:n] = np.where(np.isnan(values), np.inf, values)
+    high[:n] = np.where(np.isnan(values), -np.inf, values)
+    offsets = np.arange(n_buckets) * bucket_size
+    argmin = low.reshape(n_buckets, bucket_size).argmin(axis=1) + offsets
+    argmax = high.reshape(n_buckets, bucket_size).argmax(axis=1) + offsets
+    
+    keep = np.unique(np.concatenate(([0, n - 1], argmin, argmax)))
+    return df.iloc[keep[keep < n]]
+
+
+def _point_budget(fig):
+    """Two points (min and max) per horizontal pixel of the rendered figure"""
+    return 2 * int(fig.get_figwidth() * RENDER_DPI)
+
+
+# ============ CHART RENDER CACHE ============
+# Rendered PNGs keyed by chart function, a content hash of the input frame and
+# the chart parameters, so unchanged charts are not redrawn on every rerun.
+
+RENDER_CACHE_MAX_BYTES = 64 * 1024 * 1024
+RENDER_CACHE_MAX_ENTRIES = 128
+RENDER_DPI = 150
+
+_render_cache = OrderedDict()  # key -> PNG bytes
+_render_stats = {"hits": 0, "misses": 0, "evictions": 0}
+# pyplot keeps global state, so figures are built one at a time across sessions
+_render_lock = threading.Lock()
+
+
+def frame_fingerprint(df):
+    """Content hash of a DataFrame (values, index, column names and dtypes)"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr([(str(c), str(t)) for c, t in df.dtypes.items()]).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def render_chart_png(plot_func, df, **params):
+    """
+    Render plot_func(df, **params) to PNG bytes, reusing the cached image when
+    the data and parameters are unchanged. The figure is always closed.
+    
+    Parameters:
+    - plot_func: Function returning a matplotlib figure (e.g. plot_water_level_chart)
+    - df: DataFrame passed as the first argument
+    - params: Extra keyword arguments for plot_func (must be hashable)
+    
+    Returns:
+    - PNG image bytes (for st.image)
+    """
+    key = (plot_func.__module__, plot_func.__qualname__, frame_fingerprint(df),
+           tuple(sorted(params.items())))
+    with _render_lock:
+        png = _render_cache.get(key)
+        if png is not None:
+            _render_cache.move_to_end(key)
+            _render_stats["hits"] += 1
+            return png
+        _render_stats["misses"] += 1
+
+        fig = plot_func(df, **params)
+        try:
+            buffer = io.BytesIO()
+            fig.savefig(buffer, format="png", dpi=RENDER_DPI, bbox_inches="tight")
+            png = buffer.getvalue()
+        finally:
+            plt.close(fig)
+
+        _render_cache[key] = png
+        while len(_render_cache) > RENDER_CACHE_MAX_ENTRIES or \
+                sum(len(v) for v in _render_cache.values()) > RENDER_CACHE_MAX_BYTES:
+            _render_cache.popitem(last=False)
+            _render_stats["evictions"] += 1
+        return png
+
+
+def render_cache_info():
+    """Return hit/miss/eviction counts and current cache size"""
+    with _render_lock:
+        return dict(_render_stats, entries=len(_render_cache),
+                    bytes=sum(len(v) for v in _render_cache.values()))
+
+
+def clear_render_cache():
+    """Drop all cached chart images"""
+    with _render_lock:
+        _render_cache.clear()
+
+
 # ============ NEW: WATER LEVEL SIMULATION FUNCTIONS ============
 
-def generate_water_level_data(start_date="2024-12-13", days=7):
+REFILL_HOUR = 8  # Bowl is refilled to 100% at 8:00 AM every day
+REFERENCE_BOWL_ML = 500  # Bowl size the consumption percentages are calibrated for
+
+# How a typical cat drinks: percent of the reference bowl per hour
+DRINKING_PROFILE = {
+    'active_hours': ((6, 10), (17, 21)),   # 6-10 AM, 5-9 PM (inclusive)
+    'active_probability': 0.7,
+    'active_consumption': (2.0, 5.0),      # 2-5% per hour
+    'rest_probability': 0.3,
+    'rest_consumption': (0.5, 2.0),        # 0.5-2% per hour
+    'fluctuation': 0.5,                    # ± random fluctuation per drink
+    'evaporation': (0.1, 0.3)              # natural evaporation per hour
+}
+
+
+def _resolve_rng(rng):
+    """Accept a numpy Generator, an int seed or None (fresh entropy)"""
+    if isinstance(rng, np.random.Generator):
+        return rng
+    return np.random.default_rng(rng)
+
+
+def _draw_water_randoms(rng, hours, n_bowls, profile=DRINKING_PROFILE):
+    """
+    Draw every random number the simulation needs in bulk.
+
+    Returns consumption, evaporation and drinking arrays of shape (n_bowls, n_hours).
+    """
+    shape = (n_bowls, len(hours))
+
+    # Higher probability during active hours
+    active = np.zeros(len(hours), dtype=bool)
+    for first, last in profile['active_hours']:
+        active |= (first <= hours) & (hours <= last)
+    (active_low, active_high) = profile['active_consumption']
+    (rest_low, rest_high) = profile['rest_consumption']
+    base_consumption = rng.uniform(np.where(active, active_low, rest_low),
+                                   np.where(active, active_high, rest_high),
+                                   size=shape)
+    cat_drinking = rng.random(shape) < np.where(active, profile['active_probability'],
+                                                profile['rest_probability'])
+    fluctuation = rng.uniform(-profile['fluctuation'], profile['fluctuation'], size=shape)
+    evaporation = rng.uniform(*profile['evaporation'], size=shape)
+
+    consumption = np.where(cat_drinking, base_consumption + fluctuation, 0.0)
+    return consumption, evaporation, cat_drinking
+
+
+def _water_levels_reference(hours, consumption, evaporation, cat_drinking, refill_hour=REFILL_HOUR):
+    """Hour-by-hour loop over pre-drawn randoms (reference for the vectorized path)"""
+    levels = np.empty_like(consumption)
+    for bowl in range(consumption.shape[0]):
+        current_level = 100.0
+        for i, hour in enumerate(hours):
+            if hour == refill_hour:
+                current_level = 100.0
+            if cat_drinking[bowl, i] and current_level > 0:
+                current_level = max(0.0, current_level - consumption[bowl, i])
+            current_level = max(0.0, current_level - evaporation[bowl, i])
+            levels[bowl, i] = current_level
+    return levels
+
+
+def _water_levels_vectorized(hours, consumption, evaporation, refill_hour=REFILL_HOUR):
+    """
+    Array version of the consumption/refill/evaporation recurrence.
+
+    Between refills the level only goes down, so it equals the running
+    subtraction clipped at zero. Consumption and evaporation are interleaved
+    so np.subtract.accumulate performs the same float operations in the same
+    order as the reference loop, which keeps both modes bit-identical.
+    """
+    n_bowls, n_hours = consumption.shape
+    steps = np.empty((n_bowls, 2 * n_hours))
+    steps[:, 0::2] = consumption
+    steps[:, 1::2] = evaporation
+
+    # One segment per refill (plus the partial one before the first refill)
+    refills = np.flatnonzero(hours == refill_hour)
+    bounds = np.concatenate(([0], refills[refills > 0], [n_hours]))
+
+    levels = np.empty_like(consumption)
+    for seg_start, seg_end in zip(bounds[:-1], bounds[1:]):
+        segment = np.empty((n_bowls, 1 + 2 * (seg_end - seg_start)))
+        segment[:, 0] = 100.0
+        segment[:, 1:] = steps[:, 2 * seg_start:2 * seg_end]
+        levels[:, seg_start:seg_end] = np.subtract.accumulate(segment, axis=1)[:, 2::2]
+
+    levels[levels <= 0] = 0.0
+    return levels
+
+
+def simulate_water_levels(start_date="2024-12-13", days=7, n_bowls=1, rng=None,
+                          method="vectorized", profile=DRINKING_PROFILE,
+                          refill_hour=REFILL_HOUR, bowl_ml=REFERENCE_BOWL_ML):
+    """
+    Simulate hourly water levels for one or many bowls.
+
+    Parameters:
+    - start_date: Starting date for simulation (default: "2024-12-13")
+    - days: Number of days to simulate (default: 7)
+    - n_bowls: Number of independent bowls to simulate (default: 1)
+    - rng: numpy Generator or int seed; the same seed gives the same data
+    - method: "vectorized" (default) or "reference" (hour-by-hour loop)
+    - profile: Drinking profile (default: DRINKING_PROFILE)
+    - refill_hour: Hour of the daily refill to 100% (default: 8)
+    - bowl_ml: Bowl size; bigger bowls drop by a smaller percentage per drink
+
+    Returns:
+    - Dictionary with 'timestamps' (DatetimeIndex), 'levels' (float array,
+      n_bowls × hours, unrounded), 'refill_event' and 'cat_drinking' arrays
+    """
+    timestamps = pd.date_range(pd.to_datetime(start_date), periods=days * 24, freq="h")
+    hours = timestamps.hour.to_numpy()
+
+    consumption, evaporation, cat_drinking = _draw_water_randoms(
+        _resolve_rng(rng), hours, n_bowls, profile)
+    if bowl_ml != REFERENCE_BOWL_ML:
+        consumption = consumption * (REFERENCE_BOWL_ML / bowl_ml)
+
+    if method == "vectorized":
+        levels = _water_levels_vectorized(hours, consumption, evaporation, refill_hour)
+    elif method == "reference":
+        levels = _water_levels_reference(hours, consumption, evaporation, cat_drinking, refill_hour)
+    else:
+        raise ValueError(f"Unknown simulation method: {method}")
+
+    return {
+        'timestamps': timestamps,
+        'levels': levels,
+        'refill_event': hours == refill_hour,
+        'cat_drinking': cat_drinking
+    }
+
+
+def generate_water_level_data(start_date="2024-12-13", days=7, rng=None, method="vectorized"):
     """
     Generate 7-day water level simulation data with hourly readings.
     
     Parameters:
     - start_date: Starting date for simulation (default: "2024-12-13")
     - days: Number of days to simulate (default: 7)
+    - rng: numpy Generator or int seed for reproducible data (default: random)
+    - method: "vectorized" (default) or "reference" (hour-by-hour loop)
     
     Returns:
     - DataFrame with columns: timestamp, water_level_percent, refill_event, cat_drinking
     """
-    
-    # Generate hourly timestamps for 7 days (168 hours)
-    start = pd.to_datetime(start_date)
-    timestamps = [start + timedelta(hours=i) for i in range(days * 24)]
-    
-    # Initialize water level data
-    water_levels = []
-    current_level = 100.0  # Start with full water bowl
-    
-    for ts in timestamps:
-        hour = ts.hour
-        
-        # Refill to 100% at 8:00 AM every day
-        if hour == 8:
-            current_level = 100.0
-            refill_event = True
-        else:
-            refill_event = False
-        
-        # Simulate cat drinking behavior
-        # Higher probability during active hours (6-10 AM, 5-9 PM)
-        if (6 <= hour <= 10) or (17 <= hour <= 21):
-            drinking_probability = 0.7
-            base_consumption = np.random.uniform(2, 5)  # 2-5% per hour
-        else:
-            drinking_probability = 0.3
-            base_consumption = np.random.uniform(0.5, 2)  # 0.5-2% per hour
-        
-        # Determine if cat drinks this hour
-        cat_drinking = np.random.random() < drinking_probability
-        
-        if cat_drinking and current_level > 0:
-            # Add random fluctuation for realism
-            fluctuation = np.random.uniform(-0.5, 0.5)
-            consumption = base_consumption + fluctuation
-            current_level = max(0, current_level - consumption)
-        
-        # Natural evaporation (very small amount)
-        evaporation = np.random.uniform(0.1, 0.3)
-        current_level = max(0, current_level - evaporation)
-        
-        water_levels.append({
-            'timestamp': ts,
-            'water_level_percent': round(current_level, 2),
-            'refill_event': refill_event,
-            'cat_drinking': cat_drinking
-        })
-    
-    return pd.DataFrame(water_levels)
+    sim = simulate_water_levels(start_date, days, n_bowls=1, rng=rng, method=method)
+    
+    return pd.DataFrame({
+        'timestamp': sim['timestamps'],
+        'water_level_percent': np.round(sim['levels'][0], 2),
+        'refill_event': sim['refill_event'],
+        'cat_drinking': sim['cat_drinking'][0]
+    })
 
 
 def check_water_alerts(water_level_percent, threshold=20):
@@ -121,64 +395,167 @@ def check_water_alerts(water_level_percent, threshold=20):
         }
 
 
-def calculate_daily_water_consumption(df):
+# Severities of check_water_alerts, as an ordered categorical
+ALERT_SEVERITY = pd.CategoricalDtype(['NORMAL', 'WARNING', 'CRITICAL'], ordered=True)
+
+
+def _severity_codes(levels, threshold):
+    """0/1/2 severity code of every level (same rules as check_water_alerts)"""
+    levels = np.asarray(levels, dtype=float)
+    return np.where(levels <= 0, 2, np.where(levels <= threshold, 1, 0)).astype(np.int8)
+
+
+def classify_water_levels(levels, threshold=20):
+    """
+    Vectorized check_water_alerts: the severity of every reading at once.
+
+    Parameters:
+    - levels: Series or array of water level percentages
+    - threshold: Alert threshold (default: 20%)
+
+    Returns:
+    - Ordered categorical Series (NORMAL < WARNING < CRITICAL) with the same index
+    """
+    index = levels.index if isinstance(levels, pd.Series) else None
+    codes = _severity_codes(levels, threshold)
+    return pd.Series(pd.Categorical.from_codes(codes, dtype=ALERT_SEVERITY),
+                     index=index, name='severity')
+
+
+def water_alert_episodes(df, threshold=20, group_by=None):
+    """
+    Find every low-water episode: a run of consecutive readings in alert.
+
+    Parameters:
+    - df: DataFrame with 'timestamp' and 'water_level_percent'
+    - threshold: Alert threshold (default: 20%)
+    - group_by: Optional column(s), e.g. ['household', 'cat_name'], so runs
+      never span two bowls
+
+    Returns:
+    - DataFrame with one row per episode: the group columns, start, end
+      (first reading back above the threshold, or the last reading if the
+      episode is still ongoing), duration, min_level, severity (worst
+      reading), readings and ongoing
+    """
+    keys = [group_by] if isinstance(group_by, str) else list(group_by or [])
+    columns = keys + ['start', 'end', 'duration', 'min_level', 'severity', 'readings', 'ongoing']
+    if df.empty:
+        return pd.DataFrame(columns=columns)
+
+    df = df[keys + ['timestamp', 'water_level_percent']]
+    if not pd.api.types.is_datetime64_any_dtype(df['timestamp']):
+        df = df.assign(timestamp=pd.to_datetime(df['timestamp']))
+    # Integer bowl ids are cheaper to sort and compare than string keys
+    bowl = df.groupby(keys, sort=False).ngroup().to_numpy() if keys else np.zeros(len(df), dtype=np.int64)
+    order = np.lexsort((df['timestamp'].to_numpy(), bowl))
+    df = df.take(order).reset_index(drop=True)
+    bowl = bowl[order]
+    levels = df['water_level_percent'].to_numpy(dtype=float)
+    timestamps = df['timestamp'].to_numpy()
+    codes = _severity_codes(levels, threshold)
+    alert = codes > 0
+    n = len(df)
+
+    # new_group[i]: row i starts a new bowl
+    new_group = np.ones(n, dtype=bool)
+    new_group[1:] = bowl[1:] != bowl[:-1]
+    prev_alert = np.concatenate(([False], alert[:-1])) & ~new_group
+    starts = np.flatnonzero(alert & ~prev_alert)
+    if not len(starts):
+        return pd.DataFrame(columns=columns)
+
+    # Runs are contiguous in the alert-only rows, so reduceat works per run
+    positions = np.flatnonzero(alert)
+    bounds = np.searchsorted(positions, starts)
+    ends = np.append(positions[bounds[1:] - 1], positions[-1])
+    after = ends + 1
+    ongoing = after >= n
+    ongoing[~ongoing] = new_group[after[~ongoing]]
+    end_times = timestamps[np.where(ongoing, ends, np.minimum(after, n - 1))]
+
+    episodes = df.loc[starts, keys].reset_index(drop=True)
+    episodes['start'] = timestamps[starts]
+    episodes['end'] = end_times
+    episodes['duration'] = episodes['end'] - episodes['start']
+    episodes['min_level'] = np.minimum.reduceat(levels[positions], bounds)
+    episodes['severity'] = pd.Categorical.from_codes(np.maximum.reduceat(codes[positions], bounds),
+                                                     dtype=ALERT_SEVERITY)
+    episodes['readings'] = ends - starts + 1
+    episodes['ongoing'] = ongoing
+    return episodes
+
+
+def _group_keys(df, group_by):
+    """Add a 'date' column and return the grouping keys (extra keys first)"""
+    df = df.copy()
+    df['date'] = pd.to_datetime(df['timestamp']).dt.date
+    extra = [group_by] if isinstance(group_by, str) else list(group_by or [])
+    return df, extra + ['date']
+
+
+def calculate_daily_water_consumption(df, group_by=None):
     """
     Calculate daily water consumption statistics from simulation data.
     
     Parameters:
     - df: DataFrame with water level data (must have 'timestamp' and 'water_level_percent')
+    - group_by: Optional extra column(s), e.g. 'cat_name', to get one row per cat per day
     
     Returns:
-    - DataFrame with daily statistics
+    - DataFrame with daily statistics (days in order of first appearance)
     """
     
-    df = df.copy()
-    df['date'] = pd.to_datetime(df['timestamp']).dt.date
-    
-    daily_stats = []
-    
-    for date in df['date'].unique():
-        day_data = df[df['date'] == date]
-        
-        # Calculate consumption
-        refill_rows = day_data[day_data['refill_event'] == True]
-        num_refills = len(refill_rows)
-        
-        start_level = day_data.iloc[0]['water_level_percent']
-        end_level = day_data.iloc[-1]['water_level_percent']
-        total_consumed = (100 * num_refills) + (start_level - end_level)
-        
-        daily_stats.append({
-            'date': date,
-            'total_consumed_percent': round(total_consumed, 2),
-            'avg_level_percent': round(day_data['water_level_percent'].mean(), 2),
-            'min_level_percent': round(day_data['water_level_percent'].min(), 2),
-            'num_refills': num_refills,
-            'drinking_events': int(day_data['cat_drinking'].sum())
-        })
-    
-    return pd.DataFrame(daily_stats)
-
-
-def plot_water_level_chart(df, alert_threshold=20):
+    df, keys = _group_keys(df, group_by)
+    df['is_refill'] = df['refill_event'] == True
+    
+    # Single pass over the frame instead of re-filtering it once per day
+    grouped = df.groupby(keys, sort=False)
+    stats = grouped.agg(
+        num_refills=('is_refill', 'sum'),
+        avg_level_percent=('water_level_percent', 'mean'),
+        min_level_percent=('water_level_percent', 'min'),
+        drinking_events=('cat_drinking', 'sum')
+    )
+    
+    # First/last reading of each day (keeps NaN like iloc[0]/iloc[-1] would)
+    start_level = df.drop_duplicates(keys, keep='first').set_index(keys)['water_level_percent']
+    end_level = df.drop_duplicates(keys, keep='last').set_index(keys)['water_level_percent']
+    total_consumed = 100 * stats['num_refills'] + (start_level - end_level)
+    
+    daily_stats = pd.DataFrame({
+        'total_consumed_percent': total_consumed.round(2),
+        'avg_level_percent': stats['avg_level_percent'].round(2),
+        'min_level_percent': stats['min_level_percent'].round(2),
+        'num_refills': stats['num_refills'].astype(int),
+        'drinking_events': stats['drinking_events'].astype(int)
+    }, index=stats.index)
+    
+    return daily_stats.reset_index()
+
+
+def plot_water_level_chart(df, alert_threshold=20, max_points=None):
     """
     Plot water level over time with refill markers and alert threshold.
     
     Parameters:
     - df: DataFrame with water level data
     - alert_threshold: Alert threshold percentage
+    - max_points: Point budget for long series (default: 2 × chart width in pixels)
     
     Returns:
     - matplotlib figure
     """
     fig, ax = plt.subplots(figsize=(12, 5))
+    budget = max_points or _point_budget(fig)
     
-    # Plot water level
-    ax.plot(df['timestamp'], df['water_level_percent'], 
+    # Plot water level (long series are reduced to what the chart can show)
+    line = downsample_minmax(df, 'water_level_percent', budget)
+    ax.plot(line['timestamp'], line['water_level_percent'], 
             linewidth=2, color='#1f77b4', label='Water Level')
     
     # Mark refill events
-    refill_points = df[df['refill_event'] == True]
+    refill_points = downsample_minmax(df[df['refill_event'] == True], 'water_level_percent', budget)
     if not refill_points.empty:
         ax.scatter(refill_points['timestamp'], refill_points['water_level_percent'],
                   color='green', s=100, marker='^', label='Refill', zorder=5)
@@ -203,96 +580,108 @@ def plot_water_level_chart(df, alert_threshold=20):
 
 # ============ NEW: FEEDING RECORDS SIMULATION FUNCTIONS ============
 
-def generate_feeding_records(start_date="2024-12-13", days=7):
+FEEDING_TIMES = (8, 15, 21)  # 8 AM, 3 PM, 9 PM
+
+
+def simulate_feeding_records(start_date="2024-12-13", days=7, rng=None,
+                             feeding_times=FEEDING_TIMES, portion_g=50, portion_jitter_g=5,
+                             presence_probability=0.9):
     """
-    Generate 7-day feeding records with 3 meals per day.
+    Generate scheduled feeding records with all random numbers drawn in bulk.
     
     Parameters:
     - start_date: Starting date for simulation (default: "2024-12-13")
     - days: Number of days to simulate (default: 7)
+    - rng: numpy Generator or int seed for reproducible data (default: random)
+    - feeding_times: Meal hours (default: 8 AM, 3 PM, 9 PM)
+    - portion_g / portion_jitter_g: Meal size, uniformly ± jitter (default: 50g ± 5g)
+    - presence_probability: Chance the cat shows up for a meal (default: 0.9)
     
     Returns:
     - DataFrame with columns: timestamp, food_amount, cat_present, event_type
     """
+    rng = _resolve_rng(rng)
+    days_index = pd.date_range(pd.to_datetime(start_date).normalize(), periods=days, freq="D")
+    timestamps = days_index.repeat(len(feeding_times)) + \
+        pd.to_timedelta(np.tile(list(feeding_times), days), unit="h")
+    n = len(timestamps)
+    
+    return pd.DataFrame({
+        'timestamp': timestamps,
+        'food_amount': np.round(portion_g + rng.uniform(-portion_jitter_g, portion_jitter_g, n), 1),
+        'cat_present': rng.random(n) < presence_probability,
+        'event_type': 'Feeding'
+    })
+
+
+def generate_feeding_records(start_date="2024-12-13", days=7, rng=None):
+    """
+    Generate 7-day feeding records with 3 meals per day.
     
-    feeding_times = [8, 15, 21]  # 8 AM, 3 PM, 9 PM
-    start = pd.to_datetime(start_date)
-    
-    feeding_records = []
-    
-    for day in range(days):
-        current_date = start + timedelta(days=day)
-        
-        for hour in feeding_times:
-            timestamp = current_date.replace(hour=hour, minute=0, second=0)
-            
-            # Food amount: approximately 50g ± 5g
-            food_amount = round(50 + np.random.uniform(-5, 5), 1)
-            
-            # Cat present: 90% probability
-            cat_present = np.random.random() < 0.9
-            
-            feeding_records.append({
-                'timestamp': timestamp,
-                'food_amount': food_amount,
-                'cat_present': cat_present,
-                'event_type': 'Feeding'
-            })
+    Parameters:
+    - start_date: Starting date for simulation (default: "2024-12-13")
+    - days: Number of days to simulate (default: 7)
+    - rng: numpy Generator or int seed for reproducible data (default: random)
     
-    return pd.DataFrame(feeding_records)
+    Returns:
+    - DataFrame with columns: timestamp, food_amount, cat_present, event_type
+    """
+    return simulate_feeding_records(start_date, days, rng=rng)
 
 
-def calculate_daily_feeding_stats(df):
+def calculate_daily_feeding_stats(df, group_by=None):
     """
     Calculate daily feeding statistics.
     
     Parameters:
     - df: DataFrame with feeding records
+    - group_by: Optional extra column(s), e.g. 'cat_name', to get one row per cat per day
     
     Returns:
-    - DataFrame with daily statistics
+    - DataFrame with daily statistics (days in order of first appearance)
     """
     
-    df = df.copy()
-    df['date'] = pd.to_datetime(df['timestamp']).dt.date
+    df, keys = _group_keys(df, group_by)
+    
+    # Single pass over the frame instead of re-filtering it once per day
+    stats = df.groupby(keys, sort=False).agg(
+        total_food=('food_amount', 'sum'),
+        total_feedings=('food_amount', 'size'),
+        cat_present_count=('cat_present', 'sum')
+    )
     
-    daily_stats = []
+    total_feedings = stats['total_feedings']
+    presence_rate = stats['cat_present_count'] / total_feedings * 100
+    avg_food = stats['total_food'] / total_feedings
     
-    for date in df['date'].unique():
-        day_data = df[df['date'] == date]
-        
-        total_food = day_data['food_amount'].sum()
-        total_feedings = len(day_data)
-        cat_present_count = day_data['cat_present'].sum()
-        presence_rate = (cat_present_count / total_feedings * 100) if total_feedings > 0 else 0
-        
-        daily_stats.append({
-            'date': date,
-            'total_food_g': round(total_food, 1),
-            'num_feedings': total_feedings,
-            'cat_present_count': int(cat_present_count),
-            'presence_rate_percent': round(presence_rate, 1),
-            'avg_food_per_meal_g': round(total_food / total_feedings, 1) if total_feedings > 0 else 0
-        })
+    daily_stats = pd.DataFrame({
+        'total_food_g': stats['total_food'].round(1),
+        'num_feedings': total_feedings.astype(int),
+        'cat_present_count': stats['cat_present_count'].astype(int),
+        'presence_rate_percent': presence_rate.round(1),
+        'avg_food_per_meal_g': avg_food.round(1)
+    }, index=stats.index)
     
-    return pd.DataFrame(daily_stats)
+    return daily_stats.reset_index()
 
 
-def plot_feeding_chart(df):
+def plot_feeding_chart(df, max_points=None):
     """
     Plot feeding amounts over time with cat presence indicators.
     
     Parameters:
     - df: DataFrame with feeding records
+    - max_points: Point budget per series (default: 2 × chart width in pixels)
     
     Returns:
     - matplotlib figure
     """
     fig, ax = plt.subplots(figsize=(12, 5))
+    budget = max_points or _point_budget(fig)
     
-    # Separate data by cat presence
-    present = df[df['cat_present'] == True]
-    absent = df[df['cat_present'] == False]
+    # Separate data by cat presence (long histories keep each bucket's extremes)
+    present = downsample_minmax(df[df['cat_present'] == True], 'food_amount', budget)
+    absent = downsample_minmax(df[df['cat_present'] == False], 'food_amount', budget)
     
     # Plot feeding amounts
     if not present.empty:
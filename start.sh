@@ -1,4 +1,5 @@
 #!/bin/bash
 cd "$(dirname "$0")"
 export PYTHONPATH="${PYTHONPATH}:$(pwd)"
+export CAT_CARE_WARM_UP="${CAT_CARE_WARM_UP:-1}"
 streamlit run streamlit_app/Home.py
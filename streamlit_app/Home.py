@@ -7,7 +7,9 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 import streamlit as st
 import pandas as pd
 from datetime import datetime
-from modules.data_loader import load_csv, save_csv
+from modules.data_loader import (load_table, save_table, append_table, import_csv_chunks,
+                                 read_csv_header, ACTIVITY_COLUMNS)
+from modules.model_registry import warm_up
 
 # Page configuration - must be before other Streamlit commands
 st.set_page_config(
@@ -22,6 +24,11 @@ st.set_page_config(
     }
 )
 
+# Preload the sentiment model in the background when the server is started with
+# CAT_CARE_WARM_UP=1 (see start.sh); no-op once the model is in memory
+if os.environ.get("CAT_CARE_WARM_UP") == "1":
+    warm_up()
+
 
 def home_page():
     """Home Page"""
@@ -89,10 +96,10 @@ def home_page():
         """)
 
     # Load cat data
-    data_file = "data/sample_data.csv"
+    data_table = "activity"
     
     try:
-        df = load_csv(data_file)
+        df = load_table(data_table)
         
         if df.empty:
             st.markdown("""
@@ -238,7 +245,7 @@ def home_page():
                 'amount': ['50g', '100ml', '15min', '50g', '80ml'],
                 'notes': ['Morning meal', 'Fresh water', 'Toy mouse', 'Morning meal', 'Fresh water']
             })
-            save_csv(sample_data, data_file)
+            save_table(sample_data, data_table)
             st.success("✅ Sample data loaded! Scroll up to see the dashboard.")
             st.balloons()
             st.rerun()
@@ -290,32 +297,50 @@ def home_page():
         
         if uploaded_file:
             try:
-                new_df = pd.read_csv(uploaded_file)
-                
-                # Validate required columns
-                required_columns = ['date', 'time', 'activity', 'cat_name', 'amount', 'notes']
-                missing_columns = [col for col in required_columns if col not in new_df.columns]
+                # Only the header and a small preview are read up front; the
+                # full file is streamed in chunks when it is saved
+                missing_columns = [col for col in ACTIVITY_COLUMNS
+                                   if col not in read_csv_header(uploaded_file)]
                 
                 if missing_columns:
                     st.error(f"❌ Oops! Your file is missing: {', '.join(missing_columns)}")
                     st.info("💡 Try downloading our template above and use it as a guide.")
                 else:
-                    st.success(f"✅ Great! Found {len(new_df)} activities for your cat!")
+                    size_mb = uploaded_file.size / (1024 * 1024)
+                    st.success(f"✅ Great! Your file looks good ({size_mb:.1f} MB).")
                     
                     # Show preview
                     with st.expander("👀 Preview your data", expanded=True):
-                        st.dataframe(new_df.head(10), use_container_width=True)
+                        st.dataframe(pd.read_csv(uploaded_file, nrows=10), use_container_width=True)
+                        uploaded_file.seek(0)
                     
                     # Save option
                     if st.button("💾 Save This Data", type="primary"):
-                        save_csv(new_df, data_file)
-                        st.success("✅ Data saved! Check out the dashboard above!")
-                        st.balloons()
+                        progress_bar = st.progress(0.0, text="Importing...")
+                        
+                        def show_progress(rows_read, fraction):
+                            progress_bar.progress(fraction or 0.0, text=f"Imported {rows_read:,} rows...")
+                        
+                        # Keep the report across the rerun that refreshes the dashboard
+                        st.session_state['import_report'] = import_csv_chunks(
+                            uploaded_file, data_table, progress=show_progress)
                         st.rerun()
             
             except Exception as e:
                 st.error(f"❌ Couldn't read your file: {str(e)}")
                 st.info("💡 Make sure your file is a CSV (comma-separated values) format. You can save Excel files as CSV!")
+        
+        report = st.session_state.pop('import_report', None)
+        if report and report.get('failed'):
+            st.error(f"❌ Couldn't import your file, your existing data was kept. {report['failed']}")
+        elif report:
+            if report['rows_rejected']:
+                st.warning(f"⚠️ Skipped {report['rows_rejected']:,} rows with a bad date, "
+                           f"time, activity or cat name.")
+                with st.expander("See skipped rows"):
+                    st.write("\n".join(f"- {e}" for e in report['errors']))
+            st.success(f"✅ Saved {report['rows_imported']:,} activities! Check out the dashboard above!")
+            st.balloons()
 
     # Tab 3: Manual entry
     with tab3:
@@ -356,8 +381,7 @@ def home_page():
                         'amount': entry_amount,
                         'notes': entry_notes
                     }
-                    new_df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True) if not df.empty else pd.DataFrame([new_row])
-                    save_csv(new_df, data_file)
+                    append_table(new_row, data_table)
                     st.success("✅ Activity added!")
                     st.balloons()
                     st.rerun()
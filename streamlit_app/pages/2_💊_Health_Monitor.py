@@ -7,7 +7,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../.
 import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
-from modules.data_loader import load_csv, save_csv
+from modules.data_loader import load_table
 
 def health_monitor_page():
     """Cat Health Monitor Page"""
@@ -15,11 +15,11 @@ def health_monitor_page():
     # Page title
     st.title("🐱 Cat Health Monitor")
 
-    # Data file
-    data_file = "data/feeding_log.csv"
+    # Data table
+    data_table = "feeding_log"
 
     # Load data
-    df = load_csv(data_file)
+    df = load_table(data_table)
 
     # Display latest status
     st.subheader("📊 Current Status")
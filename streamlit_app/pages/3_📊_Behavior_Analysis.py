@@ -3,78 +3,92 @@ import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
+import time
 import streamlit as st
+import pandas as pd
+from datetime import timedelta
+from modules.model_registry import registry_stats
+from modules.data_loader import query_table
+from modules.nlp_utils import get_cat_specific_interpretation, analyze_notes_batch
+from modules.inference_worker import submit_notes, get_worker
+from modules.sentiment_cache import sentiment_cache_stats
 
-def analyze_sentiment_huggingface(text):
-    """Analyze sentiment using Hugging Face Transformers - most accurate"""
-    try:
-        from transformers import pipeline
-        
-        # Load pre-trained sentiment analysis model
-        # This model is specifically trained for nuanced sentiment detection
-        sentiment_pipeline = pipeline(
-            "sentiment-analysis",
-            model="distilbert-base-uncased-finetuned-sst-2-english"
-        )
-        
-        # Get prediction
-        result = sentiment_pipeline(text)[0]
-        label = result['label']
-        score = result['score']
-        
-        # Map to user-friendly format
-        if label == "POSITIVE":
-            sentiment = "Positive 😊"
-            color = "green"
-            description = "Your cat seems to be doing well!"
-        else:  # NEGATIVE
-            sentiment = "Negative 😟"
-            color = "red"
-            description = "This may indicate a concerning behavior."
-        
+def format_huggingface_result(label, score):
+    """Map a Hugging Face label/confidence to the page's result format"""
+    if label == "POSITIVE":
+        sentiment = "Positive 😊"
+        color = "green"
+        description = "Your cat seems to be doing well!"
+    else:  # NEGATIVE
+        sentiment = "Negative 😟"
+        color = "red"
+        description = "This may indicate a concerning behavior."
+    
+    return {
+        "sentiment": sentiment,
+        "label": label,
+        "confidence": score,
+        "color": color,
+        "description": description
+    }
+
+def analyze_keywords(note):
+    """Cat-specific keyword analysis in the page's result format"""
+    cat_sentiment, keyword_count = get_cat_specific_interpretation(note)
+    if cat_sentiment == "negative":
         return {
-            "sentiment": sentiment,
-            "label": label,
-            "confidence": score,
-            "color": color,
-            "description": description
+            "sentiment": "Negative 😟",
+            "color": "red",
+            "description": f"Found {keyword_count} concerning keyword(s)",
+            "keywords": keyword_count
         }
-    except ImportError:
-        st.error("❌ Transformers not installed. Please install with: `pip install transformers torch`")
-        return None
-    except Exception as e:
-        st.error(f"Error with Hugging Face model: {str(e)}")
-        return None
+    elif cat_sentiment == "positive":
+        return {
+            "sentiment": "Positive 😊",
+            "color": "green",
+            "description": f"Found {keyword_count} positive keyword(s)",
+            "keywords": keyword_count
+        }
+    return {
+        "sentiment": "Neutral 😐",
+        "color": "gray",
+        "description": "No strong indicators detected",
+        "keywords": 0
+    }
 
-def get_cat_specific_interpretation(text):
-    """Provide cat-specific behavioral interpretation"""
-    text_lower = text.lower()
-    
-    # Negative indicators for cats
-    negative_keywords = [
-        'too much', 'vomit', 'lethargic', 'aggressive', 'hissing',
-        'not eating', 'depressed', 'hiding', 'crying', 'limping',
-        'blood', 'diarrhea', 'scratching excessively', 'biting',
-        'refusing', 'losing weight', 'not drinking', 'weak', 'sick',
-        'coughing', 'sneezing', 'discharge', 'bleeding', 'pain'
-    ]
-    
-    # Positive indicators for cats
-    positive_keywords = [
-        'playful', 'energetic', 'purring', 'affectionate', 'happy',
-        'eating well', 'healthy', 'active', 'grooming', 'curious',
-        'sleeping peacefully', 'good appetite', 'alert', 'friendly'
-    ]
-    
-    negative_count = sum(1 for keyword in negative_keywords if keyword in text_lower)
-    positive_count = sum(1 for keyword in positive_keywords if keyword in text_lower)
+def poll_huggingface_job():
+    """
+    Check the session's queued Hugging Face job without blocking on inference.
+
+    While the shared background worker is busy, the page shows progress and
+    reruns shortly; once done, the result (or a keyword fallback) is stored
+    in st.session_state['analysis_result'].
+    """
+    job = st.session_state.get('analysis_job')
+    if job is None:
+        return
+    if not job.done() and not job.expired():
+        if get_worker().is_loading():
+            st.info(f"⏳ Loading the AI model, first use only ({job.elapsed():.0f}s)...")
+        else:
+            st.info(f"⏳ Analyzing sentiment with AI... ({job.elapsed():.1f}s, other users' notes are batched with yours)")
+        time.sleep(0.3)
+        st.rerun()
     
-    if negative_count > positive_count:
-        return "negative", negative_count
-    elif positive_count > negative_count:
-        return "positive", positive_count
-    else:
-        return "neutral", 0
+    del st.session_state['analysis_job']
+    try:
+        # Shared pre-trained sentiment model, loaded once per server process.
+        # Notes seen before are answered from the sentiment cache.
+        scored = job.result()[0]
+        st.session_state['analysis_result'] = format_huggingface_result(
+            scored['sentiment'].upper(), scored['score'])
+    except (RuntimeError, TimeoutError) as e:
+        if "No module named" in str(e):
+            st.error("❌ Transformers not installed. Please install with: `pip install transformers torch`")
+        else:
+            st.error(f"Error with Hugging Face model: {str(e)}")
+        st.info("Falling back to Cat-Specific Keywords analysis...")
+        st.session_state['analysis_result'] = analyze_keywords(job.notes[0])
 
 def behavior_analysis_page():
     """Behavior & NLP Analysis Page"""
@@ -137,158 +151,165 @@ def behavior_analysis_page():
     with col1:
         analyze_button = st.button("🔍 Analyze", type="primary", use_container_width=True)
     
+    # A result (or pending job) belongs to the note and method it was asked for;
+    # drop it once either changes so an old analysis is never shown for new text
+    if st.session_state.get('analysis_key') != (note, method):
+        for key in ('analysis_key', 'analysis_job', 'analysis_result'):
+            st.session_state.pop(key, None)
+    
     if analyze_button:
         if note.strip() == "":
             st.warning("⚠️ Please enter some notes to analyze!")
+        elif "Hugging Face" in method:
+            # Queued on the shared background worker; the page polls for the result
+            st.session_state['analysis_job'] = submit_notes(note, method="transformer")
+            st.session_state['analysis_key'] = (note, method)
+            st.session_state.pop('analysis_result', None)
+        else:  # Cat-Specific Keywords
+            st.session_state['analysis_result'] = analyze_keywords(note)
+            st.session_state['analysis_key'] = (note, method)
+    
+    poll_huggingface_job()
+    
+    # Display results
+    result = st.session_state.get('analysis_result')
+    if result:
+        st.markdown("---")
+        st.subheader("📊 Analysis Results")
+        
+        # Main sentiment display
+        st.markdown(f"### Overall Sentiment: :{result['color']}[{result['sentiment']}]")
+        st.info(result['description'])
+        
+        # Detailed metrics
+        if "confidence" in result:
+            st.markdown("#### 🎯 AI Confidence Score")
+            st.progress(result['confidence'])
+            st.caption(f"The AI model is {result['confidence']:.1%} confident in this prediction")
+            
+            # Show the raw label
+            st.metric("AI Classification", result['label'])
+        
+        elif "keywords" in result:
+            st.markdown("#### 🔑 Keywords Analysis")
+            st.metric("Relevant Keywords Found", result['keywords'])
+        
+        # Health recommendations
+        st.markdown("---")
+        st.subheader("💡 Veterinary Recommendations")
+        
+        if result['color'] == 'red':
+            st.error("""
+            **🚨 Concerning Behavior Detected**
+            
+            **Immediate Actions:**
+            - 📝 Monitor your cat closely for the next 24-48 hours
+            - 🍽️ Check eating, drinking, and litter box habits
+            - 🔍 Look for other symptoms (lethargy, vomiting, diarrhea)
+            - 📊 Keep a detailed behavior log with timestamps
+            - 🌡️ Check temperature if possible (normal: 100.5-102.5°F)
+            
+            **Contact Your Vet If:**
+            - ⏰ Symptoms persist for more than 24 hours
+            - 🚫 Cat refuses food/water for 12+ hours
+            - 😣 Shows signs of pain or severe distress
+            - ⚡ Any sudden or dramatic behavioral changes
+            - 🆘 Difficulty breathing, bleeding, or seizures
+            """)
+            
+        elif result['color'] == 'green':
+            st.success("""
+            **✅ Positive Behavior Noted**
+            
+            **Keep Up The Good Work:**
+            - 🍽️ Continue current routine and balanced diet
+            - 🎾 Maintain regular play sessions (15-20 min daily)
+            - 💧 Ensure fresh water is always available
+            - 🏥 Schedule regular vet check-ups (annual or bi-annual)
+            - 📝 Keep tracking behaviors for long-term patterns
+            - 🧼 Maintain regular grooming and litter box cleaning
+            """)
+            
         else:
-            with st.spinner("Analyzing sentiment with AI..."):
-                result = None
-                
-                # Choose analysis method
-                if "Hugging Face" in method:
-                    result = analyze_sentiment_huggingface(note)
-                    if result is None:
-                        st.info("Falling back to Cat-Specific Keywords analysis...")
-                        cat_sentiment, keyword_count = get_cat_specific_interpretation(note)
-                        if cat_sentiment == "negative":
-                            result = {
-                                "sentiment": "Negative 😟",
-                                "color": "red",
-                                "description": f"Found {keyword_count} concerning keyword(s)",
-                                "keywords": keyword_count
-                            }
-                        elif cat_sentiment == "positive":
-                            result = {
-                                "sentiment": "Positive 😊",
-                                "color": "green",
-                                "description": f"Found {keyword_count} positive keyword(s)",
-                                "keywords": keyword_count
-                            }
-                        else:
-                            result = {
-                                "sentiment": "Neutral 😐",
-                                "color": "gray",
-                                "description": "No strong indicators detected",
-                                "keywords": 0
-                            }
-                
-                else:  # Cat-Specific Keywords
-                    cat_sentiment, keyword_count = get_cat_specific_interpretation(note)
-                    if cat_sentiment == "negative":
-                        result = {
-                            "sentiment": "Negative 😟",
-                            "color": "red",
-                            "description": f"Found {keyword_count} concerning keyword(s)",
-                            "keywords": keyword_count
-                        }
-                    elif cat_sentiment == "positive":
-                        result = {
-                            "sentiment": "Positive 😊",
-                            "color": "green",
-                            "description": f"Found {keyword_count} positive keyword(s)",
-                            "keywords": keyword_count
-                        }
-                    else:
-                        result = {
-                            "sentiment": "Neutral 😐",
-                            "color": "gray",
-                            "description": "No strong indicators detected",
-                            "keywords": 0
-                        }
-                
-                # Display results
-                if result:
-                    st.markdown("---")
-                    st.subheader("📊 Analysis Results")
-                    
-                    # Main sentiment display
-                    st.markdown(f"### Overall Sentiment: :{result['color']}[{result['sentiment']}]")
-                    st.info(result['description'])
-                    
-                    # Detailed metrics
-                    if "confidence" in result:
-                        st.markdown("#### 🎯 AI Confidence Score")
-                        st.progress(result['confidence'])
-                        st.caption(f"The AI model is {result['confidence']:.1%} confident in this prediction")
-                        
-                        # Show the raw label
-                        st.metric("AI Classification", result['label'])
-                    
-                    elif "keywords" in result:
-                        st.markdown("#### 🔑 Keywords Analysis")
-                        st.metric("Relevant Keywords Found", result['keywords'])
-                    
-                    # Health recommendations
-                    st.markdown("---")
-                    st.subheader("💡 Veterinary Recommendations")
-                    
-                    if result['color'] == 'red':
-                        st.error("""
-                        **🚨 Concerning Behavior Detected**
-                        
-                        **Immediate Actions:**
-                        - 📝 Monitor your cat closely for the next 24-48 hours
-                        - 🍽️ Check eating, drinking, and litter box habits
-                        - 🔍 Look for other symptoms (lethargy, vomiting, diarrhea)
-                        - 📊 Keep a detailed behavior log with timestamps
-                        - 🌡️ Check temperature if possible (normal: 100.5-102.5°F)
-                        
-                        **Contact Your Vet If:**
-                        - ⏰ Symptoms persist for more than 24 hours
-                        - 🚫 Cat refuses food/water for 12+ hours
-                        - 😣 Shows signs of pain or severe distress
-                        - ⚡ Any sudden or dramatic behavioral changes
-                        - 🆘 Difficulty breathing, bleeding, or seizures
-                        """)
-                        
-                    elif result['color'] == 'green':
-                        st.success("""
-                        **✅ Positive Behavior Noted**
-                        
-                        **Keep Up The Good Work:**
-                        - 🍽️ Continue current routine and balanced diet
-                        - 🎾 Maintain regular play sessions (15-20 min daily)
-                        - 💧 Ensure fresh water is always available
-                        - 🏥 Schedule regular vet check-ups (annual or bi-annual)
-                        - 📝 Keep tracking behaviors for long-term patterns
-                        - 🧼 Maintain regular grooming and litter box cleaning
-                        """)
-                        
-                    else:
-                        st.info("""
-                        **ℹ️ Neutral Observation**
-                        
-                        **Continue Monitoring:**
-                        - 👀 Normal daily activity noted
-                        - 📊 Keep observing for any changes
-                        - ✅ Maintain regular care routine
-                        - 📝 Log behaviors for future reference
-                        - 🔔 Watch for any patterns over time
-                        """)
-                    
-                    # Additional tips
-                    with st.expander("📚 Additional Cat Care Tips"):
-                        st.markdown("""
-                        ### General Cat Health Indicators
-                        
-                        **Healthy Cat Signs:**
-                        - Clear, bright eyes
-                        - Clean ears with no odor
-                        - Healthy coat (shiny, no bald patches)
-                        - Pink gums
-                        - Normal breathing (20-30 breaths/min at rest)
-                        - Regular eating and drinking
-                        
-                        **Warning Signs to Watch:**
-                        - Changes in appetite or thirst
-                        - Weight loss or gain
-                        - Changes in litter box habits
-                        - Excessive vocalization
-                        - Hiding or withdrawal
-                        - Vomiting or diarrhea
-                        - Difficulty breathing
-                        - Lethargy or decreased activity
-                        """)
+            st.info("""
+            **ℹ️ Neutral Observation**
+            
+            **Continue Monitoring:**
+            - 👀 Normal daily activity noted
+            - 📊 Keep observing for any changes
+            - ✅ Maintain regular care routine
+            - 📝 Log behaviors for future reference
+            - 🔔 Watch for any patterns over time
+            """)
+        
+        # Additional tips
+        with st.expander("📚 Additional Cat Care Tips"):
+            st.markdown("""
+            ### General Cat Health Indicators
+            
+            **Healthy Cat Signs:**
+            - Clear, bright eyes
+            - Clean ears with no odor
+            - Healthy coat (shiny, no bald patches)
+            - Pink gums
+            - Normal breathing (20-30 breaths/min at rest)
+            - Regular eating and drinking
+            
+            **Warning Signs to Watch:**
+            - Changes in appetite or thirst
+            - Weight loss or gain
+            - Changes in litter box habits
+            - Excessive vocalization
+            - Hiding or withdrawal
+            - Vomiting or diarrhea
+            - Difficulty breathing
+            - Lethargy or decreased activity
+            """)
+
+    # Batch analysis of logged notes
+    st.markdown("---")
+    st.subheader("📚 Analyze All Logged Notes")
+    st.markdown("Score every note in your activity log at once.")
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        filter_cat = st.text_input("🐱 Only this cat", placeholder="Leave empty for all cats")
+    with col2:
+        filter_start = st.date_input("📅 From", value=None)
+    with col3:
+        filter_end = st.date_input("📅 To", value=None)
+    
+    # Only pull the rows we are going to score
+    log_df = query_table(
+        "activity",
+        cat_name=filter_cat.strip() or None,
+        start=filter_start,
+        end=filter_end + timedelta(days=1) if filter_end else None
+    )
+    if log_df.empty or 'notes' not in log_df.columns:
+        st.info("No matching activity notes. Add activities on the Home page first!")
+    else:
+        col1, col2 = st.columns(2)
+        with col1:
+            batch_method = st.selectbox(
+                "Batch method",
+                ["keywords", "textblob", "transformer"],
+                help="Keywords and TextBlob are fast; the transformer is most accurate"
+            )
+        with col2:
+            batch_size = st.number_input("Batch size", min_value=1, max_value=256, value=32)
+        
+        if st.button("🔍 Analyze All Notes"):
+            with st.spinner(f"Scoring {len(log_df)} notes..."):
+                try:
+                    scored = analyze_notes_batch(log_df['notes'], method=batch_method,
+                                                 batch_size=int(batch_size))
+                    scored = pd.concat([log_df[['date', 'cat_name']], scored], axis=1) \
+                        if {'date', 'cat_name'}.issubset(log_df.columns) else scored
+                    st.dataframe(scored, use_container_width=True, hide_index=True)
+                    st.bar_chart(scored['sentiment'].value_counts())
+                except ImportError:
+                    st.error("❌ This method needs extra packages. Install with: `pip install transformers torch`")
 
     # Installation guide
     st.markdown("---")
@@ -318,7 +339,35 @@ def behavior_analysis_page():
         
         ### 🚀 First Run Note
         On first use, the model will download (~250MB). This happens once and then runs locally.
+        The loaded model is shared by all users until the server restarts.
         """)
+        
+        model_stats = registry_stats()
+        if model_stats:
+            st.markdown("### 📈 Loaded Models")
+            st.dataframe(model_stats, use_container_width=True, hide_index=True)
+        
+        cache_stats = sentiment_cache_stats()
+        st.markdown("### 🗃️ Sentiment Cache")
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            hit_rate = cache_stats['hit_rate']
+            st.metric("Hit Rate", f"{hit_rate:.0%}" if hit_rate is not None else "–")
+        with col2:
+            st.metric("Hits (memory / disk)", f"{cache_stats['hits']} / {cache_stats['disk_hits']}")
+        with col3:
+            st.metric("Misses", cache_stats['misses'])
+        
+        worker_stats = get_worker().stats()
+        st.markdown("### ⚙️ Background Inference Worker")
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Queued", worker_stats['queue_depth'])
+        with col2:
+            st.metric("Completed / Failed", f"{worker_stats['completed']} / {worker_stats['failed']}")
+        with col3:
+            avg_jobs = worker_stats['avg_jobs_per_batch']
+            st.metric("Requests per Batch", avg_jobs if avg_jobs is not None else "–")
 
 if __name__ == "__main__":
     behavior_analysis_page()
\ No newline at end of file